@@ -2,9 +2,10 @@ from datetime import datetime
 from jinja2 import Template
 from langchain_core.messages import SystemMessage
 from langgraph.prebuilt import create_react_agent
+from langgraph.prebuilt.chat_agent_executor import AgentState
 from langgraph.graph.state import CompiledStateGraph
-from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.runnables import RunnableLambda
+from sample_agent.utils import register_agent_schema, remember_entry_state
 
 
 class AgentBuilder:
@@ -23,6 +24,7 @@ class AgentBuilder:
         constraints: list[str] | None = None,
         prompt_template: str | None = None,
         additional_pre_hooks: list[RunnableLambda] | None = None,
+        checkpointer=None,
     ):
         self.name = name
         self.model = model
@@ -36,6 +38,8 @@ class AgentBuilder:
         self.constraints = constraints
         self.prompt_template = prompt_template
         self.additional_pre_hooks = additional_pre_hooks or []
+        # None: como agente do swarm, herda o checkpointer do grafo pai
+        self.checkpointer = checkpointer
 
     def _extract_tool_infos(self) -> list[dict]:
         """Extract tool metadata into a uniform list for template rendering."""
@@ -80,6 +84,9 @@ class AgentBuilder:
         """Composes multiple pre-hooks into a single RunnableLambda chain."""
         
         def composed_hook_fn(state: dict) -> dict:
+            # Base das atualizações mínimas dos handoffs (antes dos hooks)
+            remember_entry_state(state)
+
             # Start with the original state
             current_state = state.copy()
             
@@ -108,6 +115,7 @@ class AgentBuilder:
         """Injects dynamically generated prompt as llm_input_messages."""
 
         def hook_fn(state: dict) -> dict:
+            remember_entry_state(state)
             rendered_prompt = self._render_prompt(state)
             print("Calling pre_model_hook")
             return {
@@ -127,6 +135,9 @@ class AgentBuilder:
         # Use composed hooks if additional hooks are provided, otherwise use the default
         pre_hook = self._compose_pre_hooks() if self.additional_pre_hooks else self._pre_model_hook()
 
+        # Handoffs para este agente propagam só as chaves que ele lê
+        register_agent_schema(self.name, self.state_schema or AgentState)
+
         return create_react_agent(
             model=bound_model,
             tools=self.tools,
@@ -134,5 +145,5 @@ class AgentBuilder:
             name=self.name,
             state_schema=self.state_schema,
             response_format=self.response_format,
-            checkpointer=MemorySaver(),
+            checkpointer=self.checkpointer,
         )
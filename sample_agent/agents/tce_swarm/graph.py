@@ -6,7 +6,6 @@ Production-grade multi-agent system for institutional processes
 from langchain.chat_models import init_chat_model
 from langgraph.graph import StateGraph
 from langgraph_swarm import add_active_agent_router
-from langgraph.checkpoint.memory import MemorySaver
 from langsmith import traceable
 from sample_agent.agents.tce_swarm.configuration import ChatContasConfiguration
 from langgraph_swarm import SwarmState
@@ -25,6 +24,7 @@ from sample_agent.agents.tce_swarm.states import (
 )
 
 # Import utils
+from sample_agent.checkpointer import get_checkpointer
 from sample_agent.utils import (
     compile_workflow,
     create_handoff_tool_with_state_propagation,
@@ -174,7 +174,8 @@ def create_swarm_system():
     print("📦 Compiling workflow with checkpointing...")
     print("🔄 Swarm Architecture: Any agent can respond directly to users")
 
-    checkpointer = MemorySaver()
+    # SQLite persistente com retenção por thread (memória estável sob carga contínua)
+    checkpointer = get_checkpointer()
 
     # Compile with all configurations
     graph = compile_workflow(workflow, checkpointer=checkpointer)
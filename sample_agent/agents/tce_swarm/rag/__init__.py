@@ -3,13 +3,35 @@ RAG Module - Production-grade Retrieval-Augmented Generation
 Implements complete RAG pipeline with document reading, chunking, and retrieval
 """
 
-from .utils import llm, mock_document_processing, mock_chunking, mock_vector_search
+from .utils import llm, allm, llm_batch, llm_stream, allm_stream, get_chat_model, mock_document_processing, mock_chunking, mock_vector_search
+from .cache import SemanticAnswerCache, TieredLLMCache
+from .profiles import PROFILES, ExecutionProfile, get_profile
+from .reranker import LocalReranker, get_reranker, semantic_similarity
+from .chunk_arena import load_retrieved, load_graded, load_enriched, load_reranked, store_chunks
 from .graph import build_rag_agent
 
 __all__ = [
     "llm",
+    "allm",
+    "llm_batch",
+    "llm_stream",
+    "allm_stream",
+    "get_chat_model",
     "mock_document_processing", 
     "mock_chunking",
     "mock_vector_search",
+    "TieredLLMCache",
+    "SemanticAnswerCache",
+    "PROFILES",
+    "ExecutionProfile",
+    "get_profile",
+    "LocalReranker",
+    "get_reranker",
+    "semantic_similarity",
+    "load_retrieved",
+    "load_graded",
+    "load_enriched",
+    "load_reranked",
+    "store_chunks",
     "build_rag_agent",
 ] 
\ No newline at end of file
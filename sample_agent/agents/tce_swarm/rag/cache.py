@@ -0,0 +1,514 @@
+"""
+Response Caches for RAG Pipeline
+Tiered LLM response cache (in-process LRU in front of WAL-mode SQLite) and a
+semantic answer cache keyed on query embeddings, plus the LangGraph node cache
+
+TieredLLMCache implements langchain's `BaseCache`, so it is installed with `set_llm_cache`.
+Each thread gets its own SQLite connection (WAL lets readers proceed while one
+writer commits), memory hits never touch the database, and expired or
+least-recently-used rows are evicted by a background thread.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple, Union
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import warnings
+
+import numpy as np
+from langchain_core._api import LangChainBetaWarning
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+from langgraph.cache.base import BaseCache as GraphBaseCache, FullKey, Namespace
+from langgraph.cache.memory import InMemoryCache
+from langgraph.cache.sqlite import SqliteCache
+
+from .index.embeddings import HashingEmbedder, LangChainEmbedder
+
+logger = logging.getLogger(__name__)
+
+# `loads` é beta no langchain_core; o formato é o mesmo usado pelos caches da comunidade
+warnings.filterwarnings("ignore", message="The function `loads` is in beta", category=LangChainBetaWarning)
+
+DEFAULT_LLM_CACHE_PATH = os.environ.get("RAG_LLM_CACHE_PATH", "llm_cache.db")
+# Entradas no tier em memória
+DEFAULT_MEMORY_ENTRIES = 2048
+# Linhas no SQLite antes da evicção LRU
+DEFAULT_MAX_DB_ENTRIES = 100_000
+# TTL padrão (segundos); None = sem expiração
+DEFAULT_TTL: Optional[float] = 7 * 24 * 3600
+# Intervalo da evicção em background (segundos)
+EVICTION_INTERVAL = 60.0
+
+TTLPolicy = Union[None, float, Callable[[str, str], Optional[float]]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at);
+CREATE INDEX IF NOT EXISTS llm_cache_expires ON llm_cache (expires_at);
+"""
+
+
+def _cache_key(prompt: str, llm_string: str) -> str:
+    return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+
+class TieredLLMCache(BaseCache):
+    """
+    Cache de respostas de LLM em dois níveis (LRU em memória → SQLite WAL).
+
+    Args:
+        database_path: arquivo SQLite (None = apenas memória)
+        memory_entries: capacidade do LRU em memória
+        max_db_entries: limite de linhas no SQLite; excedente é removido por LRU
+        ttl: TTL padrão em segundos, ou função (prompt, llm_string) -> TTL por entrada
+        eviction_interval: período da thread de evicção em background
+    """
+
+    def __init__(
+        self,
+        database_path: Optional[str] = DEFAULT_LLM_CACHE_PATH,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        max_db_entries: int = DEFAULT_MAX_DB_ENTRIES,
+        ttl: TTLPolicy = DEFAULT_TTL,
+        eviction_interval: float = EVICTION_INTERVAL,
+    ):
+        self.database_path = database_path
+        self.memory_entries = memory_entries
+        self.max_db_entries = max_db_entries
+        self.ttl = ttl
+        self.eviction_interval = eviction_interval
+
+        self._memory: "OrderedDict[str, tuple[Optional[float], Sequence[Any]]]" = OrderedDict()
+        self._memory_lock = threading.Lock()
+        self._local = threading.local()
+        self._touched: Dict[str, float] = {}
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._stop = threading.Event()
+        self._evictor: Optional[threading.Thread] = None
+
+        if database_path:
+            self._connection().executescript(_SCHEMA)
+
+    # ===== BaseCache =====
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = _cache_key(prompt, llm_string)
+        value = self._memory_get(key)
+        if value is not None:
+            return value
+        if self.database_path:
+            row = self._connection().execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row and (row[1] is None or row[1] > time.time()):
+                try:
+                    generations = [loads(item) for item in json.loads(row[0])]
+                except Exception as e:
+                    logger.warning(f"Discarding undecodable LLM cache entry: {e}")
+                else:
+                    with self._memory_lock:
+                        self._stats["disk_hits"] += 1
+                        # accessed_at é gravado em lote pela evicção, não a cada leitura
+                        self._touched[key] = time.time()
+                    self._memory_put(key, row[1], generations)
+                    return self._copy(generations)
+        with self._memory_lock:
+            self._stats["misses"] += 1
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        self.put(prompt, llm_string, return_val, ttl=self._ttl_for(prompt, llm_string))
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._memory_lock:
+            self._memory.clear()
+            self._touched.clear()
+        if self.database_path:
+            connection = self._connection()
+            with connection:
+                connection.execute("DELETE FROM llm_cache")
+
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        # Hit em memória responde sem passar pelo executor
+        value = self._memory_get(_cache_key(prompt, llm_string))
+        if value is not None:
+            return value
+        return await asyncio.get_running_loop().run_in_executor(None, self.lookup, prompt, llm_string)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.update, prompt, llm_string, return_val)
+
+    async def aclear(self, **kwargs: Any) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.clear)
+
+    # ===== API própria =====
+
+    def put(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE, ttl: Optional[float] = None) -> None:
+        """Grava uma resposta com TTL explícito (segundos; None = sem expiração)"""
+        key = _cache_key(prompt, llm_string)
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        self._memory_put(key, expires_at, list(return_val))
+        with self._memory_lock:
+            self._stats["writes"] += 1
+        if self.database_path:
+            value = json.dumps([dumps(generation) for generation in return_val])
+            connection = self._connection()
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, value, expires_at, now),
+                )
+            self._ensure_evictor()
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de hit/miss e ocupação dos dois níveis"""
+        with self._memory_lock:
+            stats = dict(self._stats, memory_entries=len(self._memory))
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def evict(self) -> int:
+        """Remove entradas expiradas e o excedente LRU do SQLite; retorna linhas removidas"""
+        if not self.database_path:
+            return 0
+        with self._memory_lock:
+            touched, self._touched = self._touched, {}
+        connection = self._connection()
+        with connection:
+            if touched:
+                connection.executemany(
+                    "UPDATE llm_cache SET accessed_at = ? WHERE key = ?",
+                    [(accessed_at, key) for key, accessed_at in touched.items()],
+                )
+            removed = connection.execute(
+                "DELETE FROM llm_cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            ).rowcount
+            excess = connection.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_db_entries
+            if excess > 0:
+                removed += connection.execute(
+                    "DELETE FROM llm_cache WHERE key IN "
+                    "(SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?)",
+                    (excess,),
+                ).rowcount
+        with self._memory_lock:
+            self._stats["evictions"] += removed
+        return removed
+
+    def close(self) -> None:
+        """Encerra a thread de evicção"""
+        self._stop.set()
+
+    # ===== Internos =====
+
+    def _ttl_for(self, prompt: str, llm_string: str) -> Optional[float]:
+        return self.ttl(prompt, llm_string) if callable(self.ttl) else self.ttl
+
+    @staticmethod
+    def _copy(generations: Sequence[Any]) -> RETURN_VAL_TYPE:
+        # Cópias: o chamador pode anotar metadados/ids nas mensagens retornadas
+        return [generation.model_copy(deep=True) for generation in generations]
+
+    def _memory_get(self, key: str) -> Optional[RETURN_VAL_TYPE]:
+        with self._memory_lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, generations = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            self._stats["memory_hits"] += 1
+            if self.database_path:
+                self._touched[key] = time.time()
+        return self._copy(generations)
+
+    def _memory_put(self, key: str, expires_at: Optional[float], generations: Sequence[Any]) -> None:
+        with self._memory_lock:
+            self._memory[key] = (expires_at, self._copy(generations))
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Conexão SQLite por thread em modo WAL"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.database_path, timeout=30.0, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA busy_timeout=30000")
+            self._local.connection = connection
+        return connection
+
+    def _ensure_evictor(self) -> None:
+        if self._evictor is not None or self.eviction_interval <= 0:
+            return
+        with self._memory_lock:
+            if self._evictor is not None:
+                return
+            self._evictor = threading.Thread(target=self._evict_loop, name="llm-cache-evictor", daemon=True)
+            self._evictor.start()
+
+    def _evict_loop(self) -> None:
+        while not self._stop.wait(self.eviction_interval):
+            try:
+                self.evict()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM cache eviction failed: {e}")
+
+
+# ===== CACHE SEMÂNTICO DE RESPOSTAS =====
+
+# Modelo de embeddings das consultas ("provider:modelo" do init_embeddings).
+# "hashing" seleciona explicitamente o HashingEmbedder, que só casa quase-duplicatas
+SEMANTIC_CACHE_EMBEDDINGS = os.environ.get("RAG_SEMANTIC_CACHE_EMBEDDINGS", "openai:text-embedding-3-small")
+# Similaridade mínima (cosseno) entre consultas para reaproveitar a resposta;
+# sem RAG_SEMANTIC_CACHE_THRESHOLD, o valor do embedder em SEMANTIC_CACHE_THRESHOLDS
+SEMANTIC_CACHE_THRESHOLD: Optional[float] = (
+    float(os.environ["RAG_SEMANTIC_CACHE_THRESHOLD"]) if os.environ.get("RAG_SEMANTIC_CACHE_THRESHOLD") else None
+)
+# Paráfrases de consultas curtas ficam acima de ~0.8 nos modelos de embedding e
+# consultas distintas do mesmo domínio abaixo; no hashing léxico paráfrases
+# caem para ~0.25, então o threshold só separa quase-duplicatas.
+# Recalibre com `python -m sample_agent.benchmarks.bench_semantic_cache`
+SEMANTIC_CACHE_THRESHOLDS = {
+    "hashing": 0.85,
+    "openai:text-embedding-3-small": 0.82,
+    "openai:text-embedding-3-large": 0.80,
+}
+DEFAULT_SEMANTIC_CACHE_THRESHOLD = 0.82
+# Respostas por escopo antes da evicção LRU
+SEMANTIC_CACHE_ENTRIES = 512
+# TTL das respostas (segundos)
+SEMANTIC_CACHE_TTL = 24 * 3600.0
+
+
+class _ScopedAnswers:
+    """Matriz de embeddings das consultas + respostas de um escopo"""
+
+    def __init__(self, corpus_version: Any):
+        self.corpus_version = corpus_version
+        self.vectors: Optional[np.ndarray] = None
+        self.entries: List[Dict[str, Any]] = []
+
+
+class SemanticAnswerCache:
+    """
+    Cache de respostas finais por similaridade de embedding da consulta.
+
+    Entradas são isoladas por escopo (backend, document_scope, user/session,
+    coleções, tipo de consulta) e marcadas com a versão do corpus: quando a
+    ingestão altera o corpus, o escopo inteiro é descartado na próxima consulta.
+
+    Sem embedder (modelo indisponível) o cache fica desligado: toda consulta é miss.
+    """
+
+    def __init__(
+        self,
+        embedder,
+        threshold: float = DEFAULT_SEMANTIC_CACHE_THRESHOLD,
+        max_entries: int = SEMANTIC_CACHE_ENTRIES,
+        ttl: Optional[float] = SEMANTIC_CACHE_TTL,
+    ):
+        self.embedder = embedder
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._scopes: Dict[Hashable, _ScopedAnswers] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "invalidations": 0}
+
+    def lookup(self, scope: Hashable, query: str, corpus_version: Any) -> Optional[Dict[str, Any]]:
+        """Resposta da consulta mais similar do escopo, se acima do threshold"""
+        vector = self._embed(query)
+        now = time.time()
+        with self._lock:
+            if vector is None:
+                self._stats["misses"] += 1
+                return None
+            answers = self._scope(scope, corpus_version)
+            if answers.vectors is None or not answers.entries:
+                self._stats["misses"] += 1
+                return None
+            scores = answers.vectors @ vector
+            best = int(np.argmax(scores))
+            entry = answers.entries[best]
+            if scores[best] < self.threshold or (entry["expires_at"] is not None and entry["expires_at"] <= now):
+                self._stats["misses"] += 1
+                return None
+            entry["accessed_at"] = now
+            self._stats["hits"] += 1
+            return {**entry["payload"], "similarity": float(scores[best]), "cached_query": entry["query"]}
+
+    def store(self, scope: Hashable, query: str, corpus_version: Any, payload: Dict[str, Any]) -> None:
+        vector = self._embed(query)
+        if vector is None:
+            return
+        now = time.time()
+        entry = {
+            "query": query,
+            "payload": payload,
+            "accessed_at": now,
+            "expires_at": now + self.ttl if self.ttl is not None else None,
+        }
+        with self._lock:
+            answers = self._scope(scope, corpus_version)
+            if answers.vectors is not None and len(answers.entries) >= self.max_entries:
+                oldest = min(range(len(answers.entries)), key=lambda i: answers.entries[i]["accessed_at"])
+                answers.vectors = np.delete(answers.vectors, oldest, axis=0)
+                del answers.entries[oldest]
+            row = vector.reshape(1, -1)
+            answers.vectors = row if answers.vectors is None else np.vstack([answers.vectors, row])
+            answers.entries.append(entry)
+            self._stats["writes"] += 1
+
+    def invalidate(self, corpus_version: Any = None) -> int:
+        """Descarta escopos (todos, ou os que não estão em `corpus_version`)"""
+        with self._lock:
+            stale = [key for key, answers in self._scopes.items()
+                     if corpus_version is None or answers.corpus_version != corpus_version]
+            for key in stale:
+                del self._scopes[key]
+            self._stats["invalidations"] += len(stale)
+        return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats, scopes=len(self._scopes))
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def _embed(self, query: str) -> Optional[np.ndarray]:
+        if self.embedder is None:
+            return None
+        try:
+            return self.embedder.embed_query(query)
+        except Exception as e:
+            # Falha do provedor de embeddings não derruba a consulta: vira miss
+            logger.warning(f"Semantic cache embedding failed: {e}")
+            return None
+
+    def _scope(self, scope: Hashable, corpus_version: Any) -> _ScopedAnswers:
+        answers = self._scopes.get(scope)
+        if answers is None or answers.corpus_version != corpus_version:
+            if answers is not None:
+                self._stats["invalidations"] += 1
+            answers = self._scopes[scope] = _ScopedAnswers(corpus_version)
+        return answers
+
+
+_SEMANTIC_CACHE: Optional[SemanticAnswerCache] = None
+_SEMANTIC_CACHE_LOCK = threading.Lock()
+
+
+def semantic_cache_embedder(spec: str = SEMANTIC_CACHE_EMBEDDINGS):
+    """Embedder do cache semântico; None quando o modelo não pode ser inicializado"""
+    if spec == "hashing":
+        return HashingEmbedder()
+    try:
+        from langchain.embeddings import init_embeddings
+
+        return LangChainEmbedder(init_embeddings(spec))
+    except Exception as e:
+        logger.warning(f"Semantic cache disabled: embeddings '{spec}' unavailable ({e})")
+        return None
+
+
+def get_semantic_cache() -> SemanticAnswerCache:
+    """Cache semântico process-wide com o embedder e o threshold configurados"""
+    global _SEMANTIC_CACHE
+    with _SEMANTIC_CACHE_LOCK:
+        if _SEMANTIC_CACHE is None:
+            threshold = SEMANTIC_CACHE_THRESHOLD or SEMANTIC_CACHE_THRESHOLDS.get(
+                SEMANTIC_CACHE_EMBEDDINGS, DEFAULT_SEMANTIC_CACHE_THRESHOLD
+            )
+            _SEMANTIC_CACHE = SemanticAnswerCache(semantic_cache_embedder(), threshold=threshold)
+    return _SEMANTIC_CACHE
+
+
+_LLM_CACHE: Optional[TieredLLMCache] = None
+_LLM_CACHE_LOCK = threading.Lock()
+
+
+def get_llm_cache() -> TieredLLMCache:
+    """Cache de LLM process-wide; o SQLite e a thread de eviction só são criados na primeira chamada"""
+    global _LLM_CACHE
+    with _LLM_CACHE_LOCK:
+        if _LLM_CACHE is None:
+            _LLM_CACHE = TieredLLMCache()
+    return _LLM_CACHE
+
+
+# ===== CACHE DE NODES DO GRAFO =====
+
+DEFAULT_NODE_CACHE_PATH = os.environ.get("RAG_NODE_CACHE_PATH")
+
+
+class NodeCache(GraphBaseCache):
+    """
+    Cache de nodes do LangGraph com contadores de hit/miss por node.
+
+    Delega o armazenamento a um backend de cache de grafo (`InMemoryCache`, ou
+    `SqliteCache` quando há `database_path`) e conta acessos pelo nome do node,
+    que o LangGraph coloca no último elemento do namespace da chave.
+    """
+
+    def __init__(self, database_path: Optional[str] = DEFAULT_NODE_CACHE_PATH):
+        super().__init__()
+        self.backend: GraphBaseCache = SqliteCache(path=database_path) if database_path else InMemoryCache()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def get(self, keys: Sequence[FullKey]) -> Dict[FullKey, Any]:
+        values = self.backend.get(keys)
+        self._count(keys, values)
+        return values
+
+    async def aget(self, keys: Sequence[FullKey]) -> Dict[FullKey, Any]:
+        values = await self.backend.aget(keys)
+        self._count(keys, values)
+        return values
+
+    def set(self, pairs: Mapping[FullKey, Tuple[Any, Optional[int]]]) -> None:
+        self.backend.set(pairs)
+
+    async def aset(self, pairs: Mapping[FullKey, Tuple[Any, Optional[int]]]) -> None:
+        await self.backend.aset(pairs)
+
+    def clear(self, namespaces: Optional[Sequence[Namespace]] = None) -> None:
+        self.backend.clear(namespaces)
+
+    async def aclear(self, namespaces: Optional[Sequence[Namespace]] = None) -> None:
+        await self.backend.aclear(namespaces)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hits, misses e hit rate por node"""
+        with self._lock:
+            stats = {node: dict(counts) for node, counts in self._stats.items()}
+        for counts in stats.values():
+            lookups = counts["hits"] + counts["misses"]
+            counts["hit_rate"] = counts["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def _count(self, keys: Sequence[FullKey], values: Dict[FullKey, Any]) -> None:
+        with self._lock:
+            for key in keys:
+                namespace = key[0]
+                counts = self._stats.setdefault(namespace[-1] if namespace else "", {"hits": 0, "misses": 0})
+                counts["hits" if key in values else "misses"] += 1
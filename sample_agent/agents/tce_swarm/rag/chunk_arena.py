@@ -0,0 +1,148 @@
+"""
+Chunk Arena for RAG Pipeline
+Content-addressed chunk store shared by the pipeline stages of one run
+
+RAGState keeps each ChunkResult once, in `chunk_store` (chunk_id -> chunk); the
+stage lists hold only IDs and scores (ChunkGrade, ChunkEnrichment,
+RerankedChunkRef). Nodes rebuild the full models with `load_*` and write them
+back with `store_chunks`, which returns only the chunks the node added (the
+state reducer merges them), so copies and checkpoints carry the text once.
+The store is scoped to one run: the entry node resets it with `reset_chunk_arena`.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+import logging
+
+from .models.state import RESET_CHUNK_STORE, RAGState
+from .models.chunks import (
+    ChunkEnrichment,
+    ChunkGrade,
+    ChunkResult,
+    EnrichedChunk,
+    GradedChunk,
+    RerankedChunk,
+    RerankedChunkRef,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _resolve(state: RAGState, chunk_id: str) -> Optional[ChunkResult]:
+    chunk = (state.chunk_store or {}).get(chunk_id)
+    if chunk is None:
+        logger.warning(f"Chunk {chunk_id} missing from chunk_store")
+    return chunk
+
+
+def _enriched(chunk: ChunkResult, enrichment: ChunkEnrichment) -> EnrichedChunk:
+    return EnrichedChunk(chunk=chunk, **enrichment.model_dump(exclude={"chunk_id"}))
+
+
+def _enrichment(enriched: EnrichedChunk) -> ChunkEnrichment:
+    return ChunkEnrichment(chunk_id=enriched.chunk.chunk_id, **enriched.model_dump(exclude={"chunk"}))
+
+
+# ===== LEITURA =====
+
+def load_chunks(state: RAGState, chunk_ids: Optional[Sequence[str]]) -> List[ChunkResult]:
+    """Chunks completos na ordem dos IDs"""
+    return [chunk for chunk in (_resolve(state, chunk_id) for chunk_id in chunk_ids or []) if chunk is not None]
+
+
+def load_retrieved(state: RAGState) -> List[ChunkResult]:
+    return load_chunks(state, state.retrieved_chunks)
+
+
+def load_graded(state: RAGState) -> List[GradedChunk]:
+    graded = []
+    for grade in state.graded_chunks or []:
+        chunk = _resolve(state, grade.chunk_id)
+        if chunk is not None:
+            graded.append(GradedChunk(chunk=chunk, relevance_score=grade.relevance_score, confidence=grade.confidence))
+    return graded
+
+
+def load_enriched(state: RAGState) -> List[EnrichedChunk]:
+    enriched = []
+    for enrichment in state.enriched_context or []:
+        chunk = _resolve(state, enrichment.chunk_id)
+        if chunk is not None:
+            enriched.append(_enriched(chunk, enrichment))
+    return enriched
+
+
+def load_reranked(state: RAGState) -> List[RerankedChunk]:
+    reranked = []
+    for ref in state.reranked_chunks or []:
+        chunk = _resolve(state, ref.chunk.chunk_id)
+        if chunk is not None:
+            reranked.append(
+                RerankedChunk(
+                    chunk=_enriched(chunk, ref.chunk),
+                    final_score=ref.final_score,
+                    ranking_factors=ref.ranking_factors,
+                )
+            )
+    return reranked
+
+
+# ===== GRAVAÇÃO =====
+
+def store_chunks(
+    state: RAGState,
+    retrieved: Optional[Sequence[ChunkResult]] = None,
+    graded: Optional[Sequence[GradedChunk]] = None,
+    enriched: Optional[Sequence[EnrichedChunk]] = None,
+    reranked: Optional[Sequence[RerankedChunk]] = None,
+) -> Dict[str, Any]:
+    """
+    Update (dict) para as listas informadas: referências compactas e, em
+    chunk_store, só os chunks que ainda não estão no store do estado
+    """
+    known = state.chunk_store or {}
+    added: Dict[str, ChunkResult] = {}
+    updates: Dict[str, Any] = {}
+
+    def ids(chunks: Sequence[ChunkResult]) -> List[str]:
+        for chunk in chunks:
+            if chunk.chunk_id not in known:
+                added[chunk.chunk_id] = chunk
+        return [chunk.chunk_id for chunk in chunks]
+
+    if retrieved is not None:
+        updates["retrieved_chunks"] = ids(retrieved)
+    if graded is not None:
+        ids([grade.chunk for grade in graded])
+        updates["graded_chunks"] = [
+            ChunkGrade(chunk_id=grade.chunk.chunk_id, relevance_score=grade.relevance_score, confidence=grade.confidence)
+            for grade in graded
+        ]
+    if enriched is not None:
+        ids([item.chunk for item in enriched])
+        updates["enriched_context"] = [_enrichment(item) for item in enriched]
+    if reranked is not None:
+        ids([item.chunk.chunk for item in reranked])
+        updates["reranked_chunks"] = [
+            RerankedChunkRef(
+                chunk=_enrichment(item.chunk),
+                final_score=item.final_score,
+                ranking_factors=item.ranking_factors,
+            )
+            for item in reranked
+        ]
+
+    if added:
+        updates["chunk_store"] = added
+    return updates
+
+
+def reset_chunk_arena() -> Dict[str, Any]:
+    """Update que descarta os chunks e as listas de estágio da execução anterior"""
+    return {
+        "chunk_store": {RESET_CHUNK_STORE: None},
+        "retrieved_chunks": [],
+        "speculative_chunks": [],
+        "graded_chunks": [],
+        "enriched_context": [],
+        "reranked_chunks": [],
+    }
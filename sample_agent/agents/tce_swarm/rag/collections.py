@@ -0,0 +1,119 @@
+"""
+Collection Resolver for RAG Pipeline
+Rule-based mapping (vector_db_type, document_scope, target_databases) -> collection names
+
+Rules are read from `config/rag_collections.yaml` (or RAG_COLLECTIONS_CONFIG) and
+results are memoized, so resolving collections costs a dictionary lookup.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+import os
+import re
+import threading
+
+import yaml
+
+from .index.text import normalize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COLLECTIONS_CONFIG = os.environ.get(
+    "RAG_COLLECTIONS_CONFIG",
+    str(Path(__file__).resolve().parents[4] / "config" / "rag_collections.yaml"),
+)
+
+_PLACEHOLDER_RE = re.compile(r"\{(\w+)\}")
+_UNSAFE_RE = re.compile(r"[^a-z0-9-]+")
+
+_MISSING = object()
+
+MemoKey = Tuple[Optional[str], Optional[str], Tuple[str, ...], Optional[str], Optional[str]]
+
+
+def _slug(value: str) -> str:
+    # Nomes válidos para o índice local e para Azure AI Search (minúsculas, dígitos, hífen)
+    return _UNSAFE_RE.sub("-", normalize(value)).strip("-")
+
+
+class CollectionResolver:
+    """
+    Resolve coleções a partir das regras do YAML.
+
+    `resolve` retorna None apenas para escopos desconhecidos com `llm_fallback`
+    habilitado; nesse caso o chamador decide via LLM.
+    """
+
+    def __init__(self, rules: Optional[Dict[str, Any]] = None):
+        rules = rules or {}
+        self.scopes: Dict[str, List[str]] = rules.get("scopes") or {"global": ["global"]}
+        self.default_scope: str = rules.get("default_scope", "global")
+        self.target_databases: Dict[str, str] = rules.get("target_databases") or {}
+        self.llm_fallback: bool = bool(rules.get("llm_fallback", False))
+        self._memo: Dict[MemoKey, Optional[List[str]]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_yaml(cls, path: str = DEFAULT_COLLECTIONS_CONFIG) -> "CollectionResolver":
+        try:
+            with open(path, encoding="utf-8") as f:
+                rules = yaml.safe_load(f) or {}
+        except (OSError, yaml.YAMLError) as e:
+            logger.error(f"Failed to load collection rules {path}: {e}")
+            rules = {}
+        return cls(rules)
+
+    def resolve(
+        self,
+        vector_db_type: Optional[str],
+        document_scope: Optional[str],
+        target_databases: Optional[Sequence[str]] = None,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+    ) -> Optional[List[str]]:
+        key = (vector_db_type, document_scope, tuple(target_databases or ()), user_id, session_id)
+        memo = self._memo.get(key, _MISSING)
+        if memo is not _MISSING:
+            return list(memo) if memo is not None else None
+
+        names = self._resolve(document_scope, target_databases or (), {"user_id": user_id, "session_id": session_id})
+        with self._lock:
+            self._memo[key] = names
+        return list(names) if names is not None else None
+
+    def _resolve(
+        self, document_scope: Optional[str], target_databases: Sequence[str], values: Dict[str, Optional[str]]
+    ) -> Optional[List[str]]:
+        scope = document_scope or self.default_scope
+        templates = self.scopes.get(scope)
+        if templates is None:
+            if self.llm_fallback:
+                return None
+            logger.warning(f"Unknown document_scope {scope!r}; using {self.default_scope!r} collections")
+            templates = self.scopes.get(self.default_scope, ["global"])
+
+        names: List[str] = []
+        for template in templates:
+            fields = _PLACEHOLDER_RE.findall(template)
+            if any(not values.get(field) for field in fields):
+                continue
+            names.append(template.format(**{field: _slug(values[field]) for field in fields}))
+        for database in target_databases:
+            if database in self.target_databases:
+                names.append(self.target_databases[database])
+
+        return list(dict.fromkeys(names)) or ["global"]
+
+
+_RESOLVER: Optional[CollectionResolver] = None
+_RESOLVER_LOCK = threading.Lock()
+
+
+def get_collection_resolver() -> CollectionResolver:
+    """Resolver process-wide carregado do YAML na primeira chamada"""
+    global _RESOLVER
+    with _RESOLVER_LOCK:
+        if _RESOLVER is None:
+            _RESOLVER = CollectionResolver.from_yaml()
+    return _RESOLVER
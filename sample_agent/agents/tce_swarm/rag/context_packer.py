@@ -0,0 +1,166 @@
+"""
+Context Packer for RAG Pipeline
+Token-budgeted generation context with MMR selection and near-duplicate collapsing
+
+Reranked chunks are picked greedily by maximal marginal relevance; a chunk whose
+embedding is almost identical to one already packed (consolidated legislation
+repeats articles across versions) is collapsed instead of packed. Packing stops
+when the token budget of the target model is exhausted.
+"""
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence
+import logging
+import os
+import re
+
+import numpy as np
+
+from .models.chunks import RerankedChunk
+from .processors.text_chunker import CHARS_PER_TOKEN
+from .reranker import chunk_embeddings
+
+try:
+    # Opcional: vem com langchain-openai
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Tokens de contexto por modelo de geração (RAG_CONTEXT_TOKENS sobrepõe)
+CONTEXT_TOKEN_BUDGETS = {
+    "openai:gpt-4o-mini": 6000,
+    "openai:gpt-4o": 8000,
+    "groq:llama-3.1-8b-instant": 3000,
+}
+DEFAULT_CONTEXT_TOKENS = 4000
+
+# Peso da relevância contra a diversidade no MMR
+MMR_LAMBDA = 0.7
+# Cosseno a partir do qual dois chunks são considerados o mesmo trecho
+DUPLICATE_SIMILARITY = 0.92
+
+# Marcadores de citação na resposta: "[2]", "[1, 3]"
+CITATION_MARKER_RE = re.compile(r"\[(\d+(?:\s*,\s*\d+)*)\]")
+# Início de cada entrada numerada do contexto empacotado
+_ENTRY_RE = re.compile(r"(?:^|\n\n)\[(\d+)\] ")
+
+
+@dataclass
+class PackedContext:
+    """Contexto numerado pronto para o prompt e os chunks na ordem dos índices [i]"""
+
+    chunks: List[RerankedChunk] = field(default_factory=list)
+    context: str = ""
+    tokens: int = 0
+    collapsed: int = 0
+    over_budget: int = 0
+
+
+@lru_cache(maxsize=8)
+def token_counter(model_name: str) -> Callable[[str], int]:
+    """
+    Contador de tokens do modelo, resolvido uma vez por processo.
+
+    tiktoken baixa o BPE do encoding na primeira resolução; sem tiktoken, para modelos
+    que ele não conhece ou se o download falhar, estima por caracteres. O método
+    escolhido é registrado no log.
+    """
+    if tiktoken is None:
+        logger.warning(f"tiktoken not installed; estimating {model_name} tokens as chars/{CHARS_PER_TOKEN}")
+        return _estimate_tokens
+    try:
+        encoding = tiktoken.encoding_for_model(model_name.split(":")[-1])
+    except KeyError:
+        logger.info(f"No tiktoken encoding for {model_name}; estimating tokens as chars/{CHARS_PER_TOKEN}")
+        return _estimate_tokens
+    except Exception as e:
+        logger.warning(
+            f"Failed to load tiktoken encoding for {model_name} ({type(e).__name__}: {e}); "
+            f"estimating tokens as chars/{CHARS_PER_TOKEN}"
+        )
+        return _estimate_tokens
+    logger.info(f"Counting {model_name} tokens with tiktoken encoding {encoding.name}")
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def count_tokens(text: str, model_name: str) -> int:
+    """Tokens do texto no modelo (estimativa por caracteres sem tiktoken)"""
+    return token_counter(model_name)(text)
+
+
+def context_budget(model_name: str) -> int:
+    override = os.environ.get("RAG_CONTEXT_TOKENS")
+    if override:
+        return int(override)
+    return CONTEXT_TOKEN_BUDGETS.get(model_name, DEFAULT_CONTEXT_TOKENS)
+
+
+def _entry(index: int, chunk: RerankedChunk) -> str:
+    return f"[{index}] {chunk.chunk.chunk.content}"
+
+
+def marker_indices(marker: re.Match) -> List[int]:
+    """Índices de um marcador casado por CITATION_MARKER_RE ("[1, 3]" -> [1, 3])"""
+    return [int(number) for number in re.findall(r"\d+", marker.group(1))]
+
+
+def context_entries(context: str) -> Dict[int, str]:
+    """Inverso do empacotamento: índice [i] -> conteúdo do chunk no contexto"""
+    starts = list(_ENTRY_RE.finditer(context or ""))
+    return {
+        int(match.group(1)): context[match.end(): starts[i + 1].start() if i + 1 < len(starts) else len(context)]
+        for i, match in enumerate(starts)
+    }
+
+
+def pack_context(
+    reranked: Sequence[RerankedChunk],
+    model_name: str,
+    token_budget: Optional[int] = None,
+    vector_db_type: Optional[str] = None,
+    mmr_lambda: float = MMR_LAMBDA,
+    duplicate_similarity: float = DUPLICATE_SIMILARITY,
+) -> PackedContext:
+    """Seleciona por MMR, colapsa quase-duplicatas e respeita o orçamento de tokens"""
+    budget = context_budget(model_name) if token_budget is None else token_budget
+    packed = PackedContext()
+    if not reranked:
+        return packed
+
+    vectors = chunk_embeddings([chunk.chunk.chunk for chunk in reranked], vector_db_type)
+    similarity = vectors @ vectors.T
+    relevance = np.asarray([chunk.final_score for chunk in reranked], dtype=np.float32)
+    count = token_counter(model_name)
+    separator_tokens = count("\n\n")
+
+    remaining = np.ones(len(reranked), dtype=bool)
+    # Maior similaridade de cada candidato com os já selecionados
+    redundancy = np.zeros(len(reranked), dtype=np.float32)
+    while remaining.any():
+        mmr = np.where(remaining, mmr_lambda * relevance - (1 - mmr_lambda) * redundancy, -np.inf)
+        row = int(np.argmax(mmr))
+        remaining[row] = False
+
+        if packed.chunks and redundancy[row] >= duplicate_similarity:
+            packed.collapsed += 1
+            continue
+
+        entry = _entry(len(packed.chunks) + 1, reranked[row])
+        cost = count(entry) + (separator_tokens if packed.chunks else 0)
+        if packed.tokens + cost > budget:
+            packed.over_budget += 1
+            continue
+
+        packed.chunks.append(reranked[row])
+        packed.tokens += cost
+        redundancy = np.maximum(redundancy, similarity[row])
+
+    packed.context = "\n\n".join(_entry(i + 1, chunk) for i, chunk in enumerate(packed.chunks))
+    return packed
@@ -4,30 +4,92 @@ Implements complete RAG pipeline with customized workflow and conditional edges
 """
 
 from langgraph.graph import StateGraph, END
+from langgraph.graph.state import CompiledStateGraph
 from langsmith import traceable
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Optional, Set, Union
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
 
 from sample_agent.agents.tce_swarm.rag.models.state import RAGState
+from sample_agent.utils import register_agent_schema
 from sample_agent.agents.tce_swarm.rag.nodes import (
     vector_db_setup_node,
+    vector_db_setup_cache_key,
     query_analysis_node,
+    citation_lookup_node,
+    semantic_cache_node,
+    remember_answer,
     chunk_strategy_node,
+    chunk_strategy_cache_key,
     document_ingestion_node,
     document_retrieval_node,
+    speculative_retrieval_node,
     relevance_grading_node,
     context_enrichment_node,
     reranking_node,
     response_generation_node,
     quality_validation_node,
+    avector_db_setup_node,
+    aquery_analysis_node,
+    achunk_strategy_node,
+    adocument_retrieval_node,
+    aspeculative_retrieval_node,
+    arelevance_grading_node,
+    acontext_enrichment_node,
+    areranking_node,
+    aresponse_generation_node,
+    aquality_validation_node,
+    streaming_enabled,
+    local_ranking_node,
+    local_grades,
+    local_enrichment,
+    local_rerank,
 )
-from langgraph.cache.memory import InMemoryCache
+from sample_agent.agents.tce_swarm.rag.profiles import (
+    ENRICHMENT,
+    GRADING,
+    RERANKING,
+    VALIDATION,
+    get_profile,
+)
+from sample_agent.agents.tce_swarm.rag.models.responses import QueryRewriteResult
+from sample_agent.agents.tce_swarm.rag.chunk_arena import store_chunks
+from sample_agent.agents.tce_swarm.rag.cache import NodeCache, get_llm_cache
 from langchain.globals import set_llm_cache
+from langgraph.types import CachePolicy
+
+logger = logging.getLogger(__name__)
+
+# Cache de nodes do grafo (RAG_NODE_CACHE_PATH para persistir em SQLite); stats por node
+node_cache = NodeCache()
+
+# Nodes determinísticos: chave sobre os campos que cada um lê + TTL (segundos).
+# query_analysis fica de fora: decide a ingestão a partir do manifest, que a própria
+# execução altera, e uma entrada em cache pularia arquivos recém-adicionados
+CACHE_POLICIES = {
+    "vector_db_setup": CachePolicy(key_func=vector_db_setup_cache_key, ttl=24 * 3600),
+    "chunk_strategy_selection": CachePolicy(key_func=chunk_strategy_cache_key, ttl=24 * 3600),
+}
 
 
-from langchain_community.cache import SQLiteCache
+def citation_match_decision(state: RAGState):
+    """
+    Decide se a consulta foi resolvida pelo índice de citações exatas; senão
+    dispara em paralelo a análise da query e a busca especulativa
+    """
+    return "exact" if state.citation_match else ["analyze", "speculate"]
+
 
-set_llm_cache(SQLiteCache(database_path="llm_cache.db"))
+def semantic_cache_decision(state: RAGState) -> str:
+    """Decide se a resposta veio do cache semântico"""
+    return "hit" if state.semantic_cache_hit else "miss"
 
 
 def needs_ingestion_decision(state: RAGState) -> str:
@@ -35,14 +97,55 @@ def needs_ingestion_decision(state: RAGState) -> str:
     return "ingestion" if state.ingestion_required else "continue"
 
 
+def _stages(state: RAGState):
+    return get_profile(state.execution_profile).stages(state.query_complexity)
+
+
+def grading_route_decision(state: RAGState) -> str:
+    """Decide se o perfil de execução avalia os chunks via LLM ou ordena localmente"""
+    return "grade" if GRADING in _stages(state) else "rank"
+
+
+def _query_variants(state: RAGState) -> int:
+    return get_profile(state.execution_profile).query_variants
+
+
 def needs_rewrite_decision(state: RAGState) -> str:
-    """Decide se necessita reescrita da query"""
-    return "rewrite" if state.needs_rewrite else "continue"
+    """
+    Decide se necessita reescrita da query. Com multi-query ativo (query_variants > 0)
+    as variantes já foram buscadas em paralelo e substituem o laço de reescrita
+    após o grading; sem multi-query (padrão) o laço de autocorreção roda como antes.
+    """
+    if state.needs_rewrite and not _query_variants(state):
+        return "rewrite"
+    return "continue" if ENRICHMENT in _stages(state) else "rank"
+
+
+def reranking_route_decision(state: RAGState) -> str:
+    """Decide se o perfil de execução reordena via LLM ou localmente"""
+    return "rerank" if RERANKING in _stages(state) else "rank"
+
+
+def validation_route_decision(state: RAGState) -> str:
+    """Decide se o perfil de execução valida a resposta antes de finalizar"""
+    # Em streaming a resposta já foi exibida: a validação roda depois de prepare_state
+    if streaming_enabled(state):
+        return "prepare"
+    return "validate" if VALIDATION in _stages(state) else "prepare"
+
+
+def streamed_validation_decision(state: RAGState) -> str:
+    """Valida a resposta transmitida em streaming depois de entregá-la"""
+    if state.semantic_cache_hit or state.citation_match or not state.generated_response:
+        return "end"
+    return "validate" if streaming_enabled(state) and VALIDATION in _stages(state) else "end"
 
 
 def quality_check_decision(state: RAGState) -> str:
     """Decide se qualidade está adequada ou precisa retry"""
-    if state.quality_score > 0.7:
+    # quality_score ausente: validação excedeu o orçamento (BUDGET_FALLBACKS zera o
+    # score da geração/rodada anterior), resposta segue sem retry
+    if state.quality_score is None or state.quality_score > 0.7:
         return "prepare"
     elif state.retry_count < state.max_retries:
         return "retry"
@@ -50,10 +153,8 @@ def quality_check_decision(state: RAGState) -> str:
         return "prepare"  # Força conclusão após max retries
 
 
-def query_rewrite_node(state: RAGState) -> RAGState:
-    """Node para reescrita da query quando necessário"""
-
-    from .utils import llm
+def _query_rewrite_request(state: RAGState):
+    """Monta instrução e contexto da reescrita da query"""
 
     instruction = f"""
     Reescreva a query para melhorar a recuperação de documentos:
@@ -69,29 +170,233 @@ def query_rewrite_node(state: RAGState) -> RAGState:
     Gere uma query reformulada que seja mais específica e direcionada.
     """
 
-    rewritten_query = llm(
-        instruction,
-        None,
+    n_variants = _query_variants(state)
+    if n_variants:
+        instruction += f"""
+    Gere também {n_variants} variantes (query_variants) com termos, sinônimos ou
+    recortes diferentes das já tentadas: {state.query_variants}
+    """
+
+    context = dict(
         original_query=state.original_query,
         current_query=state.processed_query,
         query_type=state.query_type,
     )
+    return instruction, context, QueryRewriteResult if n_variants else None
+
 
+def _apply_query_rewrite(state: RAGState, rewrite) -> RAGState:
+    if isinstance(rewrite, QueryRewriteResult):
+        return state.copy(
+            processed_query=rewrite.processed_query,
+            query_variants=rewrite.query_variants[: _query_variants(state)],
+            needs_rewrite=False,
+            retry_count=(state.retry_count or 0) + 1,
+        )
     return state.copy(
-        processed_query=rewritten_query,
+        processed_query=rewrite,
         needs_rewrite=False,
-        retry_count=state.retry_count + 1,
+        retry_count=(state.retry_count or 0) + 1,
     )
 
 
-def prepare_state_node(state: RAGState) -> RAGState:
+def query_rewrite_node(state: RAGState) -> RAGState:
+    """Node para reescrita da query quando necessário (query + variantes no modo multi-query)"""
+
+    from .utils import llm
+
+    instruction, context, output_model = _query_rewrite_request(state)
+    rewrite = llm(instruction, output_model, **context)
+    return _apply_query_rewrite(state, rewrite)
+
+
+async def aquery_rewrite_node(state: RAGState) -> RAGState:
+    """Versão assíncrona de query_rewrite_node"""
+
+    from .utils import allm
+
+    instruction, context, output_model = _query_rewrite_request(state)
+    rewrite = await allm(instruction, output_model, **context)
+    return _apply_query_rewrite(state, rewrite)
+
+
+# Resultado degradado de cada etapa opcional quando excede o orçamento do perfil
+BUDGET_FALLBACKS: Dict[str, Callable[[RAGState], Dict[str, Any]]] = {
+    "relevance_grading": lambda state: {**store_chunks(state, graded=local_grades(state)), "needs_rewrite": False},
+    "context_enrichment": lambda state: store_chunks(state, enriched=local_enrichment(state)),
+    "reranking": lambda state: store_chunks(state, reranked=local_rerank(state)),
+    # Sem score: resposta segue sem retry e não entra no cache semântico
+    "quality_validation": lambda state: {"needs_rewrite": False, "quality_score": None},
+}
+
+# Threads para impor orçamento às variantes síncronas. A chamada excedida termina em
+# segundo plano, limitada pelo timeout do cliente (RAG_LLM_TIMEOUT em utils.py)
+BUDGET_WORKERS = int(os.environ.get("RAG_BUDGET_WORKERS", "8"))
+_budget_executor = ThreadPoolExecutor(max_workers=BUDGET_WORKERS, thread_name_prefix="rag-budget")
+_abandoned: Set[Future] = set()
+_abandoned_lock = threading.Lock()
+
+
+def abandoned_budget_calls() -> int:
+    """Chamadas que excederam o orçamento e ainda ocupam uma thread do executor"""
+    with _abandoned_lock:
+        return len(_abandoned)
+
+
+def _abandon(name: str, future: Future, budget: float) -> None:
+    """Registra a chamada excedida até ela terminar; se ainda estava na fila, nem executa"""
+    if future.cancel():
+        logger.warning(f"{name} waited past its {budget:.1f}s budget in the queue; using local fallback")
+        return
+    with _abandoned_lock:
+        _abandoned.add(future)
+        busy = len(_abandoned)
+    future.add_done_callback(lambda done: _release(name, done))
+    logger.warning(
+        f"{name} exceeded its {budget:.1f}s budget; using local fallback "
+        f"({busy}/{BUDGET_WORKERS} budget threads busy with abandoned calls)"
+    )
+
+
+def _release(name: str, future: Future) -> None:
+    with _abandoned_lock:
+        _abandoned.discard(future)
+    logger.info(f"Abandoned {name} call finished after its budget")
+
+
+def _with_latency(name: str, state: RAGState, result: RAGState, start: float) -> RAGState:
+    latencies = {**(state.node_latencies or {}), name: time.perf_counter() - start}
+    if isinstance(result, dict):
+        return {**result, "node_latencies": latencies}
+    return result.copy(node_latencies=latencies)
+
+
+def _budgeted(name: str, func: Callable, fallback: Optional[Callable]) -> Callable:
+    def run(state: RAGState) -> RAGState:
+        start = time.perf_counter()
+        budget = get_profile(state.execution_profile).budget(name)
+        if budget is None or fallback is None:
+            result = func(state)
+            if budget is not None and time.perf_counter() - start > budget:
+                logger.warning(f"{name} exceeded its {budget:.1f}s budget (no fallback)")
+            return _with_latency(name, state, result, start)
+
+        ctx = contextvars.copy_context()
+        future = _budget_executor.submit(ctx.run, func, state)
+        try:
+            result = future.result(timeout=budget)
+        except FutureTimeoutError:
+            _abandon(name, future, budget)
+            result = fallback(state)
+        return _with_latency(name, state, result, start)
+
+    return run
+
+
+def _abudgeted(name: str, afunc: Callable, fallback: Optional[Callable]) -> Callable:
+    async def run(state: RAGState) -> RAGState:
+        start = time.perf_counter()
+        budget = get_profile(state.execution_profile).budget(name)
+        if budget is None or fallback is None:
+            result = await afunc(state)
+            if budget is not None and time.perf_counter() - start > budget:
+                logger.warning(f"{name} exceeded its {budget:.1f}s budget (no fallback)")
+            return _with_latency(name, state, result, start)
+
+        try:
+            result = await asyncio.wait_for(afunc(state), timeout=budget)
+        except asyncio.TimeoutError:
+            logger.warning(f"{name} exceeded its {budget:.1f}s budget; using local fallback")
+            result = fallback(state)
+        return _with_latency(name, state, result, start)
+
+    return run
+
+
+def _changed_fields(state: RAGState, result: Union[RAGState, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Reduz o retorno de um node ao que ele alterou: um RAGState completo
+    reescreveria todos os canais (inclusive `chunk_store`) a cada passo.
+    A comparação é com o estado anterior, então um campo zerado (None) também vale
+    """
+    if isinstance(result, dict):
+        return result
+    changed = {}
+    for name, value in result:
+        previous = getattr(state, name)
+        if value is not previous and value != previous:
+            changed[name] = value
+    return changed
+
+
+def _delta(func: Callable) -> Callable:
+    return lambda state: _changed_fields(state, func(state))
+
+
+def _adelta(afunc: Callable) -> Callable:
+    async def run(state: RAGState) -> Dict[str, Any]:
+        return _changed_fields(state, await afunc(state))
+
+    return run
+
+
+def _node(name: str, func, afunc=None, budgeted: bool = False) -> RunnableLambda:
+    """
+    Empacota um node com variantes sync/async: `invoke` usa a versão bloqueante
+    e `ainvoke`/`astream` aguardam a versão assíncrona sem bloquear o event loop.
+
+    Com `budgeted`, aplica o orçamento de latência do perfil de execução: etapas
+    com resultado degradado (BUDGET_FALLBACKS) são interrompidas ao excedê-lo,
+    as demais apenas registram o excesso. A latência vai para `node_latencies`.
+    O retorno é sempre reduzido aos campos alterados (ver `_changed_fields`).
+    """
+    if budgeted:
+        fallback = BUDGET_FALLBACKS.get(name)
+        func = _budgeted(name, func, fallback)
+        afunc = _abudgeted(name, afunc, fallback) if afunc else None
+    return RunnableLambda(_delta(func), afunc=_adelta(afunc) if afunc else None, name=name)
+
+
+def analysis_join_node(state: RAGState) -> Dict[str, Any]:
+    """Ponto de encontro da análise da query com a busca especulativa"""
+    return {}
+
+
+def prepare_state_node(state: RAGState) -> Dict[str, Any]:
     """Node para preparar o estado final com AI Message formatada"""
 
+    remember_answer(state)
+
     # Criar AIMessage com o conteúdo formatado
     ai_message = AIMessage(content=state.generated_response)
 
     # Adicionar a mensagem ao estado
-    return state.copy(messages=[ai_message])
+    return {"messages": [ai_message]}
+
+
+def streamed_validation_node(state: RAGState) -> Dict[str, Any]:
+    """
+    Validação de qualidade da resposta já transmitida: não bloqueia a exibição
+    nem dispara retry; só registra o score e grava a resposta no cache semântico
+    """
+    validated = quality_validation_node(state)
+    remember_answer(validated)
+    return {
+        "quality_score": validated.quality_score,
+        "local_validation_score": validated.local_validation_score,
+        "uncited_claims": validated.uncited_claims,
+    }
+
+
+async def astreamed_validation_node(state: RAGState) -> Dict[str, Any]:
+    """Versão assíncrona de streamed_validation_node"""
+    validated = await aquality_validation_node(state)
+    remember_answer(validated)
+    return {
+        "quality_score": validated.quality_score,
+        "local_validation_score": validated.local_validation_score,
+        "uncited_claims": validated.uncited_claims,
+    }
 
 
 @traceable(name="RAG_Pipeline", tags=["rag", "pipeline", "institutional"])
@@ -104,53 +409,120 @@ def build_rag_agent():
     rag_graph = StateGraph(RAGState)
 
     # Add all nodes
-    rag_graph.add_node("vector_db_setup", vector_db_setup_node)
-    rag_graph.add_node("query_analysis", query_analysis_node)
-    rag_graph.add_node("chunk_strategy_selection", chunk_strategy_node)
-    rag_graph.add_node("document_ingestion", document_ingestion_node)
-    rag_graph.add_node("document_retrieval", document_retrieval_node)
-    rag_graph.add_node("relevance_grading", relevance_grading_node)
-    rag_graph.add_node("query_rewrite", query_rewrite_node)
-    rag_graph.add_node("context_enrichment", context_enrichment_node)
-    rag_graph.add_node("reranking", reranking_node)
-    rag_graph.add_node("response_generation", response_generation_node)
-    rag_graph.add_node("quality_validation", quality_validation_node)
-    rag_graph.add_node("prepare_state", prepare_state_node)
+    rag_graph.add_node(
+        "vector_db_setup",
+        _node("vector_db_setup", vector_db_setup_node, avector_db_setup_node),
+        cache_policy=CACHE_POLICIES["vector_db_setup"],
+    )
+    rag_graph.add_node("citation_lookup", _node("citation_lookup", citation_lookup_node))
+    rag_graph.add_node(
+        "query_analysis",
+        _node("query_analysis", query_analysis_node, aquery_analysis_node),
+    )
+    rag_graph.add_node(
+        "speculative_retrieval",
+        _node("speculative_retrieval", speculative_retrieval_node, aspeculative_retrieval_node),
+    )
+    rag_graph.add_node("analysis_join", _node("analysis_join", analysis_join_node))
+    rag_graph.add_node("semantic_cache", _node("semantic_cache", semantic_cache_node))
+    rag_graph.add_node(
+        "chunk_strategy_selection",
+        _node("chunk_strategy_selection", chunk_strategy_node, achunk_strategy_node),
+        cache_policy=CACHE_POLICIES["chunk_strategy_selection"],
+    )
+    rag_graph.add_node("document_ingestion", _node("document_ingestion", document_ingestion_node))
+    rag_graph.add_node(
+        "document_retrieval",
+        _node("document_retrieval", document_retrieval_node, adocument_retrieval_node, budgeted=True),
+    )
+    rag_graph.add_node(
+        "relevance_grading",
+        _node("relevance_grading", relevance_grading_node, arelevance_grading_node, budgeted=True),
+    )
+    rag_graph.add_node("query_rewrite", _node("query_rewrite", query_rewrite_node, aquery_rewrite_node))
+    rag_graph.add_node(
+        "context_enrichment",
+        _node("context_enrichment", context_enrichment_node, acontext_enrichment_node, budgeted=True),
+    )
+    rag_graph.add_node("reranking", _node("reranking", reranking_node, areranking_node, budgeted=True))
+    rag_graph.add_node("local_ranking", _node("local_ranking", local_ranking_node))
+    rag_graph.add_node(
+        "response_generation",
+        _node("response_generation", response_generation_node, aresponse_generation_node, budgeted=True),
+    )
+    rag_graph.add_node(
+        "quality_validation",
+        _node("quality_validation", quality_validation_node, aquality_validation_node, budgeted=True),
+    )
+    rag_graph.add_node("prepare_state", _node("prepare_state", prepare_state_node))
+    rag_graph.add_node(
+        "streamed_validation",
+        _node("streamed_validation", streamed_validation_node, astreamed_validation_node),
+    )
 
     # Set entry point
     rag_graph.set_entry_point("vector_db_setup")
 
-    # Linear flow inicial
-    rag_graph.add_edge("vector_db_setup", "query_analysis")
+    # Fast path para citações exatas (ex.: "Art. 71 da Resolução 18.832")
+    rag_graph.add_edge("vector_db_setup", "citation_lookup")
+    rag_graph.add_conditional_edges(
+        "citation_lookup",
+        citation_match_decision,
+        {"exact": "response_generation", "analyze": "query_analysis", "speculate": "speculative_retrieval"},
+    )
+
+    # Busca especulativa na query original roda junto com a análise (LLM)
+    rag_graph.add_edge(["query_analysis", "speculative_retrieval"], "analysis_join")
 
     # Conditional para ingestão
     rag_graph.add_conditional_edges(
-        "query_analysis",
+        "analysis_join",
         needs_ingestion_decision,
-        {"ingestion": "chunk_strategy_selection", "continue": "document_retrieval"},
+        {"ingestion": "chunk_strategy_selection", "continue": "semantic_cache"},
+    )
+
+    # Perguntas equivalentes já respondidas no mesmo escopo/versão do corpus
+    rag_graph.add_conditional_edges(
+        "semantic_cache",
+        semantic_cache_decision,
+        {"hit": "prepare_state", "miss": "document_retrieval"},
     )
 
     # Fluxo de ingestão
     rag_graph.add_edge("chunk_strategy_selection", "document_ingestion")
     rag_graph.add_edge("document_ingestion", "document_retrieval")
 
-    # Fluxo principal de retrieval
-    rag_graph.add_edge("document_retrieval", "relevance_grading")
+    # Fluxo principal de retrieval: o perfil de execução (por query_complexity)
+    # decide quais etapas via LLM rodam; as puladas viram ordenação local
+    rag_graph.add_conditional_edges(
+        "document_retrieval",
+        grading_route_decision,
+        {"grade": "relevance_grading", "rank": "local_ranking"},
+    )
 
     # Conditional para reescrita
     rag_graph.add_conditional_edges(
         "relevance_grading",
         needs_rewrite_decision,
-        {"rewrite": "query_rewrite", "continue": "context_enrichment"},
+        {"rewrite": "query_rewrite", "continue": "context_enrichment", "rank": "local_ranking"},
     )
 
     # Query rewrite volta para retrieval
     rag_graph.add_edge("query_rewrite", "document_retrieval")
 
     # Fluxo final de processamento
-    rag_graph.add_edge("context_enrichment", "reranking")
+    rag_graph.add_conditional_edges(
+        "context_enrichment",
+        reranking_route_decision,
+        {"rerank": "reranking", "rank": "local_ranking"},
+    )
     rag_graph.add_edge("reranking", "response_generation")
-    rag_graph.add_edge("response_generation", "quality_validation")
+    rag_graph.add_edge("local_ranking", "response_generation")
+    rag_graph.add_conditional_edges(
+        "response_generation",
+        validation_route_decision,
+        {"validate": "quality_validation", "prepare": "prepare_state"},
+    )
 
     # Conditional para qualidade - agora direciona para prepare_state
     rag_graph.add_conditional_edges(
@@ -159,17 +531,38 @@ def build_rag_agent():
         {"retry": "query_rewrite", "prepare": "prepare_state"},
     )
 
-    # Prepare state como nó final antes do END
-    rag_graph.add_edge("prepare_state", END)
+    # Prepare state como nó final antes do END (em streaming, seguido da validação)
+    rag_graph.add_conditional_edges(
+        "prepare_state",
+        streamed_validation_decision,
+        {"validate": "streamed_validation", "end": END},
+    )
+    rag_graph.add_edge("streamed_validation", END)
+
+    # LRU em memória + SQLite WAL (RAG_LLM_CACHE_PATH, padrão llm_cache.db). Instalado
+    # aqui e não no import: os workers (spawn) da ingestão importam este pacote
+    set_llm_cache(get_llm_cache())
 
     # Compile the graph
-    compiled_graph = rag_graph.compile(cache=SQLiteCache("graph_cache.db"))
+    compiled_graph = rag_graph.compile(cache=node_cache)
     compiled_graph.name = "RAG_Agent"
+    register_agent_schema(compiled_graph.name, RAGState)
 
     return compiled_graph
 
 
-# Create the subgraph instance
-rag_subgraph = build_rag_agent()
+_RAG_SUBGRAPH: Optional[CompiledStateGraph] = None
+_RAG_SUBGRAPH_LOCK = threading.Lock()
+
+
+def __getattr__(name: str) -> Any:
+    """`rag_subgraph` é compilado no primeiro acesso, não no import do módulo"""
+    global _RAG_SUBGRAPH
+    if name != "rag_subgraph":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _RAG_SUBGRAPH_LOCK:
+        if _RAG_SUBGRAPH is None:
+            _RAG_SUBGRAPH = build_rag_agent()
+    return _RAG_SUBGRAPH
 
-__all__ = ["build_rag_agent", "rag_subgraph"]
+__all__ = ["build_rag_agent", "rag_subgraph", "node_cache"]
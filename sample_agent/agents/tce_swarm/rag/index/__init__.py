@@ -0,0 +1,56 @@
+"""
+Local Indexes for TCE-PA RAG Pipeline
+Embedded vector index and text utilities used by ingestion and retrieval
+"""
+
+from .embeddings import HashingEmbedder, LangChainEmbedder
+from .vector_store import LocalVectorStore, get_vector_store
+from .bm25 import BM25Index
+from .citations import CitationIndex, ProvisionRef, document_type_of, parse_citations
+from .hybrid import (
+    ahybrid_search,
+    amulti_hybrid_search,
+    delete_chunks,
+    get_citation_index,
+    get_sparse_index,
+    hybrid_search,
+    index_chunks,
+    multi_hybrid_search,
+    reciprocal_rank_fusion,
+)
+from .manifest import (
+    IngestionManifest,
+    ManifestEntry,
+    chunking_fingerprint,
+    content_hash,
+    document_id_for,
+    get_manifest,
+    ingestion_collection,
+)
+
+__all__ = [
+    "HashingEmbedder",
+    "LangChainEmbedder",
+    "LocalVectorStore",
+    "get_vector_store",
+    "BM25Index",
+    "get_sparse_index",
+    "CitationIndex",
+    "ProvisionRef",
+    "parse_citations",
+    "document_type_of",
+    "get_citation_index",
+    "index_chunks",
+    "delete_chunks",
+    "hybrid_search",
+    "ahybrid_search",
+    "multi_hybrid_search",
+    "amulti_hybrid_search",
+    "reciprocal_rank_fusion",
+    "IngestionManifest",
+    "ManifestEntry",
+    "get_manifest",
+    "content_hash",
+    "document_id_for",
+    "chunking_fingerprint",
+]
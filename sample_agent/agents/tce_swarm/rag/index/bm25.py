@@ -0,0 +1,163 @@
+"""
+Sparse BM25 Index for RAG Pipeline
+Inverted index with Okapi BM25 scoring for exact-term and citation-heavy queries
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import math
+import threading
+
+import numpy as np
+
+from ..models.chunks import ChunkResult
+from .text import tokenize
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+class BM25Index:
+    """
+    Índice invertido termo -> {linha: tf} com pontuação Okapi BM25.
+
+    As listas de postings são compiladas sob demanda em arrays NumPy, de modo que
+    pontuar um termo frequente é uma operação vetorizada; só os termos da query
+    são visitados. Mutação invalida apenas os postings dos termos afetados.
+    """
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._compiled: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._rows: Dict[str, int] = {}
+        self._row_ids: List[Optional[str]] = []
+        self._row_terms: List[List[str]] = []
+        self._free_rows: List[int] = []
+        self._doc_len = np.zeros(0, dtype=np.float32)
+        self._row_collection = np.zeros(0, dtype=np.int32)
+        self._collection_codes: Dict[str, int] = {}
+        self._total_len = 0.0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _allocate_row(self, chunk_id: str) -> int:
+        if self._free_rows:
+            row = self._free_rows.pop()
+            self._row_ids[row] = chunk_id
+            return row
+        row = len(self._row_ids)
+        self._row_ids.append(chunk_id)
+        self._row_terms.append([])
+        if row >= len(self._doc_len):
+            capacity = max(64, 2 * len(self._doc_len))
+            self._doc_len = np.resize(self._doc_len, capacity)
+            self._row_collection = np.resize(self._row_collection, capacity)
+        return row
+
+    def add(self, collection: str, chunks: Sequence[ChunkResult]) -> None:
+        """Indexa (ou reindexa) chunks de uma coleção"""
+        with self._lock:
+            self._delete_locked([chunk.chunk_id for chunk in chunks])
+            code = self._collection_codes.setdefault(collection, len(self._collection_codes))
+            for chunk in chunks:
+                row = self._allocate_row(chunk.chunk_id)
+                self._rows[chunk.chunk_id] = row
+                terms = Counter(tokenize(chunk.content, drop_stopwords=True))
+                for term, tf in terms.items():
+                    self._postings.setdefault(term, {})[row] = tf
+                    self._compiled.pop(term, None)
+                length = sum(terms.values())
+                self._row_terms[row] = list(terms)
+                self._doc_len[row] = length
+                self._row_collection[row] = code
+                self._total_len += length
+
+    def delete(self, chunk_ids: Iterable[str]) -> None:
+        with self._lock:
+            self._delete_locked(chunk_ids)
+
+    def _delete_locked(self, chunk_ids: Iterable[str]) -> None:
+        for chunk_id in chunk_ids:
+            row = self._rows.pop(chunk_id, None)
+            if row is None:
+                continue
+            for term in self._row_terms[row]:
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(row, None)
+                    if not postings:
+                        del self._postings[term]
+                self._compiled.pop(term, None)
+            self._total_len -= float(self._doc_len[row])
+            self._doc_len[row] = 0
+            self._row_ids[row] = None
+            self._row_terms[row] = []
+            self._free_rows.append(row)
+
+    def _compiled_postings(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        compiled = self._compiled.get(term)
+        if compiled is None:
+            postings = self._postings.get(term)
+            if not postings:
+                return None
+            compiled = (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=np.float32, count=len(postings)),
+            )
+            self._compiled[term] = compiled
+        return compiled
+
+    def _scores_locked(self, query: str) -> np.ndarray:
+        """Score BM25 da query para todas as linhas do índice"""
+        n_docs = len(self._rows)
+        n_rows = len(self._row_ids)
+        scores = np.zeros(n_rows, dtype=np.float32)
+        if n_docs == 0:
+            return scores
+        doc_len = self._doc_len[:n_rows]
+        norm = self.k1 * (1 - self.b + self.b * doc_len / (self._total_len / n_docs))
+        for term in set(tokenize(query, drop_stopwords=True)):
+            compiled = self._compiled_postings(term)
+            if compiled is None:
+                continue
+            rows, tf = compiled
+            idf = math.log(1 + (n_docs - len(rows) + 0.5) / (len(rows) + 0.5))
+            scores[rows] += idf * tf * (self.k1 + 1) / (tf + norm[rows])
+        return scores
+
+    def score_chunks(self, query: str, chunk_ids: Sequence[str]) -> np.ndarray:
+        """Score BM25 da query para chunks específicos (0 para chunks fora do índice)"""
+        with self._lock:
+            scores = self._scores_locked(query)
+            rows = np.asarray([self._rows.get(chunk_id, -1) for chunk_id in chunk_ids], dtype=np.int64)
+            result = np.zeros(len(rows), dtype=np.float32)
+            known = rows >= 0
+            result[known] = scores[rows[known]]
+            return result
+
+    def search(
+        self,
+        query: str,
+        collections: Optional[Sequence[str]] = None,
+        k: int = 10,
+    ) -> List[Tuple[str, float]]:
+        """Top-k (chunk_id, score BM25) restrito às coleções informadas"""
+        with self._lock:
+            if not self._rows:
+                return []
+            n_rows = len(self._row_ids)
+            scores = self._scores_locked(query)
+
+            if collections is not None:
+                codes = [self._collection_codes[c] for c in collections if c in self._collection_codes]
+                scores[~np.isin(self._row_collection[:n_rows], codes)] = 0
+
+            candidates = np.flatnonzero(scores > 0)
+            if len(candidates) > k:
+                candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+            ranked = candidates[np.argsort(-scores[candidates])]
+            return [(self._row_ids[row], float(scores[row])) for row in ranked]
@@ -0,0 +1,202 @@
+"""
+Exact Citation Index for RAG Pipeline
+Inverted index (document number, article, paragraph) -> chunk IDs for legislation
+
+Headings are detected with the structure patterns of TCE_DoclingProcessor
+(`Art.`, `§`, `Parágrafo único`, document headers such as `RESOLUÇÃO nº ...`).
+Queries naming a specific provision are answered by a dictionary lookup.
+"""
+
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+import re
+import threading
+
+from ..models.chunks import ChunkResult
+from .text import normalize
+
+# Tipos de documento reconhecidos -> query_type do RAGState
+DOCUMENT_TYPES = {
+    "resolucao": "resolucao",
+    "lei complementar": "legislation",
+    "lei": "legislation",
+    "decreto": "legislation",
+    "instrucao normativa": "legislation",
+    "regimento interno": "legislation",
+    "portaria": "legislation",
+    "ato": "legislation",
+    "acordao": "acordao",
+}
+
+_DOC_TYPES_RE = "|".join(sorted(DOCUMENT_TYPES, key=len, reverse=True))
+_NUMBER = r"(\d+(?:[.,/]\d+)*)"
+
+# Referência a documento: "Resolução nº 18.832", "Lei Complementar 81"
+_DOC_RE = re.compile(rf"\b({_DOC_TYPES_RE})\s*(?:n[o.]*\s*)?{_NUMBER}")
+# Referências em texto livre (consultas)
+_ART_RE = re.compile(r"\bart(?:igo)?s?\.?\s*(\d+)")
+_PAR_RE = re.compile(r"(?:§\s*(\d+)|paragrafo\s+(unico|\d+))")
+# Cabeçalhos estruturais no início da linha (definições, não menções)
+_DOC_HEADING_RE = re.compile(rf"^\s*#*\s*{_DOC_RE.pattern}[^\n]*?(?:[-–:]\s*|$)")
+_ART_HEADING_RE = re.compile(r"^\s*art(?:igo)?\.?\s*(\d+)")
+_PAR_HEADING_RE = re.compile(r"^\s*(?:§\s*(\d+)|paragrafo\s+(unico))")
+
+
+# Data de emissão no cabeçalho: "de 15 de março de 2016" ou "15/03/2016"
+_MONTHS = {
+    name: number
+    for number, name in enumerate(
+        ("janeiro", "fevereiro", "marco", "abril", "maio", "junho", "julho",
+         "agosto", "setembro", "outubro", "novembro", "dezembro"),
+        start=1,
+    )
+}
+_DATE_RE = re.compile(
+    rf"\b(\d{{1,2}})[oº]?\s+de\s+({'|'.join(_MONTHS)})\s+de\s+(\d{{4}})\b|\b(\d{{1,2}})/(\d{{1,2}})/(\d{{4}})\b"
+)
+# Só o cabeçalho: datas no corpo costumam ser de atos citados, não do documento
+ISSUE_DATE_HEADER_CHARS = 1500
+
+
+class ProvisionRef(NamedTuple):
+    """Dispositivo citado: número do documento, artigo e parágrafo (opcional)"""
+    document_number: str
+    article: str
+    paragraph: Optional[str] = None
+    document_type: Optional[str] = None
+
+
+def _digits(number: str) -> str:
+    return re.sub(r"\D", "", number)
+
+
+def document_type_of(text: str) -> Optional[str]:
+    """Tipo do primeiro documento mencionado no texto (chave de DOCUMENT_TYPES, ex.: "lei complementar")"""
+    match = _DOC_RE.search(normalize(text))
+    return match.group(1) if match else None
+
+
+def issue_date(text: str) -> Optional[str]:
+    """
+    Data de emissão do documento (ISO, "2016-03-15"): a primeira data do
+    cabeçalho, ex.: "RESOLUÇÃO Nº 18.832, DE 15 DE MARÇO DE 2016". None sem data
+    """
+    for match in _DATE_RE.finditer(normalize(text[:ISSUE_DATE_HEADER_CHARS])):
+        if match.group(1):
+            day, month, year = int(match.group(1)), _MONTHS[match.group(2)], int(match.group(3))
+        else:
+            day, month, year = int(match.group(4)), int(match.group(5)), int(match.group(6))
+        try:
+            return date(year, month, day).isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_citations(text: str) -> List[ProvisionRef]:
+    """
+    Extrai dispositivos citados em uma consulta, ex.:
+    "Art. 71, § 2º da Resolução 18.832" -> ProvisionRef("18832", "71", "2", "resolucao")
+    """
+    normalized = normalize(text)
+    documents = _DOC_RE.findall(normalized)
+    articles = _ART_RE.findall(normalized)
+    if not documents or not articles:
+        return []
+    paragraph_match = _PAR_RE.search(normalized)
+    paragraph = (paragraph_match.group(1) or paragraph_match.group(2)) if paragraph_match else None
+
+    doc_type, number = documents[0]
+    return [
+        ProvisionRef(_digits(number), article, paragraph, DOCUMENT_TYPES[doc_type])
+        for article in dict.fromkeys(articles)
+    ]
+
+
+class CitationIndex:
+    """
+    Índice (documento, artigo, parágrafo) -> chunk_ids.
+
+    Os chunks de um documento são percorridos em ordem (chunk_index), mantendo o
+    documento/artigo/parágrafo corrente, de modo que um chunk que só continua o
+    texto de um artigo também é associado a ele.
+    """
+
+    def __init__(self):
+        self._keys: Dict[Tuple[str, str, Optional[str]], List[str]] = defaultdict(list)
+        self._chunk_keys: Dict[str, Set[Tuple[str, str, Optional[str]]]] = {}
+        self._chunk_collection: Dict[str, str] = {}
+        self._document_types: Dict[str, str] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, collection: str, chunks: Sequence[ChunkResult]) -> None:
+        """Indexa chunks agrupados por documento na ordem de chunk_index"""
+        by_document: Dict[Optional[str], List[ChunkResult]] = defaultdict(list)
+        for chunk in chunks:
+            by_document[chunk.metadata.document_id].append(chunk)
+        with self._lock:
+            self._delete_locked([chunk.chunk_id for chunk in chunks])
+            for document_chunks in by_document.values():
+                document_chunks.sort(key=lambda c: c.metadata.chunk_index or 0)
+                self._add_document(collection, document_chunks)
+
+    def _add_document(self, collection: str, chunks: List[ChunkResult]) -> None:
+        document = article = paragraph = None
+        for chunk in chunks:
+            keys = set()
+            for line in normalize(chunk.content).splitlines():
+                heading = _DOC_HEADING_RE.match(line)
+                if heading:
+                    doc_type, number = heading.group(1), _digits(heading.group(2))
+                    if number != document:
+                        document, article, paragraph = number, None, None
+                        self._document_types[document] = DOCUMENT_TYPES[doc_type]
+                    line = line[heading.end():]
+                art = _ART_HEADING_RE.match(line)
+                if art:
+                    article, paragraph = art.group(1), None
+                par = _PAR_HEADING_RE.match(line)
+                if par:
+                    paragraph = par.group(1) or par.group(2)
+                if document and article:
+                    keys.add((document, article, None))
+                    if paragraph:
+                        keys.add((document, article, paragraph))
+            for key in keys:
+                self._keys[key].append(chunk.chunk_id)
+            self._chunk_keys[chunk.chunk_id] = keys
+            self._chunk_collection[chunk.chunk_id] = collection
+
+    def delete(self, chunk_ids: Iterable[str]) -> None:
+        with self._lock:
+            self._delete_locked(chunk_ids)
+
+    def _delete_locked(self, chunk_ids: Iterable[str]) -> None:
+        for chunk_id in chunk_ids:
+            for key in self._chunk_keys.pop(chunk_id, ()):
+                ids = self._keys.get(key)
+                if ids is not None:
+                    ids.remove(chunk_id)
+                    if not ids:
+                        del self._keys[key]
+            self._chunk_collection.pop(chunk_id, None)
+
+    def document_type(self, document_number: str) -> Optional[str]:
+        return self._document_types.get(document_number)
+
+    def lookup(
+        self, refs: Sequence[ProvisionRef], collections: Optional[Sequence[str]] = None
+    ) -> List[str]:
+        """chunk_ids dos dispositivos citados (ordem do documento, sem duplicatas)"""
+        allowed = set(collections) if collections is not None else None
+        with self._lock:
+            chunk_ids: Dict[str, None] = {}
+            for ref in refs:
+                for chunk_id in self._keys.get((ref.document_number, ref.article, ref.paragraph), ()):
+                    if allowed is None or self._chunk_collection.get(chunk_id) in allowed:
+                        chunk_ids[chunk_id] = None
+        return list(chunk_ids)
@@ -0,0 +1,69 @@
+"""
+Embeddings for the Local Vector Index
+NumPy feature-hashing embedder with an adapter for LangChain embedding models
+"""
+
+from typing import List, Sequence
+import zlib
+
+import numpy as np
+
+from .text import tokenize
+
+DEFAULT_EMBEDDING_DIM = 512
+
+
+class HashingEmbedder:
+    """
+    Embedder local e determinístico baseado em feature hashing (unigramas + bigramas).
+
+    Não depende de rede nem de modelo externo: o mesmo texto sempre gera o mesmo
+    vetor em qualquer processo, o que permite persistir o índice em disco.
+    """
+
+    def __init__(self, dim: int = DEFAULT_EMBEDDING_DIM):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[str]:
+        tokens = tokenize(text, drop_stopwords=True)
+        return tokens + [f"{a}_{b}" for a, b in zip(tokens, tokens[1:])]
+
+    def embed_documents(self, texts: Sequence[str]) -> np.ndarray:
+        """Matriz (n, dim) float32 com linhas normalizadas (norma L2 = 1)"""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        rows, cols, signs = [], [], []
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                rows.append(row)
+                cols.append(h % self.dim)
+                signs.append(1.0 if (h >> 16) & 1 else -1.0)
+        if rows:
+            np.add.at(matrix, (np.asarray(rows), np.asarray(cols)), np.asarray(signs, dtype=np.float32))
+        # tf sublinear preserva o sinal do hashing
+        np.copyto(matrix, np.sign(matrix) * np.log1p(np.abs(matrix)))
+        return _l2_normalize(matrix)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self.embed_documents([text])[0]
+
+
+class LangChainEmbedder:
+    """Adapta um `langchain_core.embeddings.Embeddings` para a interface NumPy do índice"""
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+
+    def embed_documents(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.asarray(self.embeddings.embed_documents(list(texts)), dtype=np.float32)
+        return _l2_normalize(vectors)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        vector = np.asarray(self.embeddings.embed_query(text), dtype=np.float32)
+        return _l2_normalize(vector[None, :])[0]
+
+
+def _l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
@@ -0,0 +1,177 @@
+"""
+Hybrid Retrieval for RAG Pipeline
+Dense + BM25 search executed in parallel and merged with reciprocal-rank fusion
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import asyncio
+import threading
+
+import numpy as np
+
+from ..models.chunks import ChunkResult
+from .bm25 import BM25Index
+from .citations import CitationIndex
+from .vector_store import DEFAULT_VECTOR_DB_TYPE, SearchHit, get_vector_store
+
+# Constante de suavização do RRF (Cormack et al., 2009)
+RRF_K = 60
+# Profundidade de cada ranking antes da fusão
+CANDIDATES_PER_INDEX = 20
+
+_SPARSE_INDEXES: Dict[str, BM25Index] = {}
+_CITATION_INDEXES: Dict[str, CitationIndex] = {}
+_SPARSE_LOCK = threading.Lock()
+_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hybrid-search")
+
+
+def get_sparse_index(vector_db_type: Optional[str] = None) -> BM25Index:
+    """
+    Índice BM25 process-wide do backend; na primeira chamada é reconstruído a
+    partir dos chunks persistidos no vector store.
+    """
+    backend = vector_db_type or DEFAULT_VECTOR_DB_TYPE
+    with _SPARSE_LOCK:
+        index = _SPARSE_INDEXES.get(backend)
+        if index is None:
+            index = _SPARSE_INDEXES[backend] = BM25Index()
+            store = get_vector_store(backend)
+            for collection in store.collections():
+                index.add(collection, store.chunks(collection))
+    return index
+
+
+def get_citation_index(vector_db_type: Optional[str] = None) -> CitationIndex:
+    """Índice de citações exatas process-wide, reconstruído do vector store na primeira chamada"""
+    backend = vector_db_type or DEFAULT_VECTOR_DB_TYPE
+    with _SPARSE_LOCK:
+        index = _CITATION_INDEXES.get(backend)
+        if index is None:
+            index = _CITATION_INDEXES[backend] = CitationIndex()
+            store = get_vector_store(backend)
+            for collection in store.collections():
+                index.add(collection, store.chunks(collection))
+    return index
+
+
+def index_chunks(
+    vector_db_type: Optional[str],
+    collection: str,
+    chunks: Sequence[ChunkResult],
+    vectors: Optional[np.ndarray] = None,
+) -> None:
+    """Indexa chunks nos índices denso, esparso e de citações (vetores opcionais pré-computados)"""
+    get_vector_store(vector_db_type).upsert(collection, chunks, vectors)
+    get_sparse_index(vector_db_type).add(collection, chunks)
+    get_citation_index(vector_db_type).add(collection, chunks)
+
+
+def delete_chunks(vector_db_type: Optional[str], chunk_ids: Iterable[str]) -> None:
+    chunk_ids = list(chunk_ids)
+    get_vector_store(vector_db_type).delete(chunk_ids)
+    get_sparse_index(vector_db_type).delete(chunk_ids)
+    get_citation_index(vector_db_type).delete(chunk_ids)
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]],
+    k: int = RRF_K,
+    weights: Optional[Sequence[float]] = None,
+) -> List[Tuple[str, float]]:
+    """
+    Funde rankings de IDs: score(d) = Σ w_i / (k + rank_i(d)), rank iniciando em 1.
+    IDs repetidos entre rankings são deduplicados naturalmente.
+    """
+    weights = weights or [1.0] * len(rankings)
+    fused: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, item_id in enumerate(ranking, start=1):
+            fused[item_id] = fused.get(item_id, 0.0) + weight / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+def _dense_ids(query: str, vector_db_type: Optional[str], collections, depth: int) -> List[str]:
+    hits = get_vector_store(vector_db_type).search(query, collections, k=depth)
+    return [chunk.chunk_id for chunk, _score in hits]
+
+
+def _sparse_ids(query: str, vector_db_type: Optional[str], collections, depth: int) -> List[str]:
+    return [chunk_id for chunk_id, _score in get_sparse_index(vector_db_type).search(query, collections, k=depth)]
+
+
+def _resolve(vector_db_type: Optional[str], fused: List[Tuple[str, float]], k: int) -> List[SearchHit]:
+    store = get_vector_store(vector_db_type)
+    hits = []
+    for chunk_id, score in fused:
+        chunk = store.get(chunk_id)
+        if chunk is not None:
+            hits.append((chunk, score))
+        if len(hits) == k:
+            break
+    return hits
+
+
+def _searches(queries: Sequence[str]):
+    return [(search, query) for query in queries for search in (_dense_ids, _sparse_ids)]
+
+
+def multi_hybrid_search(
+    queries: Sequence[str],
+    vector_db_type: Optional[str] = None,
+    collections: Optional[Sequence[str]] = None,
+    k: int = 8,
+    depth: int = CANDIDATES_PER_INDEX,
+    rankings: Sequence[Sequence[str]] = (),
+) -> List[SearchHit]:
+    """
+    Busca densa e BM25 de todas as queries em paralelo (threads), fundidas num
+    único RRF - chunks repetidos entre queries são deduplicados pelo chunk_id.
+    `rankings` acrescenta rankings já calculados (ex.: busca especulativa).
+    """
+    futures = [
+        _EXECUTOR.submit(search, query, vector_db_type, collections, depth)
+        for search, query in _searches(queries)
+    ]
+    fused = reciprocal_rank_fusion([*rankings, *(future.result() for future in futures)])
+    return _resolve(vector_db_type, fused, k)
+
+
+async def amulti_hybrid_search(
+    queries: Sequence[str],
+    vector_db_type: Optional[str] = None,
+    collections: Optional[Sequence[str]] = None,
+    k: int = 8,
+    depth: int = CANDIDATES_PER_INDEX,
+    rankings: Sequence[Sequence[str]] = (),
+) -> List[SearchHit]:
+    """Versão assíncrona de multi_hybrid_search - não bloqueia o event loop"""
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(*(
+        loop.run_in_executor(_EXECUTOR, search, query, vector_db_type, collections, depth)
+        for search, query in _searches(queries)
+    ))
+    fused = reciprocal_rank_fusion([*rankings, *results])
+    return _resolve(vector_db_type, fused, k)
+
+
+def hybrid_search(
+    query: str,
+    vector_db_type: Optional[str] = None,
+    collections: Optional[Sequence[str]] = None,
+    k: int = 8,
+    depth: int = CANDIDATES_PER_INDEX,
+) -> List[SearchHit]:
+    """Busca densa e BM25 em paralelo (threads) fundidas por RRF"""
+    return multi_hybrid_search([query], vector_db_type, collections, k, depth)
+
+
+async def ahybrid_search(
+    query: str,
+    vector_db_type: Optional[str] = None,
+    collections: Optional[Sequence[str]] = None,
+    k: int = 8,
+    depth: int = CANDIDATES_PER_INDEX,
+) -> List[SearchHit]:
+    """Versão assíncrona de hybrid_search - não bloqueia o event loop"""
+    return await amulti_hybrid_search([query], vector_db_type, collections, k, depth)
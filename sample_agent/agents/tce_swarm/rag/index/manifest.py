@@ -0,0 +1,198 @@
+"""
+Ingestion Manifest for RAG Pipeline
+Content-addressed record of indexed documents: content hash + chunking config -> chunk IDs
+
+Ingestion decisions are made on bytes, not file names: a renamed file keeps its
+hash and is skipped, a file edited in place gets a new hash and is re-ingested,
+and the chunks of the version it replaces are removed from the indexes.
+"""
+
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from .vector_store import DEFAULT_INDEX_DIR, DEFAULT_VECTOR_DB_TYPE, atomic_write
+
+logger = logging.getLogger(__name__)
+
+_READ_BLOCK = 1 << 20
+
+
+@lru_cache(maxsize=4096)
+def _file_digest(path: str, size: int, mtime_ns: int) -> str:
+    # (size, mtime_ns) na chave: arquivos inalterados não são relidos a cada turno
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_READ_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def content_hash(source: str) -> str:
+    """
+    SHA-256 do conteúdo do arquivo. Fontes sem arquivo local legível (URLs,
+    caminhos remotos) são identificadas pelo próprio endereço.
+    """
+    try:
+        stat = os.stat(source)
+        return _file_digest(source, stat.st_size, stat.st_mtime_ns)
+    except OSError:
+        return hashlib.sha256(f"source:{source}".encode("utf-8")).hexdigest()
+
+
+def document_id_for(source: str, digest: str) -> str:
+    """ID estável do documento: nome do arquivo + prefixo do hash do conteúdo"""
+    stem = source.split("/")[-1].split(".")[0]
+    return f"{stem}-{digest[:12]}"
+
+
+def ingestion_collection(collection_names: Optional[List[str]]) -> str:
+    """Coleção em que os documentos do turno são ingeridos (a primeira resolvida)"""
+    return (collection_names or ["global"])[0]
+
+
+def chunking_fingerprint(digest: str, chunker: str, chunk_config: Dict[str, Any], collection: str) -> str:
+    """Chave do manifest: mesmo conteúdo com outra estratégia/tamanho de chunk é outra entrada"""
+    config = json.dumps(chunk_config or {}, sort_keys=True, default=str)
+    payload = f"{digest}\x00{chunker}\x00{config}\x00{collection}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ManifestEntry:
+    """Documento indexado e os chunk IDs gravados para ele"""
+
+    document_id: str
+    content_hash: str
+    source: str
+    collection: str
+    chunker: str
+    chunk_config: Dict[str, Any] = field(default_factory=dict)
+    chunk_ids: List[str] = field(default_factory=list)
+    indexed_at: float = field(default_factory=time.time)
+
+
+class IngestionManifest:
+    """
+    Manifest persistente de ingestão (JSON, gravação atômica).
+
+    Uma entrada por fingerprint (hash do conteúdo + chunker + config + coleção).
+    Ao registrar uma nova versão de um documento, entradas anteriores da mesma
+    fonte ou do mesmo conteúdo na mesma coleção são substituídas e seus chunk
+    IDs retornados para remoção dos índices; as de outras coleções ficam.
+    `version` muda a cada alteração do corpus.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.version = 0
+        self._entries: Dict[str, ManifestEntry] = {}
+        self._by_hash: Dict[str, Set[str]] = {}
+        self._by_source: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+        if path:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, fingerprint: str) -> Optional[ManifestEntry]:
+        return self._entries.get(fingerprint)
+
+    def has_content(self, digest: str, collection: Optional[str] = None) -> bool:
+        """Se o conteúdo já foi indexado na coleção (qualquer coleção se None), com qualquer chunking"""
+        return bool(self.entries_for_content(digest, collection))
+
+    def entries_for_content(self, digest: str, collection: Optional[str] = None) -> List[ManifestEntry]:
+        with self._lock:
+            return self._in_collection(self._by_hash.get(digest, ()), collection)
+
+    def record(self, fingerprint: str, entry: ManifestEntry) -> List[str]:
+        """Registra a entrada; retorna chunk IDs obsoletos das versões substituídas na mesma coleção"""
+        with self._lock:
+            same = self._by_hash.get(entry.content_hash, set()) | self._by_source.get(entry.source, set())
+            replaced = {
+                old for old in same - {fingerprint} if self._entries[old].collection == entry.collection
+            }
+            stale: Set[str] = set()
+            for old in replaced:
+                stale.update(self._remove(old).chunk_ids)
+            if fingerprint in self._entries:
+                stale.update(self._remove(fingerprint).chunk_ids)
+            self._add(fingerprint, entry)
+            self.version += 1
+        return sorted(stale - set(entry.chunk_ids))
+
+    def remove(self, fingerprints: Iterable[str]) -> List[str]:
+        """Remove entradas; retorna os chunk IDs que elas referenciavam"""
+        chunk_ids: List[str] = []
+        with self._lock:
+            for fingerprint in fingerprints:
+                if fingerprint in self._entries:
+                    chunk_ids.extend(self._remove(fingerprint).chunk_ids)
+                    self.version += 1
+        return chunk_ids
+
+    def _in_collection(self, fingerprints: Iterable[str], collection: Optional[str]) -> List[ManifestEntry]:
+        entries = [self._entries[fp] for fp in fingerprints]
+        return [entry for entry in entries if collection is None or entry.collection == collection]
+
+    def _add(self, fingerprint: str, entry: ManifestEntry) -> None:
+        self._entries[fingerprint] = entry
+        self._by_hash.setdefault(entry.content_hash, set()).add(fingerprint)
+        self._by_source.setdefault(entry.source, set()).add(fingerprint)
+
+    def _remove(self, fingerprint: str) -> ManifestEntry:
+        entry = self._entries.pop(fingerprint)
+        for bucket, key in ((self._by_hash, entry.content_hash), (self._by_source, entry.source)):
+            bucket[key].discard(fingerprint)
+            if not bucket[key]:
+                del bucket[key]
+        return entry
+
+    # ===== PERSISTÊNCIA =====
+
+    def persist(self) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock:
+            payload = {
+                "version": self.version,
+                "entries": {fingerprint: asdict(entry) for fingerprint, entry in self._entries.items()},
+            }
+        atomic_write(self.path, lambda f: json.dump(payload, f, ensure_ascii=False))
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                payload = json.load(f)
+            self.version = payload.get("version", 0)
+            for fingerprint, values in payload.get("entries", {}).items():
+                self._add(fingerprint, ManifestEntry(**values))
+        except (OSError, ValueError, TypeError) as e:
+            logger.error(f"Failed to load ingestion manifest {self.path}: {e}")
+
+
+_MANIFESTS: Dict[str, IngestionManifest] = {}
+_MANIFESTS_LOCK = threading.Lock()
+
+
+def get_manifest(vector_db_type: Optional[str] = None) -> IngestionManifest:
+    """Manifest process-wide do backend, persistido ao lado do índice"""
+    backend = vector_db_type or DEFAULT_VECTOR_DB_TYPE
+    with _MANIFESTS_LOCK:
+        manifest = _MANIFESTS.get(backend)
+        if manifest is None:
+            manifest = _MANIFESTS[backend] = IngestionManifest(
+                os.path.join(DEFAULT_INDEX_DIR, f"{backend}.manifest.json")
+            )
+    return manifest
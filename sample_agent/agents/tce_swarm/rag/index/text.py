@@ -0,0 +1,40 @@
+"""
+Text Normalization for RAG Indexes
+Shared tokenizer used by the embedding and sparse indexes
+"""
+
+from typing import List
+import re
+import unicodedata
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_NUMBER_RE = re.compile(r"\d+(?:[.,/]\d+)+")
+
+# Palavras funcionais do português que não discriminam documentos
+STOPWORDS = frozenset(
+    """
+    a o as os um uma uns umas de do da dos das em no na nos nas por pelo pela
+    pelos pelas para com sem sob sobre entre ate e ou que se ao aos
+    como mais menos ja nao sim ser ter seu sua seus suas este esta estes estas
+    esse essa esses essas isso isto aquele aquela qual quais quando onde
+    """.split()
+)
+
+
+def normalize(text: str) -> str:
+    """Minúsculas e remoção de acentos ("Resolução" -> "resolucao")"""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str, drop_stopwords: bool = False) -> List[str]:
+    """
+    Tokens alfanuméricos normalizados. Números compostos (ex.: "18.832") geram
+    as partes ("18", "832") e a forma unida ("18832") para casar citações exatas.
+    """
+    normalized = normalize(text)
+    tokens = _TOKEN_RE.findall(normalized)
+    tokens.extend(re.sub(r"\D", "", number) for number in _NUMBER_RE.findall(normalized))
+    if drop_stopwords:
+        tokens = [token for token in tokens if token not in STOPWORDS]
+    return tokens
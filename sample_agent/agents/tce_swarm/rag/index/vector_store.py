@@ -0,0 +1,285 @@
+"""
+Local Vector Index for RAG Pipeline
+Embedded NumPy vector store backing the `vector_db_type="lancedb"` option
+"""
+
+from typing import IO, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import json
+import logging
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from ..models.chunks import ChunkResult
+from .embeddings import HashingEmbedder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VECTOR_DB_TYPE = "lancedb"
+DEFAULT_TOP_K = 5
+DEFAULT_INDEX_DIR = os.environ.get("RAG_INDEX_DIR", ".rag_index")
+
+# Backends atendidos pelo índice embarcado
+LOCAL_BACKENDS = ("lancedb",)
+
+SearchHit = Tuple[ChunkResult, float]
+
+
+def atomic_write(path: str, write: Callable[[IO], None], binary: bool = False) -> None:
+    """
+    Grava em um arquivo temporário único no mesmo diretório e o troca por `path`
+    com os.replace: escritores concorrentes nunca intercalam nem deixam arquivo parcial
+    """
+    directory = os.path.dirname(path) or "."
+    with tempfile.NamedTemporaryFile(
+        "wb" if binary else "w",
+        encoding=None if binary else "utf-8",
+        dir=directory,
+        prefix=f".{os.path.basename(path)}.",
+        suffix=".tmp",
+        delete=False,
+    ) as f:
+        tmp_path = f.name
+        try:
+            write(f)
+        except BaseException:
+            f.close()
+            os.unlink(tmp_path)
+            raise
+    os.replace(tmp_path, path)
+
+
+class _Collection:
+    """Matriz de embeddings contígua + payload dos chunks de uma coleção"""
+
+    def __init__(self, dim: int):
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self.size = 0
+        self.chunk_ids: List[str] = []
+        self.chunks: List[ChunkResult] = []
+        self.rows: Dict[str, int] = {}
+
+    def _reserve(self, extra: int) -> None:
+        needed = self.size + extra
+        if needed <= len(self.vectors):
+            return
+        capacity = max(needed, 2 * len(self.vectors), 64)
+        grown = np.zeros((capacity, self.vectors.shape[1]), dtype=np.float32)
+        grown[: self.size] = self.vectors[: self.size]
+        self.vectors = grown
+
+    def upsert(self, chunks: Sequence[ChunkResult], vectors: np.ndarray) -> None:
+        self._reserve(len(chunks))
+        for chunk, vector in zip(chunks, vectors):
+            row = self.rows.get(chunk.chunk_id)
+            if row is None:
+                row = self.size
+                self.size += 1
+                self.rows[chunk.chunk_id] = row
+                self.chunk_ids.append(chunk.chunk_id)
+                self.chunks.append(chunk)
+            else:
+                self.chunks[row] = chunk
+            self.vectors[row] = vector
+
+    def delete(self, chunk_id: str) -> bool:
+        row = self.rows.pop(chunk_id, None)
+        if row is None:
+            return False
+        last = self.size - 1
+        if row != last:
+            # Move a última linha para a posição removida (remoção O(1))
+            self.vectors[row] = self.vectors[last]
+            self.chunk_ids[row] = self.chunk_ids[last]
+            self.chunks[row] = self.chunks[last]
+            self.rows[self.chunk_ids[row]] = row
+        self.chunk_ids.pop()
+        self.chunks.pop()
+        self.size = last
+        return True
+
+    def search(self, query_vector: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        if self.size == 0:
+            return []
+        scores = self.vectors[: self.size] @ query_vector
+        k = min(k, self.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [(int(row), float(scores[row])) for row in top]
+
+
+class LocalVectorStore:
+    """
+    Vector store em processo com busca top-k exata por similaridade de cosseno.
+
+    Cada coleção é uma matriz NumPy normalizada; a busca é um produto matriz-vetor
+    seguido de `argpartition`, o que responde em milissegundos para dezenas de
+    milhares de chunks. Opcionalmente persiste as coleções em `persist_dir`.
+    """
+
+    def __init__(self, embedder=None, persist_dir: Optional[str] = None):
+        self.embedder = embedder or HashingEmbedder()
+        self.persist_dir = persist_dir
+        self._collections: Dict[str, _Collection] = {}
+        self._chunk_collection: Dict[str, str] = {}
+        self._lock = threading.RLock()
+        if persist_dir:
+            self._load()
+
+    def collections(self) -> List[str]:
+        return sorted(self._collections)
+
+    def count(self, collection: Optional[str] = None) -> int:
+        if collection is not None:
+            return self._collections[collection].size if collection in self._collections else 0
+        return sum(c.size for c in self._collections.values())
+
+    def chunks(self, collection: str) -> List[ChunkResult]:
+        with self._lock:
+            target = self._collections.get(collection)
+            return list(target.chunks) if target else []
+
+    def get(self, chunk_id: str) -> Optional[ChunkResult]:
+        with self._lock:
+            name = self._chunk_collection.get(chunk_id)
+            if name is None:
+                return None
+            collection = self._collections[name]
+            return collection.chunks[collection.rows[chunk_id]]
+
+    def embeddings_for(self, chunks: Sequence[ChunkResult]) -> np.ndarray:
+        """Vetores dos chunks: os indexados vêm da matriz, os demais são calculados"""
+        with self._lock:
+            stored = []
+            for chunk in chunks:
+                name = self._chunk_collection.get(chunk.chunk_id)
+                collection = self._collections[name] if name is not None else None
+                stored.append(collection.vectors[collection.rows[chunk.chunk_id]].copy() if collection else None)
+        missing = [i for i, vector in enumerate(stored) if vector is None]
+        if missing:
+            computed = self.embedder.embed_documents([chunks[i].content for i in missing])
+            for i, vector in zip(missing, computed):
+                stored[i] = vector
+        if not stored:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack(stored).astype(np.float32, copy=False)
+
+    def upsert(
+        self,
+        collection: str,
+        chunks: Sequence[ChunkResult],
+        vectors: Optional[np.ndarray] = None,
+    ) -> int:
+        """Insere ou substitui chunks (por chunk_id) em uma coleção"""
+        if not chunks:
+            return 0
+        if vectors is None:
+            vectors = self.embedder.embed_documents([chunk.content for chunk in chunks])
+        with self._lock:
+            target = self._collections.get(collection)
+            if target is None:
+                target = self._collections[collection] = _Collection(vectors.shape[1])
+            for chunk in chunks:
+                previous = self._chunk_collection.get(chunk.chunk_id)
+                if previous is not None and previous != collection:
+                    self._collections[previous].delete(chunk.chunk_id)
+                self._chunk_collection[chunk.chunk_id] = collection
+            target.upsert(chunks, vectors)
+        return len(chunks)
+
+    def delete(self, chunk_ids: Iterable[str]) -> int:
+        removed = 0
+        with self._lock:
+            for chunk_id in chunk_ids:
+                name = self._chunk_collection.pop(chunk_id, None)
+                if name is not None and self._collections[name].delete(chunk_id):
+                    removed += 1
+        return removed
+
+    def search(
+        self,
+        query: str,
+        collections: Optional[Sequence[str]] = None,
+        k: int = DEFAULT_TOP_K,
+    ) -> List[SearchHit]:
+        """Top-k chunks mais similares à query, restrito às coleções informadas"""
+        return self.search_vector(self.embedder.embed_query(query), collections, k)
+
+    def search_vector(
+        self,
+        query_vector: np.ndarray,
+        collections: Optional[Sequence[str]] = None,
+        k: int = DEFAULT_TOP_K,
+    ) -> List[SearchHit]:
+        with self._lock:
+            names = self._collections if collections is None else collections
+            hits: List[SearchHit] = []
+            for name in names:
+                collection = self._collections.get(name)
+                if collection is None:
+                    continue
+                hits.extend(
+                    (collection.chunks[row], score) for row, score in collection.search(query_vector, k)
+                )
+        hits.sort(key=lambda hit: hit[1], reverse=True)
+        return hits[:k]
+
+    # ===== PERSISTÊNCIA =====
+
+    def persist(self) -> None:
+        """Grava todas as coleções em `persist_dir` (vetores .npy + payload .json)"""
+        if not self.persist_dir:
+            return
+        os.makedirs(self.persist_dir, exist_ok=True)
+        with self._lock:
+            for name, collection in self._collections.items():
+                base = os.path.join(self.persist_dir, name)
+                payload = [chunk.model_dump() for chunk in collection.chunks]
+                atomic_write(f"{base}.json", lambda f: json.dump(payload, f, ensure_ascii=False))
+                vectors = collection.vectors[: collection.size]
+                atomic_write(f"{base}.npy", lambda f: np.save(f, vectors), binary=True)
+
+    def _load(self) -> None:
+        if not os.path.isdir(self.persist_dir):
+            return
+        for filename in sorted(os.listdir(self.persist_dir)):
+            if not filename.endswith(".npy"):
+                continue
+            name = filename[: -len(".npy")]
+            base = os.path.join(self.persist_dir, name)
+            try:
+                vectors = np.load(f"{base}.npy")
+                with open(f"{base}.json", encoding="utf-8") as f:
+                    chunks = [ChunkResult(**payload) for payload in json.load(f)]
+            except (OSError, ValueError) as e:
+                logger.error(f"Failed to load collection {name}: {e}")
+                continue
+            # Vetores e payload são trocados separadamente: um par de gravações distintas é descartado
+            if len(vectors) != len(chunks):
+                logger.error(f"Failed to load collection {name}: {len(vectors)} vectors for {len(chunks)} chunks")
+                continue
+            self.upsert(name, chunks, vectors)
+
+
+_STORES: Dict[str, LocalVectorStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_vector_store(vector_db_type: Optional[str] = None) -> LocalVectorStore:
+    """
+    Retorna a instância process-wide do vector store para o backend informado.
+
+    Raises:
+        ValueError: se o backend não for atendido pelo índice embarcado
+    """
+    backend = vector_db_type or DEFAULT_VECTOR_DB_TYPE
+    if backend not in LOCAL_BACKENDS:
+        raise ValueError(f"Unsupported vector_db_type for local index: {backend}")
+    with _STORES_LOCK:
+        store = _STORES.get(backend)
+        if store is None:
+            store = _STORES[backend] = LocalVectorStore(
+                persist_dir=os.path.join(DEFAULT_INDEX_DIR, backend)
+            )
+    return store
@@ -0,0 +1,274 @@
+"""
+Parallel Ingestion Engine for RAG Pipeline
+Docling parse → Chonkie chunk in a process pool, then batched embedding and bulk upsert.
+Documents already recorded in the ingestion manifest with the same content and
+chunking are skipped; replaced versions have their old chunks removed.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+import logging
+import multiprocessing
+import os
+import time
+
+from .models.chunks import ChunkResult
+from .models.responses import IngestionResult
+from .index.citations import issue_date
+from .index.hybrid import delete_chunks, index_chunks
+from .index.manifest import IngestionManifest, ManifestEntry, chunking_fingerprint, content_hash, get_manifest
+from .index.vector_store import LOCAL_BACKENDS, get_vector_store
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IngestionConfig:
+    """Configuração de concorrência e memória da ingestão"""
+
+    # Processos de parse/chunking (CPU-bound); 1 = executa no próprio processo
+    max_workers: int = field(default_factory=lambda: os.cpu_count() or 1)
+    # Documentos em voo ao mesmo tempo - limita a memória de markdown/chunks pendentes
+    max_inflight_documents: Optional[int] = None
+    # Chunks por lote de embedding + upsert
+    embed_batch_size: int = 256
+    # "spawn" evita herdar locks/threads do processo do grafo via fork; o import do
+    # pacote no worker não instala o cache de LLM nem compila o grafo (ver graph.py)
+    start_method: str = "spawn"
+
+    @classmethod
+    def from_env(cls) -> "IngestionConfig":
+        """Lê RAG_INGESTION_WORKERS, RAG_INGESTION_MAX_INFLIGHT e RAG_INGESTION_EMBED_BATCH"""
+        config = cls()
+        if os.environ.get("RAG_INGESTION_WORKERS"):
+            config.max_workers = int(os.environ["RAG_INGESTION_WORKERS"])
+        if os.environ.get("RAG_INGESTION_MAX_INFLIGHT"):
+            config.max_inflight_documents = int(os.environ["RAG_INGESTION_MAX_INFLIGHT"])
+        if os.environ.get("RAG_INGESTION_EMBED_BATCH"):
+            config.embed_batch_size = int(os.environ["RAG_INGESTION_EMBED_BATCH"])
+        return config
+
+    def inflight_limit(self) -> int:
+        return self.max_inflight_documents or 2 * self.max_workers
+
+
+@dataclass
+class IngestionJob:
+    """Documento a ingerir com a estratégia de chunking escolhida"""
+
+    document_id: str
+    file_path: str
+    document_type: str = ""
+    chunker: str = "recursive"
+    chunk_config: Dict[str, Any] = field(default_factory=dict)
+    # SHA-256 do conteúdo; calculado pelo engine quando vazio
+    content_hash: str = ""
+
+
+def _process_document(job: IngestionJob) -> Dict[str, Any]:
+    """
+    Executado no worker: Docling → Chonkie de um documento.
+    Retorna chunks com IDs determinísticos derivados do document_id.
+    """
+    from .processors import TCE_ChonkieProcessor, TCE_DoclingProcessor
+
+    start_time = time.time()
+    try:
+        parsed = TCE_DoclingProcessor().process_document(job.file_path, job.document_type)
+        # Data de emissão do próprio documento (base do fator de recência), não da ingestão
+        issued = parsed.metadata.get("issue_date") or issue_date(parsed.raw_markdown)
+        chunks = list(
+            TCE_ChonkieProcessor().iter_chunks(
+                parsed.raw_markdown, job.chunker, job.chunk_config, document_id=job.document_id, issued=issued
+            )
+        )
+        return {
+            "document_id": job.document_id,
+            "chunks": chunks,
+            "quality_score": parsed.confidence,
+            "processing_time": time.time() - start_time,
+            "error": None,
+        }
+    except Exception as e:
+        return {
+            "document_id": job.document_id,
+            "chunks": [],
+            "quality_score": 0.0,
+            "processing_time": time.time() - start_time,
+            "error": f"{type(e).__name__}: {e}",
+        }
+
+
+def _scoped_chunks(chunks: List[ChunkResult], collection: str) -> List[ChunkResult]:
+    """
+    IDs dos chunks prefixados pela coleção (exceto "global"): o mesmo arquivo
+    ingerido em outra coleção gera chunks próprios em vez de mover os existentes
+    """
+    if collection == "global":
+        return chunks
+    return [chunk.model_copy(update={"chunk_id": f"{collection}/{chunk.chunk_id}"}) for chunk in chunks]
+
+
+class IngestionEngine:
+    """
+    Pipeline de ingestão em três estágios:
+
+    1. Parse + chunking em um pool de processos, com no máximo
+       `max_inflight_documents` documentos pendentes (memória limitada)
+    2. Embedding em lotes de `embed_batch_size` chunks (multi-documento)
+    3. Upsert em massa nos índices denso, BM25 e de citações
+    """
+
+    def __init__(self, config: Optional[IngestionConfig] = None):
+        self.config = config or IngestionConfig()
+
+    def ingest(
+        self,
+        jobs: Sequence[IngestionJob],
+        vector_db_type: Optional[str] = None,
+        collection: str = "global",
+    ) -> Dict[str, IngestionResult]:
+        """
+        Ingere os documentos e retorna o resultado por document_id. Backends
+        remotos não têm índice local: os documentos são pulados (status "skipped")
+        """
+        backend = vector_db_type or LOCAL_BACKENDS[0]
+        if backend not in LOCAL_BACKENDS:
+            logger.warning(f"Skipping local ingestion of {len(jobs)} documents: backend {backend} is remote")
+            return {job.document_id: self._remote(job.document_id, backend) for job in jobs}
+
+        store = get_vector_store(vector_db_type)
+        manifest = get_manifest(vector_db_type)
+        results: Dict[str, IngestionResult] = {}
+        pending_chunks: List[ChunkResult] = []
+        pending_docs: List[Dict[str, Any]] = []
+
+        fingerprints: Dict[str, str] = {}
+        to_process: List[IngestionJob] = []
+        for job in jobs:
+            job.content_hash = job.content_hash or content_hash(job.file_path)
+            fingerprint = chunking_fingerprint(job.content_hash, job.chunker, job.chunk_config, collection)
+            entry = manifest.get(fingerprint)
+            if entry and all(store.get(chunk_id) is not None for chunk_id in entry.chunk_ids):
+                results[job.document_id] = self._skipped(job.document_id, entry)
+                continue
+            fingerprints[job.document_id] = fingerprint
+            to_process.append(job)
+        jobs_by_id = {job.document_id: job for job in to_process}
+
+        def flush() -> None:
+            if pending_chunks:
+                vectors = store.embedder.embed_documents([chunk.content for chunk in pending_chunks])
+                index_chunks(vector_db_type, collection, pending_chunks, vectors)
+            for outcome in pending_docs:
+                results[outcome["document_id"]] = self._result(outcome)
+                if outcome["chunks"]:
+                    doc_id = outcome["document_id"]
+                    self._record(
+                        manifest, vector_db_type, collection, jobs_by_id[doc_id], fingerprints[doc_id], outcome["chunks"]
+                    )
+            pending_chunks.clear()
+            pending_docs.clear()
+
+        for outcome in self._iter_processed(to_process):
+            if outcome["error"]:
+                logger.error(f"Ingestion failed for {outcome['document_id']}: {outcome['error']}")
+                results[outcome["document_id"]] = self._result(outcome)
+                continue
+            outcome["chunks"] = _scoped_chunks(outcome["chunks"], collection)
+            pending_chunks.extend(outcome["chunks"])
+            pending_docs.append(outcome)
+            if len(pending_chunks) >= self.config.embed_batch_size:
+                flush()
+        flush()
+
+        if to_process:
+            store.persist()
+            manifest.persist()
+        return results
+
+    @staticmethod
+    def _record(
+        manifest: IngestionManifest,
+        vector_db_type: Optional[str],
+        collection: str,
+        job: IngestionJob,
+        fingerprint: str,
+        chunks: List[ChunkResult],
+    ) -> None:
+        """Registra o documento no manifest e remove os chunks da versão substituída"""
+        entry = ManifestEntry(
+            document_id=job.document_id,
+            content_hash=job.content_hash,
+            source=job.file_path,
+            collection=collection,
+            chunker=job.chunker,
+            chunk_config=dict(job.chunk_config),
+            chunk_ids=[chunk.chunk_id for chunk in chunks],
+        )
+        stale = manifest.record(fingerprint, entry)
+        if stale:
+            logger.info(f"Removing {len(stale)} stale chunks replaced by {job.document_id}")
+            delete_chunks(vector_db_type, stale)
+
+    def _iter_processed(self, jobs: Sequence[IngestionJob]):
+        """Resultados de parse/chunking na ordem de conclusão, com janela limitada"""
+        if self.config.max_workers <= 1 or len(jobs) <= 1:
+            for job in jobs:
+                yield _process_document(job)
+            return
+
+        context = multiprocessing.get_context(self.config.start_method)
+        workers = min(self.config.max_workers, len(jobs))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            remaining = iter(jobs)
+            inflight: set[Future] = set()
+            for job in remaining:
+                inflight.add(pool.submit(_process_document, job))
+                if len(inflight) >= self.config.inflight_limit():
+                    break
+            while inflight:
+                done, inflight = wait(inflight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    next_job = next(remaining, None)
+                    if next_job is not None:
+                        inflight.add(pool.submit(_process_document, next_job))
+                    yield future.result()
+
+    @staticmethod
+    def _remote(document_id: str, backend: str) -> IngestionResult:
+        return IngestionResult(
+            document_id=document_id,
+            status="skipped",
+            chunks_created=0,
+            processing_time=0.0,
+            quality_score=0.0,
+            error_message=f"Remote backend {backend}: documents are not indexed locally",
+        )
+
+    @staticmethod
+    def _skipped(document_id: str, entry: ManifestEntry) -> IngestionResult:
+        return IngestionResult(
+            document_id=document_id,
+            status="skipped",
+            chunks_created=len(entry.chunk_ids),
+            processing_time=0.0,
+            quality_score=1.0,
+            error_message=None,
+        )
+
+    @staticmethod
+    def _result(outcome: Dict[str, Any]) -> IngestionResult:
+        if outcome["error"]:
+            status = "error"
+        else:
+            status = "success" if outcome["chunks"] else "partial"
+        return IngestionResult(
+            document_id=outcome["document_id"],
+            status=status,
+            chunks_created=len(outcome["chunks"]),
+            processing_time=outcome["processing_time"],
+            quality_score=outcome["quality_score"],
+            error_message=outcome["error"],
+        )
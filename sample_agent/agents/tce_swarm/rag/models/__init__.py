@@ -5,8 +5,8 @@ Structured data models for documents, chunks, and responses
 
 from .state import RAGState
 from .documents import DocumentStructure, DoclingProcessingResult, DocumentMetadata, DocumentInfo
-from .chunks import ChunkResult, ChunkingResult, VectorSearchResult, GradedChunk, EnrichedChunk, RerankedChunk, Citation
-from .responses import QueryAnalysisResult, ChunkStrategyResult, IngestionResult
+from .chunks import ChunkResult, ChunkingResult, VectorSearchResult, GradedChunk, EnrichedChunk, RerankedChunk, ChunkGrade, ChunkEnrichment, ChunkRanking, RerankedChunkRef, Citation
+from .responses import QueryAnalysisResult, QueryRewriteResult, ChunkStrategyResult, IngestionResult
 
 __all__ = [
     "RAGState",
@@ -20,8 +20,13 @@ __all__ = [
     "GradedChunk",
     "EnrichedChunk",
     "RerankedChunk",
+    "ChunkGrade",
+    "ChunkEnrichment",
+    "ChunkRanking",
+    "RerankedChunkRef",
     "Citation",
     "QueryAnalysisResult",
+    "QueryRewriteResult",
     "ChunkStrategyResult",
     "IngestionResult",
 ] 
\ No newline at end of file
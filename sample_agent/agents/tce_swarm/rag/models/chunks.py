@@ -12,7 +12,7 @@ class ChunkMetadata(BaseModel):
     page_number: Optional[int] = Field(description="Número da página")
     section: Optional[str] = Field(description="Seção do documento")
     chunk_index: Optional[int] = Field(description="Índice do chunk no documento")
-    timestamp: Optional[str] = Field(description="Timestamp de criação")
+    timestamp: Optional[str] = Field(description="Data de emissão do documento de origem (ISO)")
     
     class Config:
         extra = "forbid"
@@ -86,6 +86,44 @@ class RerankedChunk(BaseModel):
     class Config:
         extra = "forbid"
 
+class ChunkGrade(BaseModel):
+    """Avaliação de relevância compacta - referencia o chunk apenas pelo ID"""
+    chunk_id: str = Field(description="ID do chunk avaliado (não repita o conteúdo)")
+    relevance_score: float = Field(description="Score de relevância", ge=0.0, le=1.0)
+    confidence: float = Field(description="Confiança na avaliação", ge=0.0, le=1.0)
+    
+    class Config:
+        extra = "forbid"
+
+class ChunkEnrichment(BaseModel):
+    """Enriquecimento compacto - referencia o chunk apenas pelo ID"""
+    chunk_id: str = Field(description="ID do chunk enriquecido (não repita o conteúdo)")
+    relevance_score: float = Field(description="Score de relevância combinado", ge=0.0, le=1.0)
+    enriched_context: str = Field(description="Contexto enriquecido")
+    cross_references: List[str] = Field(description="Referências cruzadas")
+    ranking_factors: RankingFactors = Field(description="Fatores considerados no ranking")
+    
+    class Config:
+        extra = "forbid"
+
+class ChunkRanking(BaseModel):
+    """Posição no ranking compacta - referencia o chunk apenas pelo ID"""
+    chunk_id: str = Field(description="ID do chunk reordenado (não repita o conteúdo)")
+    final_score: float = Field(description="Score final combinado", ge=0.0, le=1.0)
+    ranking_factors: RankingFactors = Field(description="Fatores de ranking")
+    
+    class Config:
+        extra = "forbid"
+
+class RerankedChunkRef(BaseModel):
+    """Chunk reordenado compacto no estado - o conteúdo fica no chunk_store"""
+    chunk: ChunkEnrichment = Field(description="Enriquecimento do chunk (referenciado pelo ID)")
+    final_score: float = Field(description="Score final combinado", ge=0.0, le=1.0)
+    ranking_factors: RankingFactors = Field(description="Fatores de ranking")
+    
+    class Config:
+        extra = "forbid"
+
 class Citation(BaseModel):
     """Citação específica do documento"""
     source: str = Field(description="Fonte da citação")
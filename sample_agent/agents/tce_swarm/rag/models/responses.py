@@ -36,6 +36,19 @@ class QueryAnalysisResult(BaseModel):
         description="Confiança da análise", ge=0.0, le=1.0
     )
     documents_to_ingest: Optional[List[DocumentToIngest]] = Field(description="Documentos que precisam ser ingeridos")
+    query_variants: Optional[List[str]] = Field(
+        description="Reformulações alternativas da query para busca multi-query"
+    )
+
+    class Config:
+        extra = "forbid"
+
+
+class QueryRewriteResult(BaseModel):
+    """Reescrita da query no modo multi-query: query principal + variantes"""
+
+    processed_query: str = Field(description="Query reformulada principal")
+    query_variants: List[str] = Field(description="Reformulações alternativas buscadas em paralelo")
 
     class Config:
         extra = "forbid"
@@ -56,7 +69,7 @@ class IngestionResult(BaseModel):
     """Resultado da ingestão de documentos"""
 
     document_id: str = Field(description="ID do documento")
-    status: Literal["success", "error", "partial"] = Field(
+    status: Literal["success", "error", "partial", "skipped"] = Field(
         description="Status da ingestão"
     )
     chunks_created: int = Field(description="Chunks criados")
@@ -5,11 +5,33 @@ Contém apenas campos necessários com documentação de uso
 
 from pydantic import BaseModel, Field
 from typing import Annotated, List, Dict, Any, Optional, Literal
-from .chunks import ChunkResult, GradedChunk, EnrichedChunk, RerankedChunk, Citation
+from .chunks import ChunkResult, ChunkGrade, ChunkEnrichment, RerankedChunkRef, Citation
 from langgraph.graph.message import add_messages
 from langchain_core.messages import BaseMessage
 
 
+def merge_latencies(left: Optional[Dict[str, float]], right: Optional[Dict[str, float]]) -> Dict[str, float]:
+    """Reducer de node_latencies: cada node grava apenas a própria latência"""
+    return {**(left or {}), **(right or {})}
+
+
+# Chave do update que descarta o chunk_store acumulado (início de cada execução)
+RESET_CHUNK_STORE = "__reset__"
+
+
+def merge_chunk_store(
+    left: Optional[Dict[str, ChunkResult]], right: Optional[Dict[str, ChunkResult]]
+) -> Dict[str, ChunkResult]:
+    """
+    Reducer do chunk_store: nodes enviam só os chunks que acrescentam; um update
+    com RESET_CHUNK_STORE substitui o store (chunks de execuções anteriores saem)
+    """
+    right = right or {}
+    if RESET_CHUNK_STORE in right:
+        return {chunk_id: chunk for chunk_id, chunk in right.items() if chunk_id != RESET_CHUNK_STORE}
+    return {**(left or {}), **right}
+
+
 class RAGState(BaseModel):
     """
     Estado especializado para o pipeline RAG agentico
@@ -21,6 +43,9 @@ class RAGState(BaseModel):
     processed_query: Optional[str] = Field(
         default=None, description="Query processada/otimizada para retrieval"
     )
+    query_variants: Optional[List[str]] = Field(
+        default=None, description="Variantes da query buscadas em paralelo (modo multi-query)"
+    )
     query_type: Optional[Literal["legislation", "acordao", "resolucao", "jurisprudencia"]] = (
         Field(default=None)
     )
@@ -84,16 +109,31 @@ class RAGState(BaseModel):
     )
 
     # ===== RETRIEVAL RESULTS =====
-    retrieved_chunks: Optional[List[ChunkResult]] = Field(
-        default=None, description="Chunks encontrados na busca"
+    # Cada chunk aparece uma vez em chunk_store; as listas abaixo guardam só IDs
+    # e scores (ler/gravar via chunk_arena.load_* / store_chunks)
+    # Dict (não Optional) para o canal nascer vazio e o reducer tratar também o primeiro update
+    chunk_store: Annotated[Dict[str, ChunkResult], merge_chunk_store] = Field(
+        default_factory=dict, description="Chunks da execução por chunk_id"
+    )
+    retrieved_chunks: Optional[List[str]] = Field(
+        default=None, description="IDs dos chunks encontrados na busca"
+    )
+    speculative_chunks: Optional[List[str]] = Field(
+        default=None, description="IDs dos chunks da busca especulativa (query original, em paralelo à análise)"
     )
-    graded_chunks: Optional[List[GradedChunk]] = Field(
+    speculative_query: Optional[str] = Field(
+        default=None, description="Query usada na busca especulativa"
+    )
+    speculative_corpus_version: Optional[int] = Field(
+        default=None, description="Versão do corpus (manifesto) na busca especulativa"
+    )
+    graded_chunks: Optional[List[ChunkGrade]] = Field(
         default=None, description="Chunks avaliados por relevância"
     )
-    enriched_context: Optional[List[EnrichedChunk]] = Field(
+    enriched_context: Optional[List[ChunkEnrichment]] = Field(
         default=None, description="Chunks enriquecidos com contexto"
     )
-    reranked_chunks: Optional[List[RerankedChunk]] = Field(
+    reranked_chunks: Optional[List[RerankedChunkRef]] = Field(
         default=None, description="Chunks reordenados por relevância"
     )
 
@@ -108,17 +148,41 @@ class RAGState(BaseModel):
     final_context: Optional[str] = Field(default=None, description="Contexto final consolidado")
 
     # ===== WORKFLOW CONTROL =====
+    citation_match: Optional[bool] = Field(
+        default=None, description="Consulta resolvida pelo índice de citações exatas"
+    )
+    semantic_cache_hit: Optional[bool] = Field(
+        default=None, description="Resposta reaproveitada do cache semântico"
+    )
     needs_enrichment: Optional[bool] = Field(
         default=None, description="Flag para enriquecimento de contexto"
     )
     needs_rewrite: Optional[bool] = Field(
         default=None, description="Flag para reescrita da query"
     )
+    execution_profile: Optional[Literal["fast", "balanced", "thorough"]] = Field(
+        default=None, description="Perfil de execução (rota por complexidade e orçamentos de latência)"
+    )
+    stream_generation: Optional[bool] = Field(
+        default=None, description="Gera a resposta em streaming (tokens e citações via stream do LangGraph)"
+    )
     retry_count: Optional[int] = Field(default=None, description="Contador de tentativas de retry")
     max_retries: Optional[int] = Field(default=None, description="Máximo de tentativas de retry")
 
     # ===== PERFORMANCE METRICS =====
     retrieval_time: Optional[float] = Field(default=None, description="Tempo de busca")
+    context_tokens: Optional[int] = Field(
+        default=None, description="Tokens do contexto empacotado para a geração"
+    )
+    grading_bypass_rate: Optional[float] = Field(
+        default=None, description="Fração dos chunks avaliados localmente (sem LLM) no pré-grading"
+    )
+    local_validation_score: Optional[float] = Field(
+        default=None, description="Score da validação local de cobertura de citações"
+    )
+    uncited_claims: Optional[List[str]] = Field(
+        default=None, description="Afirmações da resposta sem citação válida (validação local)"
+    )
     processing_time: Optional[float] = Field(
         default=None, description="Tempo total de processamento"
     )
@@ -126,6 +190,9 @@ class RAGState(BaseModel):
     vector_db_queries: Optional[int] = Field(
         default=None, description="Número de consultas ao vector database"
     )
+    node_latencies: Annotated[Optional[Dict[str, float]], merge_latencies] = Field(
+        default=None, description="Latência (segundos) da última execução de cada node"
+    )
 
     # ===== MESSAGES =====
     messages: Annotated[List[BaseMessage], add_messages] = Field(
@@ -3,26 +3,64 @@ RAG Pipeline Nodes for TCE-PA
 Implements the core nodes of the RAG pipeline workflow
 """
 
-from .vector_db_setup import vector_db_setup_node
-from .query_analysis import query_analysis_node
-from .chunk_strategy import chunk_strategy_node
+from .vector_db_setup import vector_db_setup_node, avector_db_setup_node, vector_db_setup_cache_key
+from .query_analysis import query_analysis_node, aquery_analysis_node
+from .citation_lookup import citation_lookup_node
+from .semantic_cache import semantic_cache_node, remember_answer
+from .chunk_strategy import chunk_strategy_node, achunk_strategy_node, chunk_strategy_cache_key
 from .document_ingestion import document_ingestion_node
-from .document_retrieval import document_retrieval_node
-from .relevance_grading import relevance_grading_node
-from .context_enrichment import context_enrichment_node
-from .reranking import reranking_node
-from .response_generation import response_generation_node
-from .quality_validation import quality_validation_node
+from .document_retrieval import (
+    document_retrieval_node,
+    adocument_retrieval_node,
+    speculative_retrieval_node,
+    aspeculative_retrieval_node,
+)
+from .relevance_grading import relevance_grading_node, arelevance_grading_node, pregrade, pregrade_stats
+from .context_enrichment import context_enrichment_node, acontext_enrichment_node
+from .reranking import reranking_node, areranking_node
+from .response_generation import response_generation_node, aresponse_generation_node, streaming_enabled
+from .quality_validation import (
+    quality_validation_node,
+    aquality_validation_node,
+    local_validation,
+    local_validation_stats,
+)
+from .local_ranking import local_ranking_node, local_grades, local_enrichment, local_rerank
 
 __all__ = [
     "vector_db_setup_node",
-    "query_analysis_node", 
+    "avector_db_setup_node",
+    "vector_db_setup_cache_key",
+    "query_analysis_node",
+    "aquery_analysis_node",
+    "citation_lookup_node",
+    "semantic_cache_node",
+    "remember_answer",
     "chunk_strategy_node",
+    "achunk_strategy_node",
+    "chunk_strategy_cache_key",
     "document_ingestion_node",
     "document_retrieval_node",
+    "adocument_retrieval_node",
+    "speculative_retrieval_node",
+    "aspeculative_retrieval_node",
     "relevance_grading_node",
+    "arelevance_grading_node",
+    "pregrade",
+    "pregrade_stats",
     "context_enrichment_node",
+    "acontext_enrichment_node",
     "reranking_node",
+    "areranking_node",
     "response_generation_node",
-    "quality_validation_node"
+    "aresponse_generation_node",
+    "streaming_enabled",
+    "quality_validation_node",
+    "aquality_validation_node",
+    "local_validation",
+    "local_validation_stats",
+    "local_ranking_node",
+    "local_grades",
+    "local_enrichment",
+    "local_rerank",
 ] 
\ No newline at end of file
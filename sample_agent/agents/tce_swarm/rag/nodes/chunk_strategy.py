@@ -3,15 +3,15 @@ Chunk Strategy Selection Node for RAG Pipeline
 Selects optimal chunking strategy based on document type and query complexity
 """
 
-from ..utils import llm
+from typing import Any, Dict, Tuple
+import json
+from ..utils import llm, allm
 from ..models.state import RAGState
 from ..models.responses import ChunkStrategyResult
 
 
-def chunk_strategy_node(state: RAGState) -> RAGState:
-    """
-    Seleciona estratégia de chunking via LLM baseada no contexto
-    """
+def _chunk_strategy_request(state: RAGState) -> Tuple[str, Dict[str, Any]]:
+    """Monta instrução e contexto da seleção de estratégia"""
 
     instruction = f"""
     Selecione a estratégia de chunking mais adequada para:
@@ -29,12 +29,37 @@ def chunk_strategy_node(state: RAGState) -> RAGState:
     Considere características específicas de documentos estruturados.
     """
 
-    strategy = llm(
-        instruction,
-        ChunkStrategyResult,
+    context = dict(
         query_type=state.query_type,
         complexity=state.query_complexity,
         databases=state.target_databases,
     )
+    return instruction, context
+
+
+def chunk_strategy_cache_key(state: RAGState) -> str:
+    """Chave do CachePolicy: apenas os campos do estado lidos pelo node"""
+    return json.dumps([state.query_type, state.query_complexity, state.target_databases], default=str)
+
+
+def _apply_chunk_strategy(state: RAGState, strategy: ChunkStrategyResult) -> Dict[str, Any]:
+    # Só os campos alterados: a saída é reaproveitada pelo cache de nodes
+    return strategy.model_dump(exclude={"strategy_rationale"})
+
+
+def chunk_strategy_node(state: RAGState) -> Dict[str, Any]:
+    """
+    Seleciona estratégia de chunking via LLM baseada no contexto
+    """
+
+    instruction, context = _chunk_strategy_request(state)
+    strategy = llm(instruction, ChunkStrategyResult, **context)
+    return _apply_chunk_strategy(state, strategy)
+
+
+async def achunk_strategy_node(state: RAGState) -> Dict[str, Any]:
+    """Versão assíncrona de chunk_strategy_node"""
 
-    return state.copy(**strategy)
+    instruction, context = _chunk_strategy_request(state)
+    strategy = await allm(instruction, ChunkStrategyResult, **context)
+    return _apply_chunk_strategy(state, strategy)
@@ -0,0 +1,71 @@
+"""
+Citation Lookup Node for RAG Pipeline
+Exact-citation fast path: resolves named provisions without embeddings or LLM calls
+"""
+
+from typing import Any, Dict
+from ..models.state import RAGState
+from ..models.chunks import EnrichedChunk, RankingFactors, RerankedChunk
+from ..chunk_arena import store_chunks
+from ..index.citations import parse_citations
+from ..index.hybrid import get_citation_index
+from ..index.vector_store import LOCAL_BACKENDS, get_vector_store
+from .query_analysis import pending_file_paths
+import time
+
+
+def citation_lookup_node(state: RAGState) -> Dict[str, Any]:
+    """
+    Resolve consultas que citam um dispositivo específico (ex.: "Art. 71 da
+    Resolução 18.832") direto no índice de citações. Em caso de acerto os chunks
+    exatos vão como reranked_chunks para a geração, pulando análise, retrieval,
+    grading, enriquecimento e reranking.
+    """
+
+    query = state.original_query or state.messages[-1].content
+    backend = state.vector_db_type or LOCAL_BACKENDS[0]
+
+    # Arquivos novos precisam passar pela ingestão antes de qualquer busca
+    if backend not in LOCAL_BACKENDS or pending_file_paths(state):
+        return {"citation_match": False}
+
+    start_time = time.time()
+
+    refs = parse_citations(query)
+    chunk_ids = get_citation_index(backend).lookup(refs, state.collection_names) if refs else []
+    if not chunk_ids:
+        return {"citation_match": False}
+
+    store = get_vector_store(backend)
+    factors = RankingFactors(
+        semantic_similarity=None,
+        keyword_match=1.0,
+        document_authority=None,
+        recency=None,
+        context_relevance=None,
+    )
+    reranked_chunks = []
+    for chunk_id in chunk_ids:
+        chunk = store.get(chunk_id)
+        if chunk is None:
+            continue
+        enriched = EnrichedChunk(
+            chunk=chunk,
+            relevance_score=1.0,
+            enriched_context="Citação exata do dispositivo consultado",
+            cross_references=[],
+            ranking_factors=factors,
+        )
+        reranked_chunks.append(RerankedChunk(chunk=enriched, final_score=1.0, ranking_factors=factors))
+
+    if not reranked_chunks:
+        return {"citation_match": False}
+
+    return {
+        **store_chunks(state, reranked=reranked_chunks),
+        "citation_match": True,
+        "processed_query": query,
+        "query_type": refs[0].document_type,
+        "query_complexity": "simple",
+        "retrieval_time": time.time() - start_time,
+    }
@@ -4,52 +4,101 @@ Enriches chunks with context, cross-references, and temporal information
 """
 
 from pydantic import BaseModel, Field
-from typing import List
-from ..utils import llm
+from typing import Any, Dict, List, Tuple
+from ..utils import llm, allm, chunk_lookup
 from ..models.state import RAGState
-from ..models.chunks import EnrichedChunk
+from ..models.chunks import ChunkEnrichment, EnrichedChunk
+from ..chunk_arena import load_graded, store_chunks
+import logging
 import time
 
+logger = logging.getLogger(__name__)
+
 
 class EnrichedChunksResponse(BaseModel):
     """Response model for enriched chunks generation"""
-    enriched_chunks: List[EnrichedChunk] = Field(
-        description="List of chunks enriched with context information"
+    enriched_chunks: List[ChunkEnrichment] = Field(
+        description="List of chunk enrichments referencing chunks by chunk_id only"
     )
 
 
-def context_enrichment_node(state: RAGState) -> RAGState:
-    """
-    Enriquece contexto dos chunks com informações específicas
-    """
+def _enrichment_request(state: RAGState) -> Tuple[str, Dict[str, Any]]:
+    """Monta instrução e contexto do enriquecimento"""
 
-    start_time = time.time()
-
-    # Single LLM call to generate enriched chunks
     instruction = f"""
     Enrich chunks with specific context information for query: "{state.processed_query}"
     
-    For each chunk, provide:
+    For each chunk, return its chunk_id and:
     - Enhanced context with temporal and document information
     - Cross-references to related content
     - Ranking factors for semantic, temporal, and context relevance
     
+    Reference chunks by chunk_id only; do not repeat chunk content.
+    
     Document context: {state.document_context}
     Temporal context: {state.temporal_context}
     """
 
-    response = llm(
-        instruction,
-        EnrichedChunksResponse,
-        graded_chunks=state.graded_chunks,
+    context = dict(
+        graded_chunks=[
+            {
+                "chunk_id": graded.chunk.chunk_id,
+                "content": graded.chunk.content,
+                "relevance_score": graded.relevance_score,
+            }
+            for graded in load_graded(state)
+        ],
         document_context=state.document_context,
         temporal_context=state.temporal_context,
     )
+    return instruction, context
+
+
+def _apply_enrichment(
+    state: RAGState, response: EnrichedChunksResponse, start_time: float
+) -> Dict[str, Any]:
+    # Reconstrói os EnrichedChunk completos a partir dos IDs retornados
+    graded_by_id = chunk_lookup(load_graded(state), lambda graded: graded.chunk.chunk_id)
+    enriched_chunks = []
+    for enrichment in response.enriched_chunks:
+        graded = graded_by_id.get(enrichment.chunk_id)
+        if graded is None:
+            logger.warning(f"Enrichment returned unknown chunk_id: {enrichment.chunk_id}")
+            continue
+        enriched_chunks.append(
+            EnrichedChunk(chunk=graded.chunk, **enrichment.model_dump(exclude={"chunk_id"}))
+        )
 
     # Update metrics and return
-    state.processing_time = state.processing_time + (time.time() - start_time)
+    processing_time = (state.processing_time or 0.0) + (time.time() - start_time)
 
-    return state.copy(
-        enriched_context=response.enriched_chunks,
-        needs_enrichment=False,
-    )
+    return {
+        **store_chunks(state, enriched=enriched_chunks),
+        "needs_enrichment": False,
+        "processing_time": processing_time,
+    }
+
+
+def context_enrichment_node(state: RAGState) -> Dict[str, Any]:
+    """
+    Enriquece contexto dos chunks com informações específicas
+    """
+
+    start_time = time.time()
+
+    # Single LLM call to generate enriched chunks
+    instruction, context = _enrichment_request(state)
+    response = llm(instruction, EnrichedChunksResponse, **context)
+
+    return _apply_enrichment(state, response, start_time)
+
+
+async def acontext_enrichment_node(state: RAGState) -> Dict[str, Any]:
+    """Versão assíncrona de context_enrichment_node"""
+
+    start_time = time.time()
+
+    instruction, context = _enrichment_request(state)
+    response = await allm(instruction, EnrichedChunksResponse, **context)
+
+    return _apply_enrichment(state, response, start_time)
@@ -3,41 +3,76 @@ Document Ingestion Node for RAG Pipeline
 Processes document ingestion: Docling → Chunking → Vector DB Storage
 """
 
-from ..utils import llm
+from typing import Any, Tuple
 from ..models.state import RAGState
-from ..models.responses import IngestionResult
+from ..processors import TCE_ChonkieProcessor
+from ..ingestion import IngestionConfig, IngestionEngine, IngestionJob
+from ..cache import get_semantic_cache
+from ..index.manifest import get_manifest, ingestion_collection
 import time
 
+
+def _document_fields(doc: Any) -> Tuple[str, str, str]:
+    """(document_id, document_type, file_path) de um DocumentToIngest ou dict legado"""
+    if isinstance(doc, dict):
+        doc_id = doc.get("document_id") or doc.get("id")
+        return doc_id, doc.get("document_type", ""), doc.get("source_url") or doc.get("file_path", "")
+    return doc.document_id, doc.document_type, doc.source_url or ""
+
+
 def document_ingestion_node(state: RAGState) -> RAGState:
     """
     Processa ingestão completa: Docling → Chunking → Vector DB Storage
+    Parse e chunking rodam em pool de processos; embedding e upsert em lotes.
+    Documentos com mesmo conteúdo e chunking já indexados são pulados (status "skipped")
     """
     
     if not state.ingestion_required or not state.documents_to_ingest:
         return state
     
     start_time = time.time()
-    
-    # Simple mock results without LLM
-    ingestion_results = {}
+
+    chunker = state.selected_chunker or TCE_ChonkieProcessor().get_optimal_strategy(
+        state.query_type, state.query_complexity
+    )
+    chunk_config = {
+        key: value
+        for key, value in {
+            "chunk_size": state.chunk_size,
+            "chunk_overlap": state.chunk_overlap,
+            **(state.chunking_metadata or {}),
+        }.items()
+        if value is not None
+    }
+
+    jobs = []
     for doc in state.documents_to_ingest:
-        ingestion_results[doc["id"]] = {
-            "status": "success",
-            "chunks_created": 5,
-            "document_id": doc["id"]
-        }
+        doc_id, doc_type, file_path = _document_fields(doc)
+        jobs.append(IngestionJob(doc_id, file_path, doc_type, chunker, chunk_config))
+
+    engine = IngestionEngine(IngestionConfig.from_env())
+    results = engine.ingest(
+        jobs,
+        vector_db_type=state.vector_db_type,
+        collection=ingestion_collection(state.collection_names),
+    )
+    ingestion_results = {doc_id: result.status for doc_id, result in results.items()}
+
+    # Corpus alterado: respostas em cache de versões anteriores deixam de valer
+    if any(result.status in ("success", "partial") for result in results.values()):
+        get_semantic_cache().invalidate(get_manifest(state.vector_db_type).version)
     
     # Update user documents list
-    new_doc_ids = [doc["id"] for doc in state.documents_to_ingest]
-    user_documents = list(state.user_documents) + new_doc_ids
+    new_doc_ids = [doc_id for doc_id, result in results.items() if result.status != "error"]
+    user_documents = list(dict.fromkeys([*(state.user_documents or []), *new_doc_ids]))
     
     # Update metrics and return
     ingestion_time = time.time() - start_time
-    updated_ingestion_status = {**state.ingestion_status, **ingestion_results}
+    updated_ingestion_status = {**(state.ingestion_status or {}), **ingestion_results}
     
     return state.copy(
         ingestion_time=ingestion_time,
         ingestion_status=updated_ingestion_status,
         ingestion_required=False,
         user_documents=user_documents
-    ) 
\ No newline at end of file
+    )
@@ -3,29 +3,173 @@ Document Retrieval Node for RAG Pipeline
 Executes hybrid retrieval with access filters and multiple collections
 """
 
-from ..utils import llm
+from typing import Any, Dict, List, Optional
+from ..utils import llm, allm
 from ..models.state import RAGState
-from ..models.chunks import ChunkingResult
+from ..models.chunks import ChunkingResult, ChunkResult
+from ..index.vector_store import LOCAL_BACKENDS
+from ..index.hybrid import ahybrid_search, amulti_hybrid_search, hybrid_search, multi_hybrid_search
+from ..index.manifest import get_manifest
+from ..index.text import tokenize
+from ..profiles import get_profile
+from ..chunk_arena import store_chunks
+from .query_analysis import pending_file_paths
 import time
 
-def document_retrieval_node(state: RAGState) -> RAGState:
+# Número de chunks recuperados por consulta
+RETRIEVAL_TOP_K = 8
+
+# Sobreposição mínima (Jaccard dos termos) entre a query analisada e a original
+# para reaproveitar a busca especulativa em vez de refazer o retrieval
+SPECULATIVE_REUSE_OVERLAP = 0.8
+
+
+def _uses_local_index(state: RAGState) -> bool:
+    return (state.vector_db_type or LOCAL_BACKENDS[0]) in LOCAL_BACKENDS
+
+
+def _retrieval_queries(state: RAGState) -> List[str]:
+    """Query principal + variantes do modo multi-query (perfil de execução), sem repetições"""
+    n_variants = get_profile(state.execution_profile).query_variants
+    variants = (state.query_variants or [])[:n_variants]
+    queries = [state.processed_query or state.original_query, *variants]
+    return list(dict.fromkeys(query.strip() for query in queries if query and query.strip()))
+
+
+def _search_args(state: RAGState) -> dict:
     """
-    Mock document retrieval - just return chunks via LLM
+    Queries a buscar e rankings já prontos: a busca especulativa, quando
+    reaproveitável, substitui a da query principal
     """
-    
-    start_time = time.time()
-    
-    # Single LLM call to generate chunks
-    instruction = f"""
+    queries = _retrieval_queries(state)
+    speculative = _reusable_speculation(state)
+    rankings = []
+    if speculative is not None:
+        queries = queries[1:]
+        rankings.append(list(speculative))
+    return dict(
+        queries=queries,
+        vector_db_type=state.vector_db_type,
+        collections=state.collection_names,
+        k=RETRIEVAL_TOP_K,
+        rankings=rankings,
+    )
+
+
+def _query_terms(query: Optional[str]) -> frozenset:
+    return frozenset(tokenize(query or "", drop_stopwords=True))
+
+
+def _reusable_speculation(state: RAGState) -> Optional[List[str]]:
+    """IDs do resultado especulativo quando a query refinada ainda equivale à original e o corpus não mudou"""
+    if state.speculative_chunks is None:
+        return None
+    if state.speculative_corpus_version != get_manifest(state.vector_db_type).version:
+        return None
+
+    refined = _query_terms(state.processed_query or state.original_query)
+    speculative = _query_terms(state.speculative_query)
+    if not refined or not speculative:
+        return None
+    if len(refined & speculative) / len(refined | speculative) < SPECULATIVE_REUSE_OVERLAP:
+        return None
+    return state.speculative_chunks
+
+
+def _speculative_args(state: RAGState) -> Optional[dict]:
+    # Só no índice local e sem arquivos pendentes (a ingestão mudaria o corpus)
+    if not _uses_local_index(state) or pending_file_paths(state):
+        return None
+    return dict(
+        query=state.original_query or state.messages[-1].content,
+        vector_db_type=state.vector_db_type,
+        collections=state.collection_names,
+        k=RETRIEVAL_TOP_K,
+    )
+
+
+def _apply_speculation(state: RAGState, args: dict, hits) -> Dict[str, Any]:
+    # Só os campos próprios: roda em paralelo com query_analysis no mesmo passo
+    return {
+        # Só os IDs: o ranking especulativo entra na fusão, os chunks vêm do retrieval
+        "speculative_chunks": [chunk.chunk_id for chunk, _ in hits],
+        "speculative_query": args["query"],
+        "speculative_corpus_version": get_manifest(state.vector_db_type).version,
+    }
+
+
+def speculative_retrieval_node(state: RAGState) -> Dict[str, Any]:
+    """
+    Busca especulativa sobre a query original, executada em paralelo com a
+    análise da query: se a query analisada não mudar substancialmente, o
+    retrieval reaproveita estes chunks e sai do caminho crítico.
+    """
+
+    args = _speculative_args(state)
+    if args is None:
+        return {}
+    return _apply_speculation(state, args, hybrid_search(**args))
+
+
+async def aspeculative_retrieval_node(state: RAGState) -> Dict[str, Any]:
+    """Versão assíncrona de speculative_retrieval_node"""
+
+    args = _speculative_args(state)
+    if args is None:
+        return {}
+    return _apply_speculation(state, args, await ahybrid_search(**args))
+
+
+def _retrieval_instruction(state: RAGState) -> str:
+    return f"""
     Generate 3 realistic document small chunks that would be retrieved for: "{state.processed_query}"
     Make it sound like actual institutional document content relevant to the query.
     Return as ChunkingResult with chunks list.
     """
-    
-    result = llm(instruction, ChunkingResult)
-    
+
+
+def _apply_retrieval(
+    state: RAGState, chunks: List[ChunkResult], queries: int, start_time: float
+) -> Dict[str, Any]:
     # Update metrics and return
-    state.retrieval_time = time.time() - start_time
-    state.vector_db_queries = 2  # Mock query count
-    
-    return state.copy(retrieved_chunks=result.chunks)
+    return {
+        **store_chunks(state, retrieved=chunks),
+        "retrieval_time": time.time() - start_time,
+        "vector_db_queries": (state.vector_db_queries or 0) + queries,
+    }
+
+
+def document_retrieval_node(state: RAGState) -> Dict[str, Any]:
+    """
+    Recupera chunks via busca híbrida (densa + BM25 fundidas por RRF) no índice
+    embarcado (backend "lancedb"). Backends sem índice local (ex.: azure_ai_search)
+    mantêm a simulação via LLM. Reaproveita a busca especulativa quando a query
+    analisada equivale à original.
+
+    No modo multi-query a query principal e as variantes são buscadas em
+    paralelo e fundidas num único RRF, deduplicadas por chunk_id.
+    """
+
+    start_time = time.time()
+
+    if _uses_local_index(state):
+        args = _search_args(state)
+        hits = multi_hybrid_search(**args)
+        return _apply_retrieval(state, [chunk for chunk, _ in hits], 2 * len(args["queries"]), start_time)
+
+    result = llm(_retrieval_instruction(state), ChunkingResult)
+    return _apply_retrieval(state, result.chunks, 1, start_time)
+
+
+async def adocument_retrieval_node(state: RAGState) -> Dict[str, Any]:
+    """Versão assíncrona de document_retrieval_node"""
+
+    start_time = time.time()
+
+    if _uses_local_index(state):
+        args = _search_args(state)
+        hits = await amulti_hybrid_search(**args)
+        return _apply_retrieval(state, [chunk for chunk, _ in hits], 2 * len(args["queries"]), start_time)
+
+    result = await allm(_retrieval_instruction(state), ChunkingResult)
+    return _apply_retrieval(state, result.chunks, 1, start_time)
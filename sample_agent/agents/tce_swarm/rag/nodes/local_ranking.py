@@ -0,0 +1,74 @@
+"""
+Local Ranking Node for RAG Pipeline
+Builds graded, enriched and reranked chunks locally, without LLM calls
+
+Used when the execution profile skips LLM grading/enrichment/reranking and as
+the degraded result when one of those nodes exceeds its latency budget.
+"""
+
+from typing import Any, Dict, List, Tuple
+from ..models.state import RAGState
+from ..models.chunks import ChunkResult, EnrichedChunk, GradedChunk, RankingFactors, RerankedChunk
+from ..reranker import get_reranker
+from ..chunk_arena import load_enriched, load_graded, load_retrieved, store_chunks
+
+# Chunks enviados à geração na rota local
+LOCAL_RANK_TOP_K = 5
+
+
+def _retrieval_scores(state: RAGState) -> List[Tuple[ChunkResult, float]]:
+    # Ordem do retrieval híbrido (RRF) convertida em score decrescente em (0, 1]
+    chunks = load_retrieved(state)
+    return [(chunk, 1.0 - i / (len(chunks) + 1)) for i, chunk in enumerate(chunks)]
+
+
+def _factors(score: float) -> RankingFactors:
+    return RankingFactors(
+        semantic_similarity=score,
+        keyword_match=None,
+        document_authority=None,
+        recency=None,
+        context_relevance=None,
+    )
+
+
+def local_grades(state: RAGState) -> List[GradedChunk]:
+    """Notas pela posição no retrieval (confiança 0: não avaliadas por LLM)"""
+    return [
+        GradedChunk(chunk=chunk, relevance_score=score, confidence=0.0)
+        for chunk, score in _retrieval_scores(state)
+    ]
+
+
+def local_enrichment(state: RAGState) -> List[EnrichedChunk]:
+    """Chunks avaliados promovidos a enriquecidos sem contexto adicional"""
+    graded = load_graded(state) or local_grades(state)
+    return [
+        EnrichedChunk(
+            chunk=grade.chunk,
+            relevance_score=grade.relevance_score,
+            enriched_context="",
+            cross_references=[],
+            ranking_factors=_factors(grade.relevance_score),
+        )
+        for grade in graded
+    ]
+
+
+def local_rerank(state: RAGState, top_k: int = LOCAL_RANK_TOP_K) -> List[RerankedChunk]:
+    """
+    Top-k do reranker local; a relevância de contexto vem do melhor score
+    disponível: enriquecimento > grading > retrieval
+    """
+    enriched = load_enriched(state) or local_enrichment(state)
+    query = state.processed_query or state.original_query or ""
+    return get_reranker().rerank(query, enriched, state.vector_db_type)[:top_k]
+
+
+def local_ranking_node(state: RAGState) -> Dict[str, Any]:
+    """
+    Ordena localmente os chunks para a geração quando o perfil de execução
+    pula grading/enriquecimento/reranking via LLM
+    """
+
+    return store_chunks(state, reranked=local_rerank(state))
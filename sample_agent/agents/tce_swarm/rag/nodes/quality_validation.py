@@ -3,22 +3,169 @@ Quality Validation Node for RAG Pipeline
 Validates response quality based on multiple criteria
 """
 
-from ..utils import llm
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from ..utils import llm, allm
 from ..models.state import RAGState
 from ..models.responses import ValidationResult
+from ..context_packer import CITATION_MARKER_RE, context_entries, marker_indices
+from ..index.text import tokenize
+import os
+import re
+import threading
 
+# Score local a partir do qual a resposta é aprovada sem LLM, e até o qual é
+# reprovada (rewrite) sem LLM; entre os dois o validador LLM decide
+LOCAL_VALIDATION_ACCEPT = float(os.environ.get("RAG_VALIDATION_ACCEPT", "0.75"))
+LOCAL_VALIDATION_REJECT = float(os.environ.get("RAG_VALIDATION_REJECT", "0.35"))
 
-def quality_validation_node(state: RAGState) -> RAGState:
+# Pesos do score local: suporte n-grama das frases citadas, fração das
+# afirmações com citação e fração dos marcadores que apontam para chunks reais
+SUPPORT_WEIGHT = 0.5
+COVERAGE_WEIGHT = 0.3
+MARKER_WEIGHT = 0.2
+
+# Frases com menos termos que isso (títulos, conectivos) não contam como afirmação
+MIN_CLAIM_TERMS = 4
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?;:])\s+|\n+")
+
+# Abreviações de texto legal cujo ponto não encerra a frase (Art. 5º, Inc. II, § 1º.)
+_ABBREVIATION_RE = re.compile(
+    r"(?<!\w)(arts?|incs?|par|parág|al|n|nº|cf|p|pág|fls?|ex|sr|sra|dr|dra)\.(?=\s)|(§+\s*\d+º?)\.(?=\s)",
+    re.IGNORECASE,
+)
+_PROTECTED_DOT = "\x00"
+
+_STATS = {"answers": 0, "accepted": 0, "rejected": 0, "llm_calls": 0}
+_STATS_LOCK = threading.Lock()
+
+
+@dataclass
+class LocalValidation:
+    """Cobertura de citações da resposta contra o contexto empacotado"""
+
+    score: float = 0.0
+    support: float = 0.0
+    coverage: float = 0.0
+    marker_validity: float = 1.0
+    markers: int = 0
+    uncited_claims: List[str] = field(default_factory=list)
+    invalid_markers: List[int] = field(default_factory=list)
+
+
+def _terms(text: str) -> set:
+    # Unigramas e bigramas sem stopwords
+    tokens = tokenize(text, drop_stopwords=True)
+    return set(tokens) | {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+
+
+def _sentences(text: str) -> List[str]:
+    protected = _ABBREVIATION_RE.sub(lambda m: (m.group(1) or m.group(2)) + _PROTECTED_DOT, text)
+    return [sentence.replace(_PROTECTED_DOT, ".") for sentence in _SENTENCE_RE.split(protected)]
+
+
+def local_validation(state: RAGState) -> Optional[LocalValidation]:
     """
-    Valida a qualidade da resposta gerada baseada em múltiplos critérios
+    Valida localmente a resposta: marcadores [n] devem apontar para entradas do
+    contexto, cada afirmação deve ter citação e as frases citadas devem
+    compartilhar n-gramas com os chunks citados. None quando não há contexto
+    numerado para conferir (a validação fica com o LLM).
+    """
+    entries = context_entries(state.final_context or "")
+    if not entries:
+        return None
+
+    entry_terms: Dict[int, set] = {}
+    result = LocalValidation()
+    markers = valid_markers = 0
+    supports: List[float] = []
+    claims = 0
+
+    for sentence in _sentences(state.generated_response or ""):
+        cited = [index for match in CITATION_MARKER_RE.finditer(sentence) for index in marker_indices(match)]
+        terms = _terms(CITATION_MARKER_RE.sub(" ", sentence))
+        markers += len(cited)
+        for index in cited:
+            if index in entries:
+                valid_markers += 1
+            elif index not in result.invalid_markers:
+                result.invalid_markers.append(index)
+
+        if len(terms) < MIN_CLAIM_TERMS:
+            continue
+        claims += 1
+        sources = [index for index in cited if index in entries]
+        if not sources:
+            result.uncited_claims.append(sentence.strip())
+            continue
+        source_terms = set()
+        for index in sources:
+            if index not in entry_terms:
+                entry_terms[index] = _terms(entries[index])
+            source_terms |= entry_terms[index]
+        supports.append(len(terms & source_terms) / len(terms))
+
+    result.markers = markers
+    if not claims:
+        return result
+
+    result.support = sum(supports) / len(supports) if supports else 0.0
+    result.coverage = len(supports) / claims
+    result.marker_validity = valid_markers / markers if markers else 1.0
+    result.score = (
+        SUPPORT_WEIGHT * result.support
+        + COVERAGE_WEIGHT * result.coverage
+        + MARKER_WEIGHT * result.marker_validity
+    )
+    return result
+
+
+def local_verdict(local: Optional[LocalValidation]) -> Optional[ValidationResult]:
+    """
+    Resultado local nas faixas claras; None na faixa incerta (segue para o LLM).
+    Resposta sem nenhum marcador [n] também segue para o LLM: pode citar em
+    outro formato ([fonte], nome do documento) que a validação local não confere
     """
+    if local is None or not local.markers:
+        return None
+    if LOCAL_VALIDATION_REJECT < local.score < LOCAL_VALIDATION_ACCEPT:
+        return None
+    return ValidationResult(
+        quality_score=round(local.score, 4),
+        needs_rewrite=local.score <= LOCAL_VALIDATION_REJECT,
+    )
+
+
+def _record_validation(verdict: Optional[ValidationResult]) -> None:
+    with _STATS_LOCK:
+        _STATS["answers"] += 1
+        if verdict is None:
+            _STATS["llm_calls"] += 1
+        elif verdict.needs_rewrite:
+            _STATS["rejected"] += 1
+        else:
+            _STATS["accepted"] += 1
+
+
+def local_validation_stats() -> Dict[str, Any]:
+    """Totais do processo: respostas validadas, decididas localmente e chamadas ao LLM"""
+    with _STATS_LOCK:
+        stats = dict(_STATS)
+    decided = stats["accepted"] + stats["rejected"]
+    stats["bypass_rate"] = decided / stats["answers"] if stats["answers"] else 0.0
+    return stats
+
+
+def _validation_request(state: RAGState, local: Optional[LocalValidation]) -> Tuple[str, Dict[str, Any]]:
+    """Monta instrução e contexto da validação"""
 
     instruction = f"""
     Valide a qualidade da resposta gerada:
     
     Query: {state.original_query}
     Resposta: {state.generated_response}
-    Citações: {len(state.citations)}
+    Citações: {len(state.citations or [])}
     
     Critérios de validação:
     1. Precisão da informação
@@ -31,16 +178,57 @@ def quality_validation_node(state: RAGState) -> RAGState:
     Se o score for baixo (< 0.5), indique que precisa de rewrite.
     """
 
-    validation = llm(
-        instruction,
-        ValidationResult,
+    context = dict(
         query=state.original_query,
         response=state.generated_response,
         citations=state.citations,
         retry_count=state.retry_count,
     )
+    if local is not None:
+        # Achados da validação local orientam o LLM na faixa incerta
+        context.update(
+            citation_support=round(local.support, 3),
+            uncited_claims=local.uncited_claims,
+            invalid_citation_markers=local.invalid_markers,
+        )
+    return instruction, context
+
 
+def _apply_validation(
+    state: RAGState, validation: ValidationResult, local: Optional[LocalValidation]
+) -> RAGState:
     return state.copy(
         quality_score=validation.quality_score,
         needs_rewrite=validation.needs_rewrite,
+        local_validation_score=local.score if local is not None else None,
+        uncited_claims=local.uncited_claims if local is not None else None,
     )
+
+
+def quality_validation_node(state: RAGState) -> RAGState:
+    """
+    Valida a qualidade da resposta gerada baseada em múltiplos critérios
+
+    A validação local de cobertura de citações decide os casos claros; o
+    validador LLM só é chamado quando o score local cai na faixa incerta.
+    """
+
+    local = local_validation(state)
+    validation = local_verdict(local)
+    _record_validation(validation)
+    if validation is None:
+        instruction, context = _validation_request(state, local)
+        validation = llm(instruction, ValidationResult, **context)
+    return _apply_validation(state, validation, local)
+
+
+async def aquality_validation_node(state: RAGState) -> RAGState:
+    """Versão assíncrona de quality_validation_node"""
+
+    local = local_validation(state)
+    validation = local_verdict(local)
+    _record_validation(validation)
+    if validation is None:
+        instruction, context = _validation_request(state, local)
+        validation = await allm(instruction, ValidationResult, **context)
+    return _apply_validation(state, validation, local)
@@ -3,29 +3,42 @@ Query Analysis Node for RAG Pipeline
 Analyzes user queries and determines processing strategy
 """
 
-from ..utils import llm
+from typing import Any, Dict, List, Tuple
+from ..utils import llm, allm
 from ..models.state import RAGState
 from ..models.responses import QueryAnalysisResult, DocumentToIngest
+from ..index.manifest import content_hash, document_id_for, get_manifest, ingestion_collection
+from ..profiles import get_profile
 
 
-def query_analysis_node(state: RAGState) -> RAGState:
+def pending_file_paths(state: RAGState) -> List[str]:
     """
-    Analisa query usando LLM structured output para classificação inteligente
-    Verifica se documentos em file_paths precisam de ingestão
+    Arquivos de file_paths cujo conteúdo ainda não está no manifest de ingestão
+    na coleção de destino do turno. A decisão é pelo hash dos bytes: arquivos
+    renomeados não são reprocessados e arquivos alterados sob o mesmo nome são
+    reingeridos; o mesmo arquivo em outra coleção (usuário, sessão) é ingerido.
     """
+    manifest = get_manifest(state.vector_db_type)
+    collection = ingestion_collection(state.collection_names)
+    return [path for path in state.file_paths or [] if not manifest.has_content(content_hash(path), collection)]
+
+
+def indexed_document_ids(state: RAGState) -> List[str]:
+    """IDs dos documentos de file_paths já presentes no manifest, na coleção de destino"""
+    manifest = get_manifest(state.vector_db_type)
+    collection = ingestion_collection(state.collection_names)
+    doc_ids = []
+    for path in state.file_paths or []:
+        doc_ids.extend(entry.document_id for entry in manifest.entries_for_content(content_hash(path), collection))
+    return doc_ids
+
+
+def _query_analysis_request(state: RAGState) -> Tuple[str, Dict[str, Any], bool]:
+    """Monta instrução e contexto da análise; retorna também a verificação local de ingestão"""
 
     # Verifica se há documentos para ingestão
-    needs_ingestion = False
-    if state.file_paths:
-        # Verifica se algum arquivo não foi processado ainda
-        for file_path in state.file_paths:
-            # Extrai identificador do arquivo (nome sem extensão)
-            file_id = file_path.split("/")[-1].split(".")[0]
-
-            # Verifica se o documento já foi processado
-            if file_id not in state.user_documents:
-                needs_ingestion = True
-                break
+    needs_ingestion = bool(pending_file_paths(state))
+    n_variants = get_profile(state.execution_profile).query_variants
 
     instruction = f"""
     Analise a consulta e classifique conforme padrões de documentos oficiais:
@@ -43,40 +56,69 @@ def query_analysis_node(state: RAGState) -> RAGState:
        - Se há arquivos novos em file_paths: ingestion_required=True
        - Se todos os arquivos já foram processados: ingestion_required=False
        - Se não há arquivos: ingestion_required=False
+    6. Variantes da query (query_variants): {n_variants} reformulações com termos
+       técnicos, sinônimos ou recortes diferentes da mesma necessidade (lista vazia se 0)
     
     IMPORTANTE: ingestion_required deve ser {needs_ingestion} baseado na verificação de arquivos.
     
     Considere padrões típicos de consultas em documentos oficiais.
     """
 
-    analysis = llm(
-        instruction,
-        QueryAnalysisResult,
+    context = dict(
         user_context=state.user_id,
         file_paths=state.file_paths,
         user_documents=state.user_documents,
         needs_ingestion=needs_ingestion,
     )
+    return instruction, context, needs_ingestion
+
 
+def _apply_query_analysis(
+    state: RAGState, analysis: QueryAnalysisResult, needs_ingestion: bool
+) -> Dict[str, Any]:
     # Força o valor correto de ingestion_required baseado na verificação local
     analysis_dict = analysis.model_dump()
     analysis_dict["ingestion_required"] = needs_ingestion
+    n_variants = get_profile(state.execution_profile).query_variants
+    analysis_dict["query_variants"] = (analysis.query_variants or [])[:n_variants]
 
     # Prepara documentos para ingestão se necessário
     documents_to_ingest = []
     if needs_ingestion:
-        for file_path in state.file_paths:
-            file_id = file_path.split("/")[-1].split(".")[0]
-            if file_id not in state.user_documents:
-                documents_to_ingest.append(
-                    DocumentToIngest(
-                        document_id=file_id,
-                        document_type=file_path.split(".")[-1],
-                        source_url=file_path,
-                        priority=5,
-                    )
-                )
+        for file_path in pending_file_paths(state):
+            documents_to_ingest.append(
+                DocumentToIngest(
+                    document_id=document_id_for(file_path, content_hash(file_path)),
+                    document_type=file_path.split(".")[-1],
+                    source_url=file_path,
+                    priority=5,
+                ).model_dump()
+            )
 
     analysis_dict["documents_to_ingest"] = documents_to_ingest
 
-    return state.copy(**analysis_dict)
+    # Documentos já indexados (mesmo conteúdo, talvez com outro nome) ficam visíveis ao usuário
+    known = list(dict.fromkeys([*(state.user_documents or []), *indexed_document_ids(state)]))
+    analysis_dict["user_documents"] = known
+
+    # Só os campos alterados
+    return analysis_dict
+
+
+def query_analysis_node(state: RAGState) -> Dict[str, Any]:
+    """
+    Analisa query usando LLM structured output para classificação inteligente
+    Verifica se documentos em file_paths precisam de ingestão
+    """
+
+    instruction, context, needs_ingestion = _query_analysis_request(state)
+    analysis = llm(instruction, QueryAnalysisResult, **context)
+    return _apply_query_analysis(state, analysis, needs_ingestion)
+
+
+async def aquery_analysis_node(state: RAGState) -> Dict[str, Any]:
+    """Versão assíncrona de query_analysis_node"""
+
+    instruction, context, needs_ingestion = _query_analysis_request(state)
+    analysis = await allm(instruction, QueryAnalysisResult, **context)
+    return _apply_query_analysis(state, analysis, needs_ingestion)
@@ -4,51 +4,164 @@ Evaluates and grades chunks based on relevance to query
 """
 
 from pydantic import BaseModel, Field
-from typing import List
-from ..utils import llm
+from typing import Any, Dict, List, Optional, Tuple
+from ..utils import llm, allm, chunk_lookup
 from ..models.state import RAGState
-from ..models.chunks import GradedChunk
+from ..models.chunks import ChunkGrade, ChunkResult, GradedChunk
+from ..reranker import semantic_similarity
+from ..chunk_arena import load_retrieved, store_chunks
+import logging
+import os
+import threading
 import time
 
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Cosseno query-chunk acima do qual o chunk é aceito sem LLM, e abaixo do qual é
+# rejeitado; calibrado para o HashingEmbedder (ajuste ao trocar de embedder)
+PREGRADE_ACCEPT = float(os.environ.get("RAG_PREGRADE_ACCEPT", "0.55"))
+PREGRADE_REJECT = float(os.environ.get("RAG_PREGRADE_REJECT", "0.35"))
+
+_STATS = {"chunks": 0, "bypassed": 0, "llm_calls": 0}
+_STATS_LOCK = threading.Lock()
+
 
 class GradedChunksResponse(BaseModel):
     """Response model for graded chunks generation"""
-    graded_chunks: List[GradedChunk] = Field(
-        description="List of chunks graded by relevance to the query"
+    graded_chunks: List[ChunkGrade] = Field(
+        description="List of chunk grades referencing chunks by chunk_id only"
     )
 
 
-def relevance_grading_node(state: RAGState) -> RAGState:
+def pregrade(state: RAGState) -> Tuple[List[GradedChunk], List[ChunkResult]]:
     """
-    Avalia relevância dos chunks para a query processada
+    Pré-grading por similaridade query-chunk em lote: aceites e rejeites claros
+    recebem nota local; retorna também a faixa ambígua, que segue para o LLM
     """
+    chunks = load_retrieved(state)
+    query = state.processed_query or state.original_query or ""
+    similarity = semantic_similarity(query, chunks, state.vector_db_type)
 
-    start_time = time.time()
+    # Faixa [rejeite, aceite] -> [0.2, 0.8]; confiança cresce com a distância da faixa
+    scores = np.interp(similarity, [0.0, PREGRADE_REJECT, PREGRADE_ACCEPT, 1.0], [0.0, 0.2, 0.8, 1.0])
+    confidence = np.interp(similarity, [0.0, PREGRADE_REJECT, PREGRADE_ACCEPT, 1.0], [1.0, 0.5, 0.5, 1.0])
+
+    graded, ambiguous = [], []
+    for chunk, sim, score, conf in zip(chunks, similarity, scores, confidence):
+        if PREGRADE_REJECT < sim < PREGRADE_ACCEPT:
+            ambiguous.append(chunk)
+        else:
+            graded.append(GradedChunk(chunk=chunk, relevance_score=float(score), confidence=float(conf)))
+    return graded, ambiguous
+
+
+def _record_pregrade(total: int, bypassed: int) -> Optional[float]:
+    with _STATS_LOCK:
+        _STATS["chunks"] += total
+        _STATS["bypassed"] += bypassed
+        _STATS["llm_calls"] += int(bypassed < total)
+    return bypassed / total if total else None
+
+
+def pregrade_stats() -> Dict[str, Any]:
+    """Totais do processo: chunks avaliados, quantos dispensaram o LLM e chamadas feitas"""
+    with _STATS_LOCK:
+        stats = dict(_STATS)
+    stats["bypass_rate"] = stats["bypassed"] / stats["chunks"] if stats["chunks"] else 0.0
+    return stats
+
+
+def _grading_request(state: RAGState, chunks: List[ChunkResult]) -> Tuple[str, Dict[str, Any]]:
+    """Monta instrução e contexto da avaliação de relevância (só a faixa ambígua)"""
 
-    # Single LLM call to generate graded chunks
     instruction = f"""
     Grade chunks for relevance to query: "{state.processed_query}"
     
-    For each chunk, provide:
+    For each chunk, return its chunk_id and:
     - Relevance score (0.0-1.0)
-    - Grading justification
-    - Key relevance factors
+    - Confidence of the grade (0.0-1.0)
+    
+    Reference chunks by chunk_id only; do not repeat chunk content.
     
     Query type: {state.query_type}
     Query complexity: {state.query_complexity}
     """
 
-    response = llm(
-        instruction,
-        GradedChunksResponse,
-        retrieved_chunks=state.retrieved_chunks,
+    context = dict(
+        retrieved_chunks={chunk.chunk_id: chunk.content for chunk in chunks},
         query=state.processed_query,
         query_type=state.query_type,
     )
+    return instruction, context
+
+
+def _apply_grading(
+    state: RAGState,
+    local_grades: List[GradedChunk],
+    ambiguous: List[ChunkResult],
+    response: Optional[GradedChunksResponse],
+    start_time: float,
+) -> Dict[str, Any]:
+    # Reconstrói os GradedChunk completos a partir dos IDs retornados
+    chunks_by_id = chunk_lookup(ambiguous)
+    graded_chunks = list(local_grades)
+    for grade in response.graded_chunks if response else []:
+        chunk = chunks_by_id.get(grade.chunk_id)
+        if chunk is None:
+            logger.warning(f"Grading returned unknown chunk_id: {grade.chunk_id}")
+            continue
+        graded_chunks.append(
+            GradedChunk(
+                chunk=chunk,
+                relevance_score=grade.relevance_score,
+                confidence=grade.confidence,
+            )
+        )
+
+    # Mantém a ordem do retrieval
+    order = {chunk_id: i for i, chunk_id in enumerate(state.retrieved_chunks or [])}
+    graded_chunks.sort(key=lambda graded: order.get(graded.chunk.chunk_id, len(order)))
+
+    total = len(state.retrieved_chunks or [])
 
     # Update metrics and return
-    state.processing_time = time.time() - start_time
+    return {
+        **store_chunks(state, graded=graded_chunks),
+        "grading_bypass_rate": _record_pregrade(total, total - len(ambiguous)),
+        "processing_time": time.time() - start_time,
+    }
 
-    return state.copy(
-        graded_chunks=response.graded_chunks,
-    )
+
+def relevance_grading_node(state: RAGState) -> Dict[str, Any]:
+    """
+    Avalia relevância dos chunks para a query processada
+
+    Pré-grading por similaridade de embeddings decide localmente os casos
+    claros; só a faixa ambígua vai ao LLM, em uma única chamada.
+    """
+
+    start_time = time.time()
+
+    local_grades, ambiguous = pregrade(state)
+    response = None
+    if ambiguous:
+        instruction, context = _grading_request(state, ambiguous)
+        response = llm(instruction, GradedChunksResponse, **context)
+
+    return _apply_grading(state, local_grades, ambiguous, response, start_time)
+
+
+async def arelevance_grading_node(state: RAGState) -> Dict[str, Any]:
+    """Versão assíncrona de relevance_grading_node"""
+
+    start_time = time.time()
+
+    local_grades, ambiguous = pregrade(state)
+    response = None
+    if ambiguous:
+        instruction, context = _grading_request(state, ambiguous)
+        response = await allm(instruction, GradedChunksResponse, **context)
+
+    return _apply_grading(state, local_grades, ambiguous, response, start_time)
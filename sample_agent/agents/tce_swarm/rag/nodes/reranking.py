@@ -4,29 +4,29 @@ Reorders chunks based on relevance scores and query context
 """
 
 from pydantic import BaseModel, Field
-from typing import List, Optional
-from ..utils import llm
+from typing import Any, Dict, List, Optional, Tuple
+from ..utils import llm, allm, chunk_lookup
 from ..models.state import RAGState
-from ..models.chunks import RerankedChunk
+from ..models.chunks import ChunkRanking, RerankedChunk
+from ..reranker import get_reranker
+from ..chunk_arena import load_enriched, store_chunks
+import logging
 import time
 
+logger = logging.getLogger(__name__)
+
 
 class RerankedChunksResponse(BaseModel):
     """Response model for reranked chunks generation"""
 
-    reranked_chunks: List[RerankedChunk] = Field(
-        description="List of chunks reranked by relevance and context"
+    reranked_chunks: List[ChunkRanking] = Field(
+        description="List of chunk rankings referencing chunks by chunk_id only"
     )
 
 
-def reranking_node(state: RAGState) -> RAGState:
-    """
-    Reordena chunks baseado em relevância e contexto da query
-    """
+def _reranking_request(state: RAGState, candidates: List[RerankedChunk]) -> Tuple[str, Dict[str, Any]]:
+    """Monta instrução e contexto do reranking (só o top-k empatado no ranking local)"""
 
-    start_time = time.time()
-
-    # Single LLM call to generate reranked chunks
     instruction = f"""
     Rerank chunks based on relevance to query: "{state.processed_query}"
     
@@ -36,20 +36,96 @@ def reranking_node(state: RAGState) -> RAGState:
     - Temporal relevance
     - Cross-reference strength
     
-    Return chunks in order of relevance (most relevant first).
+    Return chunk_ids in order of relevance (most relevant first).
+    Reference chunks by chunk_id only; do not repeat chunk content.
     """
 
-    response = llm(
-        instruction,
-        RerankedChunksResponse,
-        enriched_context=state.enriched_context,
+    context = dict(
+        enriched_context=[
+            {
+                "chunk_id": reranked.chunk.chunk.chunk_id,
+                "content": reranked.chunk.chunk.content,
+                "relevance_score": reranked.chunk.relevance_score,
+                "local_score": reranked.final_score,
+                "enriched_context": reranked.chunk.enriched_context,
+                "cross_references": reranked.chunk.cross_references,
+            }
+            for reranked in candidates
+        ],
         query_type=state.query_type,
         query_complexity=state.query_complexity,
     )
+    return instruction, context
+
 
+def _local_reranking(state: RAGState) -> List[RerankedChunk]:
+    query = state.processed_query or state.original_query or ""
+    return get_reranker().rerank(query, load_enriched(state), state.vector_db_type)
+
+
+def _merge_llm_ranking(local: List[RerankedChunk], response: RerankedChunksResponse, top_k: int) -> List[RerankedChunk]:
+    # Ordem do LLM para o top-k; IDs omitidos mantêm a ordem local; o restante não muda
+    top = local[:top_k]
+    local_by_id = chunk_lookup(top, lambda reranked: reranked.chunk.chunk.chunk_id)
+    merged = []
+    for ranking in response.reranked_chunks:
+        reranked = local_by_id.pop(ranking.chunk_id, None)
+        if reranked is None:
+            logger.warning(f"Reranking returned unknown chunk_id: {ranking.chunk_id}")
+            continue
+        merged.append(
+            RerankedChunk(
+                chunk=reranked.chunk,
+                final_score=ranking.final_score,
+                ranking_factors=reranked.ranking_factors,
+            )
+        )
+    merged.extend(reranked for reranked in top if reranked.chunk.chunk.chunk_id in local_by_id)
+    return merged + local[top_k:]
+
+
+def _apply_reranking(
+    state: RAGState, reranked_chunks: List[RerankedChunk], start_time: float
+) -> Dict[str, Any]:
     # Update metrics and return
-    state.processing_time = state.processing_time + (time.time() - start_time)
+    processing_time = (state.processing_time or 0.0) + (time.time() - start_time)
 
-    return state.copy(
-        reranked_chunks=response.reranked_chunks,
-    )
+    return {
+        **store_chunks(state, reranked=reranked_chunks),
+        "processing_time": processing_time,
+    }
+
+
+def reranking_node(state: RAGState) -> Dict[str, Any]:
+    """
+    Reordena chunks baseado em relevância e contexto da query
+
+    Ranking local (fatores vetorizados com pesos do config/rag_reranking.yaml);
+    o LLM só é consultado para o top-k quando os scores locais ficam próximos.
+    """
+
+    start_time = time.time()
+
+    reranker = get_reranker()
+    reranked = _local_reranking(state)
+    if reranker.needs_llm(reranked):
+        instruction, context = _reranking_request(state, reranked[: reranker.llm_top_k])
+        response = llm(instruction, RerankedChunksResponse, **context)
+        reranked = _merge_llm_ranking(reranked, response, reranker.llm_top_k)
+
+    return _apply_reranking(state, reranked, start_time)
+
+
+async def areranking_node(state: RAGState) -> Dict[str, Any]:
+    """Versão assíncrona de reranking_node"""
+
+    start_time = time.time()
+
+    reranker = get_reranker()
+    reranked = _local_reranking(state)
+    if reranker.needs_llm(reranked):
+        instruction, context = _reranking_request(state, reranked[: reranker.llm_top_k])
+        response = await allm(instruction, RerankedChunksResponse, **context)
+        reranked = _merge_llm_ranking(reranked, response, reranker.llm_top_k)
+
+    return _apply_reranking(state, reranked, start_time)
@@ -3,13 +3,57 @@ Response Generation Node for RAG Pipeline
 Generates final response with context and specific citations
 """
 
-from ..utils import llm
+from typing import Any, Dict, List, Tuple
+from langgraph.config import get_stream_writer
+from ..utils import DEFAULT_MODEL_NAME, llm, allm, llm_stream, allm_stream
 from ..models.state import RAGState
 from ..models.responses import ResponseGenerationResult
 from ..models.chunks import Citation
+from ..chunk_arena import load_reranked
+from ..context_packer import CITATION_MARKER_RE, PackedContext, marker_indices, pack_context
+import os
 import time
 import random
 
+# Streaming da resposta quando o estado não define stream_generation
+STREAM_GENERATION_DEFAULT = os.environ.get("RAG_STREAM_GENERATION", "0") == "1"
+
+# Maior marcador que pode ficar partido entre dois trechos do stream
+_MARKER_TAIL = 16
+
+
+def streaming_enabled(state: RAGState) -> bool:
+    return STREAM_GENERATION_DEFAULT if state.stream_generation is None else state.stream_generation
+
+
+class CitationStream:
+    """
+    Resolve marcadores [n] em Citation à medida que o texto chega; cada
+    citação é emitida uma única vez, na ordem de primeira menção
+    """
+
+    def __init__(self, citations: List[Citation]):
+        self.citations = citations
+        self.text = ""
+        self.resolved: List[Citation] = []
+        self._seen = set()
+        self._scan_from = 0
+
+    def feed(self, piece: str) -> List[Tuple[int, Citation]]:
+        self.text += piece
+        new = []
+        for match in CITATION_MARKER_RE.finditer(self.text, self._scan_from):
+            for index in marker_indices(match):
+                if index in self._seen or not 1 <= index <= len(self.citations):
+                    continue
+                self._seen.add(index)
+                citation = self.citations[index - 1]
+                self.resolved.append(citation)
+                new.append((index, citation))
+        # Reexamina só o final, onde um marcador pode estar incompleto
+        self._scan_from = max(self._scan_from, len(self.text) - _MARKER_TAIL)
+        return new
+
 
 def response_generation_node(state: RAGState) -> RAGState:
     """
@@ -17,15 +61,14 @@ def response_generation_node(state: RAGState) -> RAGState:
 
     ALGORITMO COMPLETO (Lógica de Negócio Original):
 
-    1. CONSTRUÇÃO DE CONTEXTO:
-       - Itera sobre state.reranked_chunks
-       - Para cada chunk reranked:
-         * Extrai chunk_content = reranked_chunk.chunk.chunk.content
-         * Cria entrada numerada: f"[{i+1}] {chunk_content}"
-         * Adiciona a context_parts[]
+    1. CONSTRUÇÃO DE CONTEXTO (context_packer):
+       - Seleciona state.reranked_chunks por MMR (relevância x diversidade)
+       - Colapsa quase-duplicatas (cosseno >= DUPLICATE_SIMILARITY)
+       - Para no orçamento de tokens do modelo de geração
+       - Cria entradas numeradas: f"[{i+1}] {chunk_content}"
 
     2. GERAÇÃO DE CITAÇÕES:
-       - Para cada reranked_chunk:
+       - Para cada chunk empacotado (mesma numeração do contexto):
          * Cria Citation com:
            - source: f"Documento {i+1}"
            - document_type: state.query_type
@@ -36,7 +79,7 @@ def response_generation_node(state: RAGState) -> RAGState:
 
     3. PREPARAÇÃO DO CONTEXTO FINAL:
        - final_context = "\n\n".join(context_parts)
-       - Contexto numerado com todos os chunks relevantes
+       - Contexto numerado com os chunks empacotados
 
     4. GERAÇÃO VIA LLM:
        - Prompt estruturado com:
@@ -44,7 +87,7 @@ def response_generation_node(state: RAGState) -> RAGState:
          * CONTEXTO: final_context completo
          * DIRETRIZES: 6 regras específicas
            1. Linguagem formal e técnica
-           2. Citações específicas formato [fonte]
+           2. Citações pelo número do documento no contexto: [n]
            3. Vigência temporal quando relevante
            4. Especificidades institucionais
            5. Precisão mantida
@@ -68,6 +111,7 @@ def response_generation_node(state: RAGState) -> RAGState:
 
     MÉTRICAS COLETADAS:
     - processing_time: tempo total acumulado
+    - context_tokens: tokens do contexto empacotado
     - citations: array com source, document_type, document_number, excerpt, confidence
     - final_context: contexto formatado para debug/análise
 
@@ -81,17 +125,47 @@ def response_generation_node(state: RAGState) -> RAGState:
 
     start_time = time.time()
 
-    # 1. CONSTRUÇÃO DE CONTEXTO
-    context_parts = []
+    packed = pack_context(load_reranked(state), DEFAULT_MODEL_NAME, vector_db_type=state.vector_db_type)
+    instruction, context = _generation_request(state, packed)
+
+    if streaming_enabled(state):
+        write, citations = get_stream_writer(), _citation_stream(context)
+        for piece in llm_stream(instruction + STREAMING_FORMAT, **context):
+            _emit(write, citations, piece)
+        return _apply_streamed_generation(state, citations, packed, start_time)
+
+    generation_result = llm(instruction, ResponseGenerationResult, **context)
+
+    return _apply_generation(state, generation_result, packed, start_time)
+
+
+async def aresponse_generation_node(state: RAGState) -> RAGState:
+    """Versão assíncrona de response_generation_node"""
+
+    start_time = time.time()
+
+    packed = pack_context(load_reranked(state), DEFAULT_MODEL_NAME, vector_db_type=state.vector_db_type)
+    instruction, context = _generation_request(state, packed)
+
+    if streaming_enabled(state):
+        write, citations = get_stream_writer(), _citation_stream(context)
+        async for piece in allm_stream(instruction + STREAMING_FORMAT, **context):
+            _emit(write, citations, piece)
+        return _apply_streamed_generation(state, citations, packed, start_time)
+
+    generation_result = await allm(instruction, ResponseGenerationResult, **context)
+
+    return _apply_generation(state, generation_result, packed, start_time)
+
+
+def _generation_request(state: RAGState, packed: PackedContext) -> Tuple[str, Dict[str, Any]]:
+    """Etapas 2-4: citações do contexto empacotado e instrução de geração"""
+
     citations = []
-    
-    for i, reranked_chunk in enumerate(state.reranked_chunks):
-        # Extrai chunk_content = reranked_chunk.chunk.chunk.content
+
+    for i, reranked_chunk in enumerate(packed.chunks):
         chunk_content = reranked_chunk.chunk.chunk.content
-        
-        # Cria entrada numerada: f"[{i+1}] {chunk_content}"
-        context_parts.append(f"[{i+1}] {chunk_content}")
-        
+
         # 2. GERAÇÃO DE CITAÇÕES
         # Para cada reranked_chunk: cria Citation
         excerpt = chunk_content[:100] + "..." if len(chunk_content) > 100 else chunk_content
@@ -108,7 +182,7 @@ def response_generation_node(state: RAGState) -> RAGState:
         citations.append(citation)
 
     # 3. PREPARAÇÃO DO CONTEXTO FINAL
-    final_context = "\n\n".join(context_parts)
+    final_context = packed.context
 
     # 4. GERAÇÃO VIA LLM
     instruction = f"""
@@ -119,7 +193,7 @@ def response_generation_node(state: RAGState) -> RAGState:
     
     DIRETRIZES ESPECÍFICAS:
     1. Linguagem formal e técnica
-    2. Citações específicas formato [fonte]
+    2. Citações pelo número do documento no contexto, como [1] ou [2, 3]
     3. Precisão mantida
     4. Estrutura clara
     5. Não use parágrafos, seja tecnico e direto
@@ -130,22 +204,64 @@ def response_generation_node(state: RAGState) -> RAGState:
     Formato: Markdown
     """
 
-    generation_result = llm(
-        instruction,
-        ResponseGenerationResult,
+    context = dict(
         query=state.original_query,
         context=final_context,
         query_type=state.query_type,
         temporal_context=state.temporal_context,
         citations=[citation.model_dump() for citation in citations],
     )
+    return instruction, context
+
+
+# Em streaming a saída é texto livre: as citações vêm dos marcadores [n]
+STREAMING_FORMAT = """
+    Responda apenas com o texto da resposta e cite os documentos pelo número, como [1] ou [2, 3].
+    """
+
+
+def _citation_stream(context: Dict[str, Any]) -> CitationStream:
+    return CitationStream([Citation(**citation) for citation in context["citations"]])
+
+
+def _emit(write, citations: CitationStream, piece: str) -> None:
+    # Evento "custom" do LangGraph; os tokens também saem no stream_mode="messages"
+    write({"event": "token", "text": piece})
+    for index, citation in citations.feed(piece):
+        write({"event": "citation", "index": index, "citation": citation.model_dump()})
+
+
+def _apply_streamed_generation(
+    state: RAGState,
+    citations: CitationStream,
+    packed: PackedContext,
+    start_time: float,
+) -> RAGState:
+    processing_time = (state.processing_time or 0.0) + (time.time() - start_time)
+
+    # quality_score fica para a validação posterior ao stream
+    return state.copy(
+        generated_response=citations.text,
+        citations=citations.resolved,
+        final_context=packed.context,
+        context_tokens=packed.tokens,
+        processing_time=processing_time,
+    )
+
 
-    processing_time = state.processing_time + (time.time() - start_time)
+def _apply_generation(
+    state: RAGState,
+    generation_result: ResponseGenerationResult,
+    packed: PackedContext,
+    start_time: float,
+) -> RAGState:
+    processing_time = (state.processing_time or 0.0) + (time.time() - start_time)
 
     return state.copy(
         generated_response=generation_result.generated_response,
         citations=generation_result.citations,
         quality_score=generation_result.quality_score,
-        final_context=final_context,
+        final_context=packed.context,
+        context_tokens=packed.tokens,
         processing_time=processing_time,
     )
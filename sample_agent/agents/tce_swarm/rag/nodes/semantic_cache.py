@@ -0,0 +1,72 @@
+"""
+Semantic Answer Cache Node for RAG Pipeline
+Reuses final answers of near-identical questions asked in the same scope and corpus version
+"""
+
+from typing import Hashable, Tuple
+from ..models.state import RAGState
+from ..cache import get_semantic_cache
+from ..index.manifest import get_manifest
+
+# Só respostas aprovadas pela validação de qualidade são reaproveitadas
+MIN_CACHEABLE_QUALITY = 0.7
+
+
+def _cache_scope(state: RAGState) -> Tuple[Hashable, ...]:
+    """Escopo de isolamento: respostas de um usuário/sessão nunca vazam para outro"""
+    scope = state.document_scope or "global"
+    return (
+        state.vector_db_type,
+        scope,
+        state.user_id if scope != "global" else None,
+        state.session_id if scope == "session_specific" else None,
+        tuple(sorted(state.collection_names or [])),
+        state.query_type,
+    )
+
+
+def _query(state: RAGState) -> str:
+    return state.original_query or state.messages[-1].content
+
+
+def corpus_version(state: RAGState) -> int:
+    return get_manifest(state.vector_db_type).version
+
+
+def semantic_cache_node(state: RAGState) -> RAGState:
+    """
+    Consulta o cache semântico após a análise da query: se uma pergunta
+    equivalente já foi respondida no mesmo escopo e versão do corpus,
+    devolve a resposta e as citações sem retrieval nem geração.
+    """
+
+    cached = get_semantic_cache().lookup(_cache_scope(state), _query(state), corpus_version(state))
+    if cached is None:
+        return state.copy(semantic_cache_hit=False)
+
+    return state.copy(
+        generated_response=cached["generated_response"],
+        citations=cached["citations"],
+        quality_score=cached["quality_score"],
+        semantic_cache_hit=True,
+    )
+
+
+def remember_answer(state: RAGState) -> None:
+    """Grava a resposta final no cache semântico (se aprovada e não veio de cache/citação exata)"""
+
+    if state.semantic_cache_hit or state.citation_match or not state.generated_response:
+        return
+    if (state.quality_score or 0.0) <= MIN_CACHEABLE_QUALITY:
+        return
+
+    get_semantic_cache().store(
+        _cache_scope(state),
+        _query(state),
+        corpus_version(state),
+        {
+            "generated_response": state.generated_response,
+            "citations": list(state.citations or []),
+            "quality_score": state.quality_score,
+        },
+    )
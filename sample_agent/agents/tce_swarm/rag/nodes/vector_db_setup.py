@@ -4,9 +4,12 @@ Initializes and maintains vector database instances in memory
 """
 
 from pydantic import BaseModel, Field
-from typing import List, Optional
-from ..utils import llm
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from ..utils import llm, allm
 from ..models.state import RAGState
+from ..collections import get_collection_resolver
+from ..chunk_arena import reset_chunk_arena
 
 
 class CollectionNamesResponse(BaseModel):
@@ -17,12 +20,9 @@ class CollectionNamesResponse(BaseModel):
     )
 
 
-def vector_db_setup_node(state: RAGState) -> RAGState:
-    """
-    Configura vector database e determina collections baseadas no escopo
-    """
-    
-    # Single LLM call to generate collection names
+def _collection_names_request(state: RAGState) -> Tuple[str, Dict[str, Any]]:
+    """Monta instrução e contexto para geração dos nomes de coleção"""
+
     instruction = f"""
     Generate collection names for vector database based on scope:
     
@@ -33,16 +33,68 @@ def vector_db_setup_node(state: RAGState) -> RAGState:
     Return list of collection names following naming patterns for the scope.
     if the scope is "global", return a collection_names list with a single element "global"
     """
-    
-    response: CollectionNamesResponse = llm(
-        instruction,
-        CollectionNamesResponse,
+
+    context = dict(
         vector_db_type=state.vector_db_type,
         document_scope=state.document_scope,
         target_databases=state.target_databases,
     )
-    
+    return instruction, context
+
+
+def vector_db_setup_cache_key(state: RAGState) -> str:
+    """Chave do CachePolicy: apenas os campos do estado lidos pelo node"""
+    return json.dumps(
+        [state.vector_db_type, state.document_scope, state.target_databases, state.user_id, state.session_id],
+        default=str,
+    )
+
+
+def _resolve_collections(state: RAGState) -> Optional[List[str]]:
+    """Coleções pelas regras de config/rag_collections.yaml; None = escopo desconhecido com fallback LLM"""
+    return get_collection_resolver().resolve(
+        state.vector_db_type,
+        state.document_scope,
+        state.target_databases,
+        user_id=state.user_id,
+        session_id=state.session_id,
+    )
+
+
+def _apply_collection_names(state: RAGState, response: CollectionNamesResponse) -> Dict[str, Any]:
     if not response.collection_names:
         response.collection_names = ["global"]
-    
-    return state.copy(collection_names=response.collection_names) 
\ No newline at end of file
+
+    # Só os campos alterados: a saída é reaproveitada pelo cache de nodes
+    return {**reset_chunk_arena(), "collection_names": response.collection_names}
+
+
+def vector_db_setup_node(state: RAGState) -> Dict[str, Any]:
+    """
+    Configura vector database e determina collections baseadas no escopo.
+    Regras determinísticas do YAML; LLM apenas como fallback opcional.
+    Como node de entrada, também inicia a arena de chunks da execução
+    """
+
+    collection_names = _resolve_collections(state)
+    if collection_names is not None:
+        return {**reset_chunk_arena(), "collection_names": collection_names}
+
+    # Fallback: escopo desconhecido, uma chamada LLM para gerar os nomes
+    instruction, context = _collection_names_request(state)
+    response: CollectionNamesResponse = llm(instruction, CollectionNamesResponse, **context)
+
+    return _apply_collection_names(state, response)
+
+
+async def avector_db_setup_node(state: RAGState) -> Dict[str, Any]:
+    """Versão assíncrona de vector_db_setup_node"""
+
+    collection_names = _resolve_collections(state)
+    if collection_names is not None:
+        return {**reset_chunk_arena(), "collection_names": collection_names}
+
+    instruction, context = _collection_names_request(state)
+    response: CollectionNamesResponse = await allm(instruction, CollectionNamesResponse, **context)
+
+    return _apply_collection_names(state, response)
@@ -1,11 +1,11 @@
 """
-TCE Chonkie Processor Mock
-Simulates intelligent chunking strategies for juridical documents
+TCE Chonkie Processor
+Local streaming chunking strategies for juridical documents
 """
 
-from typing import Dict, Any, List
-from ..utils import llm, mock_chunking
-from ..models.chunks import ChunkingResult, ChunkResult
+from typing import Dict, Any, Iterator, List, Optional
+from ..models.chunks import ChunkingResult, ChunkMetadata, ChunkResult
+from .text_chunker import StreamingChunker, TextStream, iter_file
 import time
 
 class TCE_ChonkieProcessor:
@@ -24,7 +24,7 @@ class TCE_ChonkieProcessor:
                 "description": "Estrutura hierárquica preservada",
                 "chunk_size": 512,
                 "chunk_overlap": 50,
-                "separators": ["\\n## ", "\\n### ", "\\n", ". "],
+                "separators": ["\n## ", "\n### ", "\nArt. ", "\n§ ", "\n", ". "],
                 "use_case": "legislation"
             },
             "semantic": {
@@ -32,6 +32,7 @@ class TCE_ChonkieProcessor:
                 "chunk_size": 400,
                 "chunk_overlap": 40,
                 "model": "sentence-transformers/all-MiniLM-L6-v2",
+                "separators": ["\n\n", "\n", ". ", "; "],
                 "use_case": "acordao"
             },
             "sdpm": {
@@ -39,6 +40,7 @@ class TCE_ChonkieProcessor:
                 "chunk_size": 300,
                 "chunk_overlap": 30,
                 "semantic_threshold": 0.8,
+                "separators": ["\nArt. ", "\n§ ", "\n\n", ". ", "; "],
                 "use_case": "resolucao"
             },
             "late": {
@@ -46,6 +48,7 @@ class TCE_ChonkieProcessor:
                 "chunk_size": 600,
                 "chunk_overlap": 60,
                 "model": "sentence-transformers/all-MiniLM-L6-v2",
+                "separators": ["\n## ", "\n\n", "\n", ". "],
                 "use_case": "jurisprudencia"
             }
         }
@@ -54,7 +57,56 @@ class TCE_ChonkieProcessor:
         """
         Aplica estratégia de chunking específica no conteúdo
         """
-        return mock_chunking(content, strategy, config)
+        start_time = time.time()
+        chunks = list(self.iter_chunks(content, strategy, config))
+        return ChunkingResult(
+            chunks=chunks,
+            strategy_used=strategy if strategy in self.chunking_strategies else "recursive",
+            total_chunks=len(chunks),
+            processing_time=time.time() - start_time,
+        )
+
+    def iter_chunks(
+        self,
+        text: TextStream,
+        strategy: str,
+        config: Optional[Dict[str, Any]] = None,
+        document_id: Optional[str] = None,
+        issued: Optional[str] = None,
+    ) -> Iterator[ChunkResult]:
+        """
+        Gera ChunkResults incrementalmente a partir de uma string ou stream de
+        blocos de texto, com memória limitada à janela do chunk corrente.
+        Tamanhos (chunk_size/chunk_overlap) em tokens; config sobrescreve a estratégia.
+        `issued` (data de emissão do documento, ISO) vai para metadata.timestamp.
+        """
+        settings = {**self.chunking_strategies.get(strategy, self.chunking_strategies["recursive"])}
+        settings.update({key: value for key, value in (config or {}).items() if value is not None})
+        chunker = StreamingChunker(settings["chunk_size"], settings["chunk_overlap"], settings["separators"])
+
+        prefix = document_id or "chunk"
+        for index, (content, section) in enumerate(chunker.split(text)):
+            yield ChunkResult(
+                content=content,
+                chunk_id=f"{prefix}#{index}",
+                metadata=ChunkMetadata(
+                    document_id=document_id,
+                    page_number=None,
+                    section=section,
+                    chunk_index=index,
+                    timestamp=issued,
+                ),
+            )
+
+    def chunk_file(
+        self,
+        file_path: str,
+        strategy: str,
+        config: Optional[Dict[str, Any]] = None,
+        document_id: Optional[str] = None,
+    ) -> Iterator[ChunkResult]:
+        """Chunking em streaming direto de um arquivo texto/markdown"""
+        return self.iter_chunks(iter_file(file_path), strategy, config, document_id)
     
     def get_optimal_strategy(self, doc_type: str, complexity: str) -> str:
         """
@@ -3,11 +3,23 @@ TCE Docling Processor Mock
 Simulates document reading and parsing with structured output
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from ..utils import llm, mock_document_processing
 from ..models.documents import DoclingProcessingResult, DocumentStructure
+import logging
+import os
 import time
 
+logger = logging.getLogger(__name__)
+
+try:  # Docling é opcional: sem ele PDFs/DOCX seguem para a simulação via LLM
+    from docling.document_converter import DocumentConverter
+except ImportError:  # pragma: no cover - depende do ambiente
+    DocumentConverter = None
+
+# Formatos lidos diretamente como texto, sem conversão
+TEXT_EXTENSIONS = (".md", ".markdown", ".txt")
+
 class TCE_DoclingProcessor:
     """
     Processador Docling especializado para documentos jurídicos TCE-PA
@@ -48,9 +60,47 @@ class TCE_DoclingProcessor:
     
     def process_document(self, file_path: str, doc_type: str) -> DoclingProcessingResult:
         """
-        Processamento robusto com fallbacks para documentos TCE-PA
+        Processamento robusto com fallbacks para documentos TCE-PA:
+        texto/markdown lidos direto, demais formatos via Docling quando instalado,
+        e simulação via LLM como último recurso
         """
-        return mock_document_processing(file_path, doc_type)
+        start_time = time.time()
+        try:
+            markdown = self._convert_locally(file_path)
+        except Exception as e:
+            logger.warning(f"Local conversion failed for {file_path}: {e}")
+            markdown = None
+
+        if markdown is None:
+            return mock_document_processing(file_path, doc_type)
+
+        return DoclingProcessingResult(
+            success=True,
+            method="docling" if not file_path.lower().endswith(TEXT_EXTENSIONS) else "text",
+            raw_markdown=markdown,
+            structured_content=DocumentStructure(
+                header=markdown.strip().split("\n", 1)[0][:200] if markdown.strip() else "",
+                sections=[],
+                articles=[],
+                annexes=[],
+                signatures=[],
+            ),
+            metadata={"file_path": file_path, "doc_type": doc_type, "size_bytes": len(markdown.encode("utf-8"))},
+            confidence=1.0,
+            processing_time=time.time() - start_time,
+            tables=[],
+        )
+
+    def _convert_locally(self, file_path: str) -> Optional[str]:
+        """Markdown do documento sem LLM, ou None se não houver conversor local"""
+        if not file_path or not os.path.isfile(file_path):
+            return None
+        if file_path.lower().endswith(TEXT_EXTENSIONS):
+            with open(file_path, encoding="utf-8", errors="replace") as f:
+                return f.read()
+        if DocumentConverter is not None:
+            return DocumentConverter().convert(file_path).document.export_to_markdown()
+        return None
     
     def _validate_extraction_quality(self, result: DoclingProcessingResult) -> bool:
         """Validação de qualidade da extração"""
@@ -0,0 +1,122 @@
+"""
+Streaming Text Chunker for RAG Pipeline
+Separator-driven recursive chunking over a text stream in bounded memory
+
+The chunker keeps only the current window (chunk size + one input block) in
+memory: each chunk is cut at the highest-priority separator found in the second
+half of the window, emitted, and the buffer is trimmed to the overlap tail
+(aligned to a separator boundary; cuts before a heading or article carry none).
+Sizes are in tokens, approximated as CHARS_PER_TOKEN characters.
+"""
+
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import re
+
+# Aproximação tokens -> caracteres para texto em português
+CHARS_PER_TOKEN = 4
+# Tamanho dos blocos lidos de arquivos/strings
+READ_BLOCK_CHARS = 64 * 1024
+
+_HEADING_RE = re.compile(r"^#{1,6}\s+(.+?)\s*$", re.MULTILINE)
+
+TextStream = Union[str, Iterable[str]]
+
+
+def iter_blocks(text: TextStream, block_chars: int = READ_BLOCK_CHARS) -> Iterator[str]:
+    """Normaliza string ou iterável de strings em blocos de texto"""
+    if isinstance(text, str):
+        for start in range(0, len(text), block_chars):
+            yield text[start : start + block_chars]
+        return
+    yield from text
+
+
+def iter_file(file_path: str, block_chars: int = READ_BLOCK_CHARS) -> Iterator[str]:
+    """Lê um arquivo texto/markdown em blocos, sem carregá-lo inteiro"""
+    with open(file_path, encoding="utf-8", errors="replace") as f:
+        for block in iter(lambda: f.read(block_chars), ""):
+            yield block
+
+
+class StreamingChunker:
+    """
+    Chunker recursivo por separadores com overlap, em streaming.
+
+    Os separadores são tentados em ordem de prioridade; separadores de linha
+    (ex.: "\\n## ") cortam antes do marcador, de modo que títulos e artigos
+    abrem o chunk seguinte. Sem separador na janela, corta no último espaço.
+
+    O overlap só se aplica a cortes fora de marcadores e começa na primeira
+    fronteira de separador dentro da janela de overlap (na falta dela, numa
+    fronteira de palavra), nunca no meio de uma palavra.
+    """
+
+    def __init__(self, chunk_size: int, chunk_overlap: int, separators: Sequence[str]):
+        self.max_chars = max(16, int(chunk_size)) * CHARS_PER_TOKEN
+        # Overlap limitado a 1/4 do chunk para garantir progresso
+        self.overlap_chars = min(max(0, int(chunk_overlap)) * CHARS_PER_TOKEN, self.max_chars // 4)
+        self.separators: List[str] = [sep for sep in separators if sep]
+
+    def split(self, text: TextStream) -> Iterator[Tuple[str, Optional[str]]]:
+        """Gera (conteúdo, seção) para cada chunk do stream"""
+        buffer, pos = "", 0
+        section: Optional[str] = None
+        for block in iter_blocks(text):
+            # Compacta o buffer só a cada bloco; dentro dele avança um cursor
+            buffer, pos = buffer[pos:] + block, 0
+            while len(buffer) - pos > self.max_chars:
+                cut = self._find_cut(buffer, pos)
+                raw = buffer[pos:cut]
+                chunk_section, section = self._sections(raw, section)
+                if raw.strip():
+                    yield raw.strip(), chunk_section
+                pos = self._next_start(buffer, pos, cut)
+        tail = buffer[pos:]
+        if tail.strip():
+            yield tail.strip(), self._sections(tail, section)[0]
+
+    @staticmethod
+    def _sections(raw: str, section: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        """(seção do chunk, seção corrente após ele)"""
+        headings = _HEADING_RE.findall(raw)
+        if not headings:
+            return section, section
+        # Chunk aberto por um título pertence a ele; senão à seção anterior
+        chunk_section = headings[0] if raw.lstrip().startswith("#") else section
+        return chunk_section, headings[-1]
+
+    @staticmethod
+    def _is_line_separator(sep: str) -> bool:
+        return sep.startswith("\n") and len(sep) > 1
+
+    @staticmethod
+    def _is_marker(sep: str) -> bool:
+        """Separador de linha com texto (título, artigo), não só quebras de linha"""
+        return sep.startswith("\n") and bool(sep.strip())
+
+    def _boundary(self, sep: str, found: int) -> int:
+        return found + 1 if self._is_line_separator(sep) else found + len(sep)
+
+    def _find_cut(self, buffer: str, pos: int) -> int:
+        low, high = pos + self.max_chars // 2, pos + self.max_chars
+        for sep in self.separators:
+            found = buffer.rfind(sep, low, high)
+            if found != -1:
+                return self._boundary(sep, found)
+        found = buffer.rfind(" ", low, high)
+        return found + 1 if found != -1 else high
+
+    def _next_start(self, buffer: str, pos: int, cut: int) -> int:
+        if not self.overlap_chars:
+            return cut
+        # Corte antes de um marcador (título, artigo): o chunk seguinte abre nele, sem overlap
+        if any(buffer.startswith(sep, cut - 1) for sep in self.separators if self._is_marker(sep)):
+            return cut
+        start = max(cut - self.overlap_chars, pos + 1)
+        # Overlap começa na primeira fronteira de separador da janela; sem nenhuma, em palavra
+        for sep in self.separators:
+            found = buffer.find(sep, start - 1 if self._is_line_separator(sep) else start, cut)
+            if found != -1 and start <= self._boundary(sep, found) < cut:
+                return self._boundary(sep, found)
+        space = buffer.find(" ", start, cut)
+        return space + 1 if space != -1 else start
@@ -0,0 +1,97 @@
+"""
+Execution Profiles for RAG Pipeline
+Route selection by query complexity and per-node latency budgets
+
+A profile maps `query_complexity` to the optional stages that run between
+retrieval and the final answer (grading, enrichment, reranking, validation),
+and sets how many query variants are retrieved in parallel (multi-query).
+Skipped ranking stages are replaced by the local ranking node; a node that
+exceeds its budget degrades to the same local result instead of blocking.
+
+The default profile, "thorough", is the original pipeline: every stage for
+every query and no budgets. "balanced" and "fast" are opt-in through
+RAG_EXECUTION_PROFILE or RAGState.execution_profile.
+
+Multi-query is off by default (one extra rewrite call plus one retrieval per
+variant). RAG_QUERY_VARIANTS enables it for "balanced" and "thorough"; while it
+is active the variants replace the self-correction rewrite loop after grading.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Literal, Optional
+import os
+
+ProfileName = Literal["fast", "balanced", "thorough"]
+
+GRADING = "grading"
+ENRICHMENT = "enrichment"
+RERANKING = "reranking"
+VALIDATION = "validation"
+
+FULL = frozenset({GRADING, ENRICHMENT, RERANKING, VALIDATION})
+GRADED = frozenset({GRADING, VALIDATION})
+DIRECT: FrozenSet[str] = frozenset()
+
+# Variantes buscadas em paralelo nos perfis balanced/thorough (0 = multi-query desligado)
+DEFAULT_QUERY_VARIANTS = int(os.environ.get("RAG_QUERY_VARIANTS", "0"))
+
+# Complexidade ausente (ex.: análise pulada) é tratada como intermediária
+DEFAULT_COMPLEXITY = "medium"
+
+
+@dataclass(frozen=True)
+class ExecutionProfile:
+    """Rota por complexidade + orçamento de latência (segundos) por node"""
+
+    name: str
+    routes: Dict[str, FrozenSet[str]]
+    budgets: Dict[str, float] = field(default_factory=dict)
+    # Variantes da query buscadas em paralelo com a principal (0 = query única)
+    query_variants: int = 0
+
+    def stages(self, complexity: Optional[str]) -> FrozenSet[str]:
+        return self.routes.get(complexity or DEFAULT_COMPLEXITY, FULL)
+
+    def budget(self, node: str) -> Optional[float]:
+        return self.budgets.get(node)
+
+
+PROFILES: Dict[str, ExecutionProfile] = {
+    "fast": ExecutionProfile(
+        name="fast",
+        routes={"simple": DIRECT, "medium": DIRECT, "complex": frozenset({GRADING})},
+        budgets={
+            "document_retrieval": 1.0,
+            "relevance_grading": 3.0,
+            "response_generation": 15.0,
+        },
+        query_variants=0,
+    ),
+    "balanced": ExecutionProfile(
+        name="balanced",
+        routes={"simple": DIRECT, "medium": GRADED, "complex": FULL},
+        budgets={
+            "document_retrieval": 2.0,
+            "relevance_grading": 6.0,
+            "context_enrichment": 8.0,
+            "reranking": 6.0,
+            "response_generation": 30.0,
+            "quality_validation": 6.0,
+        },
+        query_variants=DEFAULT_QUERY_VARIANTS,
+    ),
+    # Pipeline original: todas as etapas, sem orçamento (latências só registradas);
+    # multi-query só com RAG_QUERY_VARIANTS
+    "thorough": ExecutionProfile(
+        name="thorough",
+        routes={"simple": FULL, "medium": FULL, "complex": FULL},
+        query_variants=DEFAULT_QUERY_VARIANTS,
+    ),
+}
+
+DEFAULT_PROFILE = os.environ.get("RAG_EXECUTION_PROFILE", "thorough")
+
+
+def get_profile(name: Optional[str] = None) -> ExecutionProfile:
+    """Perfil pelo nome (RAG_EXECUTION_PROFILE quando ausente; desconhecido cai no padrão)"""
+    return PROFILES.get(name or DEFAULT_PROFILE) or PROFILES["thorough"]
@@ -0,0 +1,191 @@
+"""
+Local Cascaded Reranker for RAG Pipeline
+Vectorized RankingFactors (embedding cosine, BM25, authority, recency, grading) with configurable weights
+
+Weights, the authority table and the optional LLM tier are read from
+`config/rag_reranking.yaml` (or RAG_RERANKING_CONFIG). The LLM tier is only
+consulted for the top-k when the local scores are too close to separate.
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+import logging
+import os
+import threading
+
+import numpy as np
+import yaml
+
+from .models.chunks import ChunkResult, EnrichedChunk, RankingFactors, RerankedChunk
+from .index.citations import document_type_of
+from .index.embeddings import HashingEmbedder
+from .index.hybrid import get_sparse_index
+from .index.vector_store import LOCAL_BACKENDS, get_vector_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RERANKING_CONFIG = os.environ.get(
+    "RAG_RERANKING_CONFIG",
+    str(Path(__file__).resolve().parents[4] / "config" / "rag_reranking.yaml"),
+)
+
+# Ordem das colunas da matriz de fatores (nomes de RankingFactors)
+FACTORS = ("semantic_similarity", "keyword_match", "document_authority", "recency", "context_relevance")
+
+DEFAULT_WEIGHTS = {
+    "semantic_similarity": 0.35,
+    "keyword_match": 0.25,
+    "document_authority": 0.10,
+    "recency": 0.05,
+    "context_relevance": 0.25,
+}
+
+_SECONDS_PER_DAY = 86400.0
+
+# Embedder para backends sem índice local (mesmo embedder padrão do índice)
+_FALLBACK_EMBEDDER = HashingEmbedder()
+
+
+def _local_store(vector_db_type: Optional[str]):
+    if (vector_db_type or LOCAL_BACKENDS[0]) in LOCAL_BACKENDS:
+        return get_vector_store(vector_db_type)
+    return None
+
+
+def chunk_embeddings(chunks: Sequence[ChunkResult], vector_db_type: Optional[str] = None) -> np.ndarray:
+    """Vetores normalizados dos chunks; no índice local reaproveita os vetores armazenados"""
+    store = _local_store(vector_db_type)
+    if store is not None:
+        return store.embeddings_for(chunks)
+    return _FALLBACK_EMBEDDER.embed_documents([chunk.content for chunk in chunks])
+
+
+def semantic_similarity(query: str, chunks: Sequence[ChunkResult], vector_db_type: Optional[str] = None) -> np.ndarray:
+    """Cosseno query-chunk em lote, em [0, 1]"""
+    if not chunks:
+        return np.zeros(0, dtype=np.float32)
+    store = _local_store(vector_db_type)
+    query_vector = (store.embedder if store is not None else _FALLBACK_EMBEDDER).embed_query(query)
+    return np.clip(chunk_embeddings(chunks, vector_db_type) @ query_vector, 0.0, 1.0)
+
+
+class LocalReranker:
+    """
+    Reordena chunks enriquecidos pela média ponderada dos RankingFactors.
+
+    Todos os fatores são calculados em lote com NumPy: cosseno contra os vetores
+    já indexados (sem reembedding), BM25 com as estatísticas do índice esparso,
+    autoridade por tipo de documento e recência por meia-vida.
+    """
+
+    def __init__(self, rules: Optional[Dict[str, Any]] = None):
+        rules = rules or {}
+        weights = {**DEFAULT_WEIGHTS, **(rules.get("weights") or {})}
+        self.weights = np.asarray([float(weights[name]) for name in FACTORS], dtype=np.float32)
+        self.authority: Dict[str, float] = rules.get("authority") or {}
+        self.default_authority = float(rules.get("default_authority", 0.5))
+        self.half_life_days = float(rules.get("recency_half_life_days", 1825))
+        self.neutral_recency = float(rules.get("neutral_recency", 0.5))
+        llm_tier = rules.get("llm_tier") or {}
+        self.llm_tier = bool(llm_tier.get("enabled", False))
+        self.llm_top_k = int(llm_tier.get("top_k", 5))
+        self.llm_margin = float(llm_tier.get("margin", 0.03))
+
+    @classmethod
+    def from_yaml(cls, path: str = DEFAULT_RERANKING_CONFIG) -> "LocalReranker":
+        try:
+            with open(path, encoding="utf-8") as f:
+                rules = yaml.safe_load(f) or {}
+        except (OSError, yaml.YAMLError) as e:
+            logger.error(f"Failed to load reranking rules {path}: {e}")
+            rules = {}
+        return cls(rules)
+
+    # ===== FATORES =====
+
+    def _keyword(self, query: str, candidates: Sequence[EnrichedChunk], vector_db_type: Optional[str]) -> np.ndarray:
+        if (vector_db_type or LOCAL_BACKENDS[0]) not in LOCAL_BACKENDS:
+            return np.zeros(len(candidates), dtype=np.float32)
+        scores = get_sparse_index(vector_db_type).score_chunks(query, [c.chunk.chunk_id for c in candidates])
+        best = scores.max() if len(scores) else 0.0
+        return scores / best if best > 0 else scores
+
+    def _authority(self, candidates: Sequence[EnrichedChunk]) -> np.ndarray:
+        return np.asarray(
+            [self.authority.get(document_type_of(c.chunk.content) or "", self.default_authority) for c in candidates],
+            dtype=np.float32,
+        )
+
+    def _recency(self, candidates: Sequence[EnrichedChunk]) -> np.ndarray:
+        # metadata.timestamp = data de emissão do documento (cabeçalho), não a da ingestão
+        now = datetime.now(timezone.utc).timestamp()
+        ages = np.full(len(candidates), np.nan, dtype=np.float64)
+        for i, candidate in enumerate(candidates):
+            timestamp = candidate.chunk.metadata.timestamp
+            if not timestamp:
+                continue
+            try:
+                parsed = datetime.fromisoformat(timestamp)
+            except ValueError:
+                continue
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            ages[i] = max(0.0, now - parsed.timestamp()) / _SECONDS_PER_DAY
+        recency = np.power(0.5, ages / self.half_life_days)
+        return np.where(np.isnan(recency), self.neutral_recency, recency).astype(np.float32)
+
+    def weights_for(self, vector_db_type: Optional[str] = None) -> np.ndarray:
+        """Pesos normalizados só sobre os fatores disponíveis no backend (BM25 só existe no índice local)"""
+        weights = self.weights.copy()
+        if (vector_db_type or LOCAL_BACKENDS[0]) not in LOCAL_BACKENDS:
+            weights[FACTORS.index("keyword_match")] = 0.0
+        total = weights.sum()
+        return weights / total if total > 0 else weights
+
+    def factors(self, query: str, candidates: Sequence[EnrichedChunk], vector_db_type: Optional[str] = None) -> np.ndarray:
+        """Matriz (n, len(FACTORS)) com os fatores de cada candidato"""
+        if not candidates:
+            return np.zeros((0, len(FACTORS)), dtype=np.float32)
+        context = np.asarray([c.relevance_score for c in candidates], dtype=np.float32)
+        return np.column_stack([
+            semantic_similarity(query, [c.chunk for c in candidates], vector_db_type),
+            self._keyword(query, candidates, vector_db_type),
+            self._authority(candidates),
+            self._recency(candidates),
+            context,
+        ]).astype(np.float32)
+
+    # ===== RANKING =====
+
+    def rerank(
+        self, query: str, candidates: Sequence[EnrichedChunk], vector_db_type: Optional[str] = None
+    ) -> List[RerankedChunk]:
+        """Candidatos ordenados pelo score combinado (maior primeiro)"""
+        matrix = self.factors(query, candidates, vector_db_type)
+        scores = np.clip(matrix @ self.weights_for(vector_db_type), 0.0, 1.0)
+        reranked = []
+        for row in np.argsort(-scores, kind="stable"):
+            factors = RankingFactors(**{name: float(np.clip(value, 0.0, 1.0)) for name, value in zip(FACTORS, matrix[row])})
+            reranked.append(RerankedChunk(chunk=candidates[row], final_score=float(scores[row]), ranking_factors=factors))
+        return reranked
+
+    def needs_llm(self, reranked: Sequence[RerankedChunk]) -> bool:
+        """Tier LLM: só quando habilitado e o top-k local está dentro da margem"""
+        if not self.llm_tier or len(reranked) < 2:
+            return False
+        top = reranked[: self.llm_top_k]
+        return top[0].final_score - top[-1].final_score < self.llm_margin
+
+
+_RERANKER: Optional[LocalReranker] = None
+_RERANKER_LOCK = threading.Lock()
+
+
+def get_reranker() -> LocalReranker:
+    """Reranker process-wide carregado do YAML na primeira chamada"""
+    global _RERANKER
+    with _RERANKER_LOCK:
+        if _RERANKER is None:
+            _RERANKER = LocalReranker.from_yaml()
+    return _RERANKER
@@ -3,47 +3,114 @@ LLM Helper Functions for TCE-PA RAG Pipeline
 Core utility functions for simulating complex functionalities via LLM structured output
 """
 
-from typing import Optional, Any, Dict, List, Union, TypeVar, Type
-from langchain_openai import ChatOpenAI
-from langchain_core.output_parsers import PydanticOutputParser
-from langchain_core.prompts import PromptTemplate
+from typing import Optional, Any, AsyncIterator, Dict, Iterator, List, Union, TypeVar, Type, Tuple
+from langchain_core.runnables import Runnable
 from pydantic import BaseModel
 from langchain.chat_models import init_chat_model
 import json
 import logging
+import os
+import threading
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T", bound=BaseModel)
 
-def llm(instruction: str, output_model: Optional[Type[T]] = None, **kwargs) -> Optional[T]:
-    """
-    Função auxiliar para simular funcionalidades complexas via LLM structured output.
+# Configuração da LLM
+# DEFAULT_MODEL_NAME = "groq:llama-3.1-8b-instant"
+DEFAULT_MODEL_NAME = "openai:gpt-4o-mini"
 
-    Args:
-        instruction: Instrução detalhada para a LLM
-        output_model: Modelo Pydantic para structured output (opcional)
-        **kwargs: Parâmetros adicionais para contexto
+# Limites do pool HTTP compartilhado (keep-alive entre chamadas)
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 20
+HTTP_KEEPALIVE_EXPIRY = 30.0
 
-    Returns:
-        Resposta estruturada conforme output_model ou None
-    """
+# Timeout por requisição do cliente (segundos): limita quanto uma chamada que estourou
+# o orçamento do node continua ocupando uma thread em segundo plano
+LLM_REQUEST_TIMEOUT = float(os.environ.get("RAG_LLM_TIMEOUT", "60"))
 
-    # Configuração da LLM
-    # model_name = "groq:llama-3.1-8b-instant"
-    model_name = "openai:gpt-4o-mini"
-    model = init_chat_model(model_name, temperature=0)
+# Concorrência padrão de llm_batch() (requisições simultâneas por lote)
+LLM_BATCH_MAX_CONCURRENCY = int(os.environ.get("RAG_LLM_BATCH_CONCURRENCY", "8"))
+
+# Registro process-wide: (modelo, temperatura, schema) -> cliente pronto para uso
+_MODEL_REGISTRY: Dict[Tuple[str, float, Optional[Type[BaseModel]]], Runnable] = {}
+_REGISTRY_LOCK = threading.Lock()
+_HTTP_CLIENTS: Dict[str, Any] = {}
+
+
+def _shared_http_clients() -> Dict[str, Any]:
+    """Clientes httpx (sync/async) compartilhados por todos os modelos OpenAI"""
+    if not _HTTP_CLIENTS:
+        import openai
+        import httpx
+
+        limits = httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        )
+        _HTTP_CLIENTS["http_client"] = openai.DefaultHttpxClient(limits=limits)
+        _HTTP_CLIENTS["http_async_client"] = openai.DefaultAsyncHttpxClient(limits=limits)
+    return _HTTP_CLIENTS
+
+
+def _build_chat_model(
+    model_name: str, temperature: float, output_model: Optional[Type[BaseModel]]
+) -> Runnable:
+    """Instancia um cliente novo (sem pooling) - usado pelo registro e pelo benchmark"""
+    client_kwargs = _shared_http_clients() if model_name.startswith("openai:") else {}
+    model = init_chat_model(model_name, temperature=temperature, timeout=LLM_REQUEST_TIMEOUT, **client_kwargs)
     if output_model:
         model = model.with_structured_output(output_model)
+    return model
+
+
+def get_chat_model(
+    model_name: str = DEFAULT_MODEL_NAME,
+    temperature: float = 0,
+    output_model: Optional[Type[BaseModel]] = None,
+) -> Runnable:
+    """
+    Retorna o cliente de chat reutilizável para (modelo, temperatura, schema).
+
+    O cliente base e o schema de structured output são criados uma única vez por
+    processo; todas as instâncias compartilham o mesmo pool HTTP keep-alive.
+    """
+    key = (model_name, float(temperature), output_model)
+    model = _MODEL_REGISTRY.get(key)
+    if model is None:
+        with _REGISTRY_LOCK:
+            model = _MODEL_REGISTRY.get(key)
+            if model is None:
+                base_key = (model_name, float(temperature), None)
+                base = _MODEL_REGISTRY.get(base_key)
+                if base is None:
+                    base = _build_chat_model(model_name, temperature, None)
+                    _MODEL_REGISTRY[base_key] = base
+                model = base.with_structured_output(output_model) if output_model else base
+                _MODEL_REGISTRY[key] = model
+    return model
+
+
+def clear_model_registry() -> None:
+    """Descarta os clientes registrados (ex.: após troca de credenciais)"""
+    with _REGISTRY_LOCK:
+        _MODEL_REGISTRY.clear()
+
+
+def _build_prompt(
+    instruction: str, output_model: Optional[Type[BaseModel]], model_name: str, kwargs: Dict[str, Any]
+) -> str:
+    """Monta o prompt base com instrução e contexto adicional"""
     # Contexto adicional
     context_str = ""
     if kwargs:
         context_str = f"\n\nContexto Adicional:\n{json.dumps(kwargs, indent=2, ensure_ascii=False, default=str)}"
 
-    if "groq" in model_name:
+    if "groq" in model_name and output_model:
         context_str += f"\n\nDados do modelo: ```{output_model.model_json_schema()}```"
     # Prompt base
-    base_prompt = f"""
+    return f"""
 Sintetize dados estruturados conforme especificado.
 
 INSTRUÇÃO ESPECÍFICA:
@@ -59,40 +126,133 @@ DIRETRIZES:
 {context_str}
 """
 
-    # try:
-    #     if output_model:
-    #         # Structured output com Pydantic
-    #         parser = PydanticOutputParser(pydantic_object=output_model)
-    #         full_prompt = (
-    #             base_prompt
-    #             + f"\n\nFORMATO DE SAÍDA:\n{parser.get_format_instructions()}"
-    #         )
-
-    #         chain = model | parser
-    #         response = chain.invoke(full_prompt)
-
-    #         logger.info(f"LLM Mock Response: {type(response).__name__}")
-    #         return response
-    #     else:
-    #         # Resposta em texto simples
-    #         response = model.invoke(base_prompt)
-    #         logger.info(f"LLM Mock Response: {len(response.content)} chars")
-    #         return response.content
-
-    # except Exception as e:
-    #     logger.error(f"LLM Mock Error: {str(e)}")
-    #     # Fallback para dados default
-    #     if output_model:
-    #         return output_model()
-    #     else:
-    #         return f"Mock response for: {instruction[:50]}..."
 
+def llm(instruction: str, output_model: Optional[Type[T]] = None, **kwargs) -> Optional[T]:
+    """
+    Função auxiliar para simular funcionalidades complexas via LLM structured output.
+
+    Args:
+        instruction: Instrução detalhada para a LLM
+        output_model: Modelo Pydantic para structured output (opcional)
+        **kwargs: Parâmetros adicionais para contexto
+
+    Returns:
+        Resposta estruturada conforme output_model ou None
+    """
+
+    model_name = DEFAULT_MODEL_NAME
+    model = get_chat_model(model_name, temperature=0, output_model=output_model)
+    base_prompt = _build_prompt(instruction, output_model, model_name, kwargs)
+
+    response = model.invoke(base_prompt)
+    return _unwrap_response(response, output_model)
+
+
+async def allm(instruction: str, output_model: Optional[Type[T]] = None, **kwargs) -> Optional[T]:
+    """
+    Versão assíncrona de `llm()` - mesma assinatura e mesmo structured output.
+
+    Não bloqueia o event loop enquanto aguarda a rede, permitindo que o LangGraph
+    agende outros nodes em paralelo.
+    """
+
+    model_name = DEFAULT_MODEL_NAME
+    model = get_chat_model(model_name, temperature=0, output_model=output_model)
+    base_prompt = _build_prompt(instruction, output_model, model_name, kwargs)
+
+    response = await model.ainvoke(base_prompt)
+    return _unwrap_response(response, output_model)
+
+
+async def llm_batch(
+    instructions: List[str],
+    output_model: Optional[Type[T]] = None,
+    contexts: Optional[List[Dict[str, Any]]] = None,
+    max_concurrency: Optional[int] = None,
+) -> List[Optional[T]]:
+    """
+    Executa várias instruções independentes via `abatch` com concorrência limitada.
+
+    Args:
+        instructions: Lista de instruções (uma chamada por instrução)
+        output_model: Modelo Pydantic comum a todas as respostas (opcional)
+        contexts: Contexto adicional por instrução (mesma ordem de instructions)
+        max_concurrency: Máximo de requisições simultâneas (padrão LLM_BATCH_MAX_CONCURRENCY)
+
+    Returns:
+        Respostas na mesma ordem das instruções
+    """
+
+    if not instructions:
+        return []
+
+    contexts = contexts or [{} for _ in instructions]
+    if len(contexts) != len(instructions):
+        raise ValueError("contexts must have the same length as instructions")
+
+    model_name = DEFAULT_MODEL_NAME
+    model = get_chat_model(model_name, temperature=0, output_model=output_model)
+    prompts = [
+        _build_prompt(instruction, output_model, model_name, context)
+        for instruction, context in zip(instructions, contexts)
+    ]
+
+    responses = await model.abatch(
+        prompts, config={"max_concurrency": max_concurrency or LLM_BATCH_MAX_CONCURRENCY}
+    )
+    return [_unwrap_response(response, output_model) for response in responses]
+
+
+def _chunk_text(chunk: Any) -> str:
+    content = chunk.content if hasattr(chunk, "content") else chunk
+    if isinstance(content, list):
+        return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+    return content if isinstance(content, str) else str(content)
+
+
+def llm_stream(instruction: str, **kwargs) -> Iterator[str]:
+    """
+    Versão em streaming de `llm()` para texto livre: produz os trechos da
+    resposta à medida que chegam. Executada dentro de um node, os tokens também
+    aparecem no stream_mode="messages" do LangGraph.
+    """
+
+    model_name = DEFAULT_MODEL_NAME
+    model = get_chat_model(model_name, temperature=0)
+    base_prompt = _build_prompt(instruction, None, model_name, kwargs)
+
+    for chunk in model.stream(base_prompt):
+        text = _chunk_text(chunk)
+        if text:
+            yield text
+
+
+async def allm_stream(instruction: str, **kwargs) -> AsyncIterator[str]:
+    """Versão assíncrona de `llm_stream()`"""
+
+    model_name = DEFAULT_MODEL_NAME
+    model = get_chat_model(model_name, temperature=0)
+    base_prompt = _build_prompt(instruction, None, model_name, kwargs)
+
+    async for chunk in model.astream(base_prompt):
+        text = _chunk_text(chunk)
+        if text:
+            yield text
+
+
+def _unwrap_response(response: Any, output_model: Optional[Type[BaseModel]]) -> Any:
+    """Structured output é devolvido como está; texto livre vira string"""
     if output_model:
-        response: T = model.invoke(base_prompt)
         return response
-    else:
-        response = model.invoke(base_prompt)
-        return response.content if hasattr(response, 'content') else str(response)
+    return response.content if hasattr(response, 'content') else str(response)
+
+def chunk_lookup(items: List[Any], get_id=lambda item: item.chunk_id) -> Dict[str, Any]:
+    """
+    Tabela chunk_id -> objeto para reconstruir localmente os chunks completos
+    a partir das respostas compactas da LLM (que devolvem apenas IDs e scores)
+    """
+    return {get_id(item): item for item in items or []}
+
 
 # Função específica para simular processamento de documentos
 def mock_document_processing(file_path: str, doc_type: str) -> Dict[str, Any]:
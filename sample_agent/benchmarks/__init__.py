@@ -0,0 +1,7 @@
+"""
+Benchmarks for the TCE-PA agents
+Standalone scripts that measure latency and throughput of pipeline components
+
+Run any benchmark as a module, e.g.:
+    python -m sample_agent.benchmarks.bench_llm_clients
+"""
@@ -0,0 +1,101 @@
+"""
+Checkpointer Benchmark
+Memory and storage under sustained traffic: MemorySaver versus the pruned SQLite checkpointer
+
+A one-node chat graph (one user and one assistant message per turn, like the
+swarm) is driven through many threads. MemorySaver keeps every checkpoint of
+every thread in process memory; PrunedSqliteSaver keeps the last N checkpoints
+per thread on disk and expires idle threads.
+
+    python -m sample_agent.benchmarks.bench_checkpointer --threads 50 --turns 20
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Annotated, TypedDict
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+
+from sample_agent.benchmarks.corpus import generate_articles
+from sample_agent.checkpointer import PrunedSqliteSaver
+
+
+class ChatState(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def _graph(checkpointer, answers: list[str]):
+    def respond(state: ChatState) -> dict:
+        return {"messages": [AIMessage(content=answers[len(state["messages"]) % len(answers)])]}
+
+    builder = StateGraph(ChatState)
+    builder.add_node("respond", respond)
+    builder.add_edge(START, "respond")
+    builder.add_edge("respond", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def _drive(graph, threads: int, turns: int, thread_offset: int = 0) -> float:
+    start = time.perf_counter()
+    for turn in range(turns):
+        for thread in range(threads):
+            config = {"configurable": {"thread_id": f"thread-{thread_offset + thread}"}}
+            graph.invoke({"messages": [HumanMessage(content=f"Pergunta {turn} sobre prestação de contas")]}, config)
+    return (time.perf_counter() - start) * 1000 / (threads * turns)
+
+
+def main(threads: int = 50, turns: int = 20, keep_last: int = 10) -> None:
+    # Respostas com o tamanho típico de uma resposta do RAG (~1 KB)
+    answers = [text for _chunk_id, text in generate_articles(50)]
+
+    print(f"{threads} threads x {turns} turns per wave, 3 waves of new threads")
+    tracemalloc.start()
+    memory = MemorySaver()
+    graph = _graph(memory, answers)
+    for wave in range(3):
+        per_turn = _drive(graph, threads, turns, thread_offset=wave * threads)
+        checkpoints = sum(len(ns) for thread in memory.storage.values() for ns in thread.values())
+        print(
+            f"MemorySaver   wave {wave + 1}: checkpoints={checkpoints:6d} "
+            f"heap={tracemalloc.get_traced_memory()[0] / 2**20:7.1f}MB  {per_turn:.2f}ms/turn"
+        )
+    del graph, memory
+    tracemalloc.stop()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tracemalloc.start()
+        saver = PrunedSqliteSaver(
+            os.path.join(tmp, "checkpoints.db"), keep_last=keep_last, thread_ttl=None, maintenance_interval=None
+        )
+        graph = _graph(saver, answers)
+        for wave in range(3):
+            wave_start = time.time()
+            per_turn = _drive(graph, threads, turns, thread_offset=wave * threads)
+            # Threads das ondas anteriores estão ociosas: TTL igual à duração da onda as expira
+            saver.thread_ttl = time.time() - wave_start
+            asyncio.run(saver.aexpire_idle_threads())
+            asyncio.run(saver.avacuum())
+            stats = saver.stats()
+            print(
+                f"PrunedSqlite  wave {wave + 1}: checkpoints={stats['checkpoints']:6d} "
+                f"heap={tracemalloc.get_traced_memory()[0] / 2**20:7.1f}MB  "
+                f"disk={stats['bytes'] / 2**20:6.1f}MB  {per_turn:.2f}ms/turn"
+            )
+        saver.close()
+        tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--keep-last", type=int, default=10)
+    args = parser.parse_args()
+    main(args.threads, args.turns, args.keep_last)
@@ -0,0 +1,113 @@
+"""
+Chunk Arena Benchmark
+Checkpoint bytes and serialization time per pipeline step: nested chunk copies versus the chunk arena
+
+Each step of the RAG graph rewrites every populated state channel, and the
+checkpointer serializes each one. With nested models every stage list carries
+its own copy of the chunk text; with the arena the text is stored once in
+`chunk_store` and the lists hold IDs and scores.
+"""
+
+import statistics
+import time
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from sample_agent.agents.tce_swarm.rag.chunk_arena import store_chunks
+from sample_agent.agents.tce_swarm.rag.models.chunks import (
+    ChunkMetadata,
+    ChunkResult,
+    EnrichedChunk,
+    GradedChunk,
+    RankingFactors,
+    RerankedChunk,
+)
+from sample_agent.agents.tce_swarm.rag.models.state import RAGState
+from sample_agent.benchmarks.corpus import generate_articles
+
+_FACTORS = RankingFactors(
+    semantic_similarity=0.8, keyword_match=0.6, document_authority=0.9, recency=0.5, context_relevance=0.7
+)
+
+# Campos de chunks populados após cada etapa (na ordem do pipeline)
+STEPS = (
+    ("document_retrieval", ("retrieved",)),
+    ("relevance_grading", ("retrieved", "graded")),
+    ("context_enrichment", ("retrieved", "graded", "enriched")),
+    ("reranking", ("retrieved", "graded", "enriched", "reranked")),
+    ("response_generation", ("retrieved", "graded", "enriched", "reranked")),
+    ("quality_validation", ("retrieved", "graded", "enriched", "reranked")),
+)
+
+_NESTED_FIELDS = {
+    "retrieved": "retrieved_chunks",
+    "graded": "graded_chunks",
+    "enriched": "enriched_context",
+    "reranked": "reranked_chunks",
+}
+
+
+def _stages(retrieved: int, enriched: int, reranked: int) -> dict:
+    chunks = [
+        ChunkResult(
+            chunk_id=chunk_id,
+            content=text,
+            metadata=ChunkMetadata(
+                document_id=chunk_id.split("-")[0], page_number=None, section=None, chunk_index=i, timestamp=None
+            ),
+        )
+        for i, (chunk_id, text) in enumerate(generate_articles(retrieved))
+    ]
+    graded = [GradedChunk(chunk=chunk, relevance_score=0.7, confidence=0.8) for chunk in chunks]
+    enriched_chunks = [
+        EnrichedChunk(
+            chunk=grade.chunk,
+            relevance_score=grade.relevance_score,
+            enriched_context="Dispositivo vigente, aplicável a gestores municipais",
+            cross_references=["Lei Complementar 101/2000"],
+            ranking_factors=_FACTORS,
+        )
+        for grade in graded[:enriched]
+    ]
+    reranked_chunks = [
+        RerankedChunk(chunk=item, final_score=0.8, ranking_factors=_FACTORS) for item in enriched_chunks[:reranked]
+    ]
+    return {"retrieved": chunks, "graded": graded, "enriched": enriched_chunks, "reranked": reranked_chunks}
+
+
+def _serialize(serde: JsonPlusSerializer, channels: dict) -> tuple[int, float]:
+    start = time.perf_counter()
+    size = sum(len(serde.dumps_typed(value)[1]) for value in channels.values())
+    return size, (time.perf_counter() - start) * 1000
+
+
+def main(retrieved: int = 20, enriched: int = 10, reranked: int = 5, repeats: int = 50) -> None:
+    serde = JsonPlusSerializer()
+    stages = _stages(retrieved, enriched, reranked)
+    empty = RAGState()
+
+    print(f"{retrieved} retrieved, {enriched} enriched, {reranked} reranked chunks; {repeats} repeats per step")
+    totals = {"nested": 0, "arena": 0}
+    for step, populated in STEPS:
+        nested = {_NESTED_FIELDS[name]: stages[name] for name in populated}
+        arena = store_chunks(empty, **{name: stages[name] for name in populated})
+
+        row = {}
+        for label, channels in (("nested", nested), ("arena", arena)):
+            runs = [_serialize(serde, channels) for _ in range(repeats)]
+            size = runs[0][0]
+            row[label] = (size, statistics.median(ms for _, ms in runs))
+            totals[label] += size
+        print(
+            f"{step:<20} nested={row['nested'][0]:7d}B {row['nested'][1]:6.2f}ms   "
+            f"arena={row['arena'][0]:7d}B {row['arena'][1]:6.2f}ms   "
+            f"({1 - row['arena'][0] / row['nested'][0]:.0%} fewer bytes)"
+        )
+    print(
+        f"{'run total':<20} nested={totals['nested']:7d}B   arena={totals['arena']:7d}B   "
+        f"({1 - totals['arena'] / totals['nested']:.0%} fewer bytes)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Streaming Chunker Benchmark
+Throughput (MB/s) and peak memory of TCE_ChonkieProcessor strategies
+
+The synthetic consolidated law is written to a temporary markdown file and
+chunked straight from disk with `chunk_file`, so the peak traced memory reflects
+the chunker window rather than the document size.
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sample_agent.agents.tce_swarm.rag.processors import TCE_ChonkieProcessor
+from sample_agent.benchmarks.corpus import iter_document
+
+STRATEGIES = ("recursive", "semantic", "sdpm", "late")
+
+
+def _write_document(n_articles: int) -> str:
+    fd, path = tempfile.mkstemp(suffix=".md")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        for piece in iter_document(n_articles):
+            f.write(piece)
+    return path
+
+
+def run(n_articles: int, repeat: int = 3) -> None:
+    processor = TCE_ChonkieProcessor()
+    path = _write_document(n_articles)
+    try:
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"n={n_articles:>6}  size={size_mb:6.2f}MB")
+        for strategy in STRATEGIES:
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                n_chunks = sum(1 for _chunk in processor.chunk_file(path, strategy))
+                best = min(best, time.perf_counter() - start)
+
+            tracemalloc.start()
+            for _chunk in processor.chunk_file(path, strategy):
+                pass
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            print(
+                f"    {strategy:<10} chunks={n_chunks:>6}  {size_mb / best:7.1f} MB/s  "
+                f"peak={peak / 1e6:5.2f}MB"
+            )
+    finally:
+        os.remove(path)
+
+
+def main() -> None:
+    # ~500 páginas de lei consolidada ficam em torno de 2-3 MB de markdown
+    for n_articles in (1_000, 5_000, 20_000):
+        run(n_articles)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Context Packer Benchmark
+Prompt context tokens of the naive join versus the MMR/deduplicating packer
+
+Candidates mimic retrieval over consolidated legislation: each article appears in
+several versions (original text, consolidated text with a trailing amendment
+note), so near-duplicates compete for the generation context.
+"""
+
+import random
+import statistics
+import time
+
+from sample_agent.agents.tce_swarm.rag.context_packer import context_budget, count_tokens, pack_context
+from sample_agent.agents.tce_swarm.rag.models.chunks import (
+    ChunkMetadata,
+    ChunkResult,
+    EnrichedChunk,
+    RankingFactors,
+    RerankedChunk,
+)
+from sample_agent.agents.tce_swarm.rag.utils import DEFAULT_MODEL_NAME
+from sample_agent.benchmarks.corpus import generate_articles
+
+_FACTORS = RankingFactors(
+    semantic_similarity=None, keyword_match=None, document_authority=None, recency=None, context_relevance=None
+)
+
+
+def _candidates(rng: random.Random, articles, n_articles: int, versions: int) -> list[RerankedChunk]:
+    picked = rng.sample(articles, n_articles)
+    candidates = []
+    for chunk_id, text in picked:
+        for version in range(versions):
+            content = text if version == 0 else f"{text}\n(Redação dada pela Resolução nº {19000 + version})"
+            chunk = ChunkResult(
+                chunk_id=f"{chunk_id}-v{version}",
+                content=content,
+                metadata=ChunkMetadata(
+                    document_id=chunk_id, page_number=None, section=None, chunk_index=version, timestamp=None
+                ),
+            )
+            enriched = EnrichedChunk(
+                chunk=chunk, relevance_score=0.5, enriched_context="", cross_references=[], ranking_factors=_FACTORS
+            )
+            score = round(rng.uniform(0.5, 1.0), 3)
+            candidates.append(RerankedChunk(chunk=enriched, final_score=score, ranking_factors=_FACTORS))
+    candidates.sort(key=lambda chunk: chunk.final_score, reverse=True)
+    return candidates
+
+
+def main(queries: int = 200, n_articles: int = 8, versions: int = 3) -> None:
+    rng = random.Random(42)
+    articles = generate_articles(500)
+    budget = context_budget(DEFAULT_MODEL_NAME)
+
+    naive_tokens, packed_tokens, collapsed, timings = [], [], [], []
+    for _ in range(queries):
+        candidates = _candidates(rng, articles, n_articles, versions)
+        naive = "\n\n".join(f"[{i + 1}] {c.chunk.chunk.content}" for i, c in enumerate(candidates))
+        naive_tokens.append(count_tokens(naive, DEFAULT_MODEL_NAME))
+
+        start = time.perf_counter()
+        packed = pack_context(candidates, DEFAULT_MODEL_NAME, vector_db_type="azure_ai_search")
+        timings.append((time.perf_counter() - start) * 1000)
+        packed_tokens.append(packed.tokens)
+        collapsed.append(packed.collapsed)
+
+    print(
+        f"{queries} queries, {n_articles * versions} candidates each "
+        f"({n_articles} articles x {versions} versions), budget {budget} tokens"
+    )
+    print(f"naive   context tokens mean={statistics.mean(naive_tokens):8.1f}")
+    print(
+        f"packed  context tokens mean={statistics.mean(packed_tokens):8.1f} "
+        f"({1 - statistics.mean(packed_tokens) / statistics.mean(naive_tokens):.0%} fewer), "
+        f"collapsed={statistics.mean(collapsed):.1f}/query, pack p50={statistics.median(timings):.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
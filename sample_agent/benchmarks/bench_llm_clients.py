@@ -0,0 +1,64 @@
+"""
+LLM Client Setup Benchmark
+Measures per-call client setup overhead with and without the model registry
+
+No network traffic is generated: only client construction and structured output
+schema compilation are timed, which is the overhead paid on every `llm()` call.
+"""
+
+import os
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from sample_agent.agents.tce_swarm.rag.utils import (
+    DEFAULT_MODEL_NAME,
+    _build_chat_model,
+    clear_model_registry,
+    get_chat_model,
+)
+from sample_agent.agents.tce_swarm.rag.models.chunks import ChunkingResult
+from sample_agent.agents.tce_swarm.rag.models.responses import (
+    QueryAnalysisResult,
+    ResponseGenerationResult,
+    ValidationResult,
+)
+
+# Schemas usados ao longo de uma requisição RAG típica
+SCHEMAS = [QueryAnalysisResult, ChunkingResult, ResponseGenerationResult, ValidationResult, None]
+
+
+def _time_calls(factory, iterations: int) -> list[float]:
+    timings = []
+    for i in range(iterations):
+        schema = SCHEMAS[i % len(SCHEMAS)]
+        start = time.perf_counter()
+        factory(DEFAULT_MODEL_NAME, 0, schema)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _report(label: str, timings: list[float]) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{label:<10} mean={statistics.mean(timings):8.3f}ms "
+        f"p50={statistics.median(timings):8.3f}ms p95={p95:8.3f}ms"
+    )
+
+
+def main(iterations: int = 200) -> None:
+    print(f"Per-call setup overhead over {iterations} calls ({DEFAULT_MODEL_NAME})")
+
+    _report("unpooled", _time_calls(_build_chat_model, iterations))
+
+    clear_model_registry()
+    _report(
+        "pooled",
+        _time_calls(lambda m, t, s: get_chat_model(m, temperature=t, output_model=s), iterations),
+    )
+
+
+if __name__ == "__main__":
+    main()
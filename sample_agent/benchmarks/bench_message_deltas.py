@@ -0,0 +1,90 @@
+"""
+Message Delta Benchmark
+Checkpoint bytes written per turn over a long conversation: full message lists versus deltas
+
+Each turn appends a user and an assistant message (~1 KB, like a RAG answer).
+Stored whole, the checkpoint of turn N carries all 2N messages, so the bytes
+written grow linearly and the conversation total quadratically; stored as
+deltas, each checkpoint carries only the new messages plus a periodic keyframe.
+
+    python -m sample_agent.benchmarks.bench_message_deltas --turns 100
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from langchain_core.messages import HumanMessage
+
+from sample_agent.benchmarks.bench_checkpointer import _graph
+from sample_agent.benchmarks.corpus import generate_articles
+from sample_agent.checkpointer import PrunedSqliteSaver
+
+REPORT_TURNS = (1, 10, 25, 50, 100)
+
+
+def _written_since(db: sqlite3.Connection, last_id: str) -> tuple[int, str]:
+    size, newest = db.execute(
+        "SELECT COALESCE(SUM(LENGTH(checkpoint) + LENGTH(metadata)), 0), MAX(checkpoint_id) "
+        "FROM checkpoints WHERE checkpoint_id > ?",
+        (last_id,),
+    ).fetchone()
+    return size, newest or last_id
+
+
+def _conversation(saver: PrunedSqliteSaver, path: str, answers: list[str], turns: int) -> tuple[list[int], float]:
+    graph = _graph(saver, answers)
+    config = {"configurable": {"thread_id": "conversation"}}
+    db = sqlite3.connect(path)
+    per_turn, last_id = [], ""
+    for turn in range(turns):
+        graph.invoke({"messages": [HumanMessage(content=f"Pergunta {turn} sobre prestação de contas")]}, config)
+        size, last_id = _written_since(db, last_id)
+        per_turn.append(size)
+
+    reads = []
+    for _ in range(20):
+        start = time.perf_counter()
+        graph.get_state(config)
+        reads.append((time.perf_counter() - start) * 1000)
+    db.close()
+    return per_turn, statistics.median(reads)
+
+
+def main(turns: int = 100, keep_last: int = 20, keyframe_interval: int = 10) -> None:
+    answers = [text for _chunk_id, text in generate_articles(50)]
+    report = [turn for turn in REPORT_TURNS if turn <= turns]
+
+    print(f"{turns}-turn conversation, keep_last={keep_last}, keyframe every {keyframe_interval} deltas")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, channels in (("full", ()), ("delta", ("messages",))):
+            path = os.path.join(tmp, f"{label}.db")
+            saver = PrunedSqliteSaver(
+                path,
+                keep_last=keep_last,
+                thread_ttl=None,
+                maintenance_interval=None,
+                delta_channels=channels,
+                keyframe_interval=keyframe_interval,
+            )
+            results[label] = _conversation(saver, path, answers, turns)
+            saver.close()
+
+    for label, (per_turn, read_ms) in results.items():
+        columns = "  ".join(f"t{turn}={per_turn[turn - 1] / 1024:7.1f}KB" for turn in report)
+        print(f"{label:<6} {columns}  total={sum(per_turn) / 2**20:6.2f}MB  read p50={read_ms:.2f}ms")
+    full, delta = sum(results["full"][0]), sum(results["delta"][0])
+    print(f"delta writes {1 - delta / full:.0%} fewer checkpoint bytes over the conversation")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--keep-last", type=int, default=20)
+    parser.add_argument("--keyframe-interval", type=int, default=10)
+    args = parser.parse_args()
+    main(args.turns, args.keep_last, args.keyframe_interval)
@@ -0,0 +1,196 @@
+"""
+Execution Profile Benchmark
+End-to-end p50/p95 latency of the RAG graph per execution profile and query complexity
+
+By default the chat model is replaced by a simulated one that sleeps a per-schema
+latency (scaled by --scale) and returns schema-valid outputs, so the numbers show
+how many LLM round-trips each route costs. With --live the configured model is
+called for real (requires credentials; every query is unique to avoid cache hits).
+
+    python -m sample_agent.benchmarks.bench_profiles --iterations 20 --scale 0.05
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import re
+import statistics
+import tempfile
+import time
+import typing
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("RAG_INDEX_DIR", tempfile.mkdtemp(prefix="bench-profiles-"))
+# Sem rede: o cache semântico usa o embedder local (é invalidado a cada consulta)
+os.environ.setdefault("RAG_SEMANTIC_CACHE_EMBEDDINGS", "hashing")
+os.environ.setdefault("RAG_LLM_CACHE_PATH", os.path.join(os.environ["RAG_INDEX_DIR"], "llm_cache.db"))
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+from pydantic import BaseModel
+
+import sample_agent.agents.tce_swarm.rag.utils as rag_utils
+from sample_agent.agents.tce_swarm.rag.cache import get_semantic_cache
+from sample_agent.agents.tce_swarm.rag.graph import build_rag_agent
+from sample_agent.agents.tce_swarm.rag.index.hybrid import index_chunks
+from sample_agent.agents.tce_swarm.rag.models.chunks import ChunkMetadata, ChunkResult
+from sample_agent.agents.tce_swarm.rag.profiles import PROFILES
+from sample_agent.benchmarks.corpus import generate_articles, make_query
+
+COMPLEXITIES = ("simple", "medium", "complex")
+
+# Latência típica (segundos) de cada chamada estruturada com gpt-4o-mini
+SIMULATED_LATENCY = {
+    "QueryAnalysisResult": 1.2,
+    "GradedChunksResponse": 2.0,
+    "EnrichedChunksResponse": 3.0,
+    "RerankedChunksResponse": 2.0,
+    "ResponseGenerationResult": 6.0,
+    "ValidationResult": 1.5,
+}
+
+_CHUNK_ID_RE = re.compile(r"[\w.]+-art\d+")
+
+
+class SimulatedChatModel:
+    """Substitui get_chat_model: dorme a latência do schema e devolve saídas válidas"""
+
+    def __init__(self, scale: float, seed: int = 7):
+        self.scale = scale
+        self.complexity = "medium"
+        self.rng = random.Random(seed)
+
+    def _delay(self, output_model) -> float:
+        base = SIMULATED_LATENCY.get(output_model.__name__ if output_model else "", 2.0)
+        return base * self.scale * self.rng.lognormvariate(0, 0.25)
+
+    def _sample(self, annotation, name: str, prompt: str):
+        origin, args = typing.get_origin(annotation), typing.get_args(annotation)
+        if origin is typing.Union:
+            return self._sample(next(a for a in args if a is not type(None)), name, prompt)
+        if name == "query_complexity":
+            return self.complexity
+        if origin is typing.Literal:
+            return args[0]
+        if name == "collection_names":
+            return ["global"]
+        if origin is list:
+            if isinstance(args[0], type) and issubclass(args[0], BaseModel) and "chunk_id" in args[0].model_fields:
+                ids = list(dict.fromkeys(_CHUNK_ID_RE.findall(prompt)))
+                return [self._sample(args[0], name, chunk_id) for chunk_id in ids]
+            return []
+        if origin is dict:
+            return {}
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            return annotation(**{
+                field: self._sample(info.annotation, field, prompt)
+                for field, info in annotation.model_fields.items()
+            })
+        if name == "chunk_id":
+            return prompt
+        if annotation is float:
+            return round(self.rng.uniform(0.6, 1.0), 3)
+        if annotation is int:
+            return 1
+        if annotation is bool:
+            return False
+        if annotation is str:
+            return f"{name} simulado"
+        return None
+
+    def _respond(self, output_model, prompt: str):
+        if output_model is None:
+            return AIMessage(content="Resposta simulada [1]")
+        return self._sample(output_model, output_model.__name__, prompt)
+
+    def __call__(self, model_name: str = "", temperature: float = 0, output_model=None):
+        def invoke(prompt):
+            time.sleep(self._delay(output_model))
+            return self._respond(output_model, str(prompt))
+
+        async def ainvoke(prompt):
+            await asyncio.sleep(self._delay(output_model))
+            return self._respond(output_model, str(prompt))
+
+        return RunnableLambda(invoke, afunc=ainvoke)
+
+
+def _index_corpus(n_articles: int) -> list[str]:
+    articles = generate_articles(n_articles)
+    chunks = [
+        ChunkResult(
+            chunk_id=chunk_id,
+            content=text,
+            metadata=ChunkMetadata(
+                document_id=chunk_id.split("-")[0], page_number=None, section=None,
+                chunk_index=i, timestamp=None,
+            ),
+        )
+        for i, (chunk_id, text) in enumerate(articles)
+    ]
+    index_chunks("lancedb", "global", chunks)
+    # Consultas a partir dos parágrafos (sem "Art. N da ..." para não cair no fast path de citações)
+    return [text.split("\n", 1)[-1] for _chunk_id, text in articles]
+
+
+def _report(label: str, timings: list[float]) -> None:
+    timings = sorted(timings)
+    p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+    print(f"{label:<20} p50={statistics.median(timings):8.3f}s p95={p95:8.3f}s n={len(timings)}")
+
+
+async def _run(graph, query: str, profile: str) -> tuple[float, str]:
+    state = {
+        "messages": [HumanMessage(content=query)],
+        "original_query": query,
+        "user_documents": [],
+        "ingestion_status": {},
+        "retry_count": 0,
+        "max_retries": 2,
+        "processing_time": 0.0,
+        "document_scope": "global",
+        "vector_db_type": "lancedb",
+        "execution_profile": profile,
+    }
+    start = time.perf_counter()
+    # Rota completa + 2 retries de validação passa do limite padrão de 25 passos
+    result = await graph.ainvoke(state, {"recursion_limit": 50})
+    return time.perf_counter() - start, result.get("query_complexity") or "medium"
+
+
+def main(iterations: int = 20, scale: float = 0.05, live: bool = False) -> None:
+    simulated = None
+    if not live:
+        simulated = SimulatedChatModel(scale)
+        rag_utils.get_chat_model = simulated
+
+    texts = _index_corpus(200)
+    graph = build_rag_agent()
+    rng = random.Random(42)
+
+    mode = "live model" if live else f"simulated model (scale={scale})"
+    print(f"End-to-end latency over {iterations} queries per cell, {mode}")
+    for profile in PROFILES:
+        # Agrupado pela complexidade atribuída pela análise (no modo live, decidida pelo modelo)
+        timings: dict[str, list[float]] = {complexity: [] for complexity in COMPLEXITIES}
+        for complexity in COMPLEXITIES:
+            if simulated:
+                simulated.complexity = complexity
+            for i in range(iterations):
+                get_semantic_cache().invalidate()
+                query = f"{make_query(rng.choice(texts), rng)} ({profile} {complexity} {i})"
+                elapsed, assigned = asyncio.run(_run(graph, query, profile))
+                timings[assigned].append(elapsed)
+        for complexity, cell in timings.items():
+            if cell:
+                _report(f"{profile}/{complexity}", cell)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--scale", type=float, default=0.05, help="fator sobre SIMULATED_LATENCY")
+    parser.add_argument("--live", action="store_true", help="usa o modelo configurado em vez do simulado")
+    args = parser.parse_args()
+    main(args.iterations, args.scale, args.live)
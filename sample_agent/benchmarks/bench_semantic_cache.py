@@ -0,0 +1,73 @@
+"""
+Semantic Cache Threshold Benchmark
+Query-embedding cosine of paraphrase pairs versus distinct same-domain questions
+
+A semantic answer cache is only useful if paraphrases of a question score above
+the threshold and different questions about the same subject score below it.
+The pairs below are written as users write them (colloquial versus formal,
+reordered, abbreviated); the distinct pairs change one detail that changes the
+answer (municipal versus state, deadline versus penalty). Run it against the
+configured embedding model to pick RAG_SEMANTIC_CACHE_THRESHOLD.
+
+    python -m sample_agent.benchmarks.bench_semantic_cache --embeddings openai:text-embedding-3-small
+"""
+
+import argparse
+import statistics
+
+import numpy as np
+
+from sample_agent.agents.tce_swarm.rag.cache import SEMANTIC_CACHE_EMBEDDINGS, semantic_cache_embedder
+
+PARAPHRASES = (
+    ("prazo para prestação de contas municipal", "qual o prazo que o município tem para prestar contas"),
+    ("quem deve prestar contas ao TCE-PA", "quais gestores são obrigados a prestar contas ao tribunal de contas do Pará"),
+    ("multa por atraso na prestação de contas", "qual a penalidade se o gestor entregar as contas atrasadas"),
+    ("o que diz o art. 7 do regimento interno", "qual o conteúdo do artigo 7º do Regimento Interno"),
+    ("como consultar um processo no TCE-PA", "de que forma posso acompanhar o andamento de um processo no tribunal"),
+    ("documentos exigidos na prestação de contas anual", "quais documentos preciso enviar na prestação de contas do exercício"),
+    ("prazo para recurso de decisão do tribunal", "em quantos dias posso recorrer de um acórdão do TCE"),
+    ("o que é tomada de contas especial", "explique o que significa tomada de contas especial"),
+    ("limite de gastos com pessoal do município", "qual o teto de despesa com pessoal para prefeituras pela LRF"),
+    ("quem é o ordenador de despesa", "o que define um ordenador de despesas"),
+)
+
+DISTINCT = (
+    ("prazo para prestação de contas municipal", "prazo para prestação de contas estadual"),
+    ("prazo para prestação de contas municipal", "multa por atraso na prestação de contas municipal"),
+    ("o que diz o art. 7 do regimento interno", "o que diz o art. 8 do regimento interno"),
+    ("limite de gastos com pessoal do município", "limite de gastos com pessoal do estado"),
+    ("como consultar um processo no TCE-PA", "como consultar um expediente no TCE-PA"),
+    ("prazo para recurso de decisão do tribunal", "efeitos do recurso contra decisão do tribunal"),
+    ("documentos exigidos na prestação de contas anual", "documentos exigidos na tomada de contas especial"),
+    ("quem deve prestar contas ao TCE-PA", "quem julga as contas prestadas ao TCE-PA"),
+)
+
+
+def _similarities(embedder, pairs) -> list[float]:
+    left = embedder.embed_documents([a for a, _ in pairs])
+    right = embedder.embed_documents([b for _, b in pairs])
+    return [float(score) for score in np.sum(left * right, axis=1)]
+
+
+def main(embeddings: str = SEMANTIC_CACHE_EMBEDDINGS) -> None:
+    embedder = semantic_cache_embedder(embeddings)
+    if embedder is None:
+        raise SystemExit(f"embeddings '{embeddings}' unavailable")
+
+    paraphrases = _similarities(embedder, PARAPHRASES)
+    distinct = _similarities(embedder, DISTINCT)
+    print(f"{embeddings}: {len(PARAPHRASES)} paraphrase pairs, {len(DISTINCT)} distinct pairs")
+    print(f"paraphrase cosine min={min(paraphrases):.3f} median={statistics.median(paraphrases):.3f}")
+    print(f"distinct   cosine max={max(distinct):.3f} median={statistics.median(distinct):.3f}")
+    # Um falso hit devolve a resposta de outra pergunta: o threshold fica acima de todo par distinto
+    threshold = max(distinct) + 0.01
+    recall = sum(score >= threshold for score in paraphrases) / len(paraphrases)
+    print(f"suggested threshold={threshold:.2f} (paraphrase hit rate {recall:.0%}, no distinct pair hits)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--embeddings", default=SEMANTIC_CACHE_EMBEDDINGS)
+    args = parser.parse_args()
+    main(args.embeddings)
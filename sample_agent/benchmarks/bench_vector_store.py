@@ -0,0 +1,96 @@
+"""
+Local Vector Index Benchmark
+Top-k latency and recall of LocalVectorStore over a synthetic legislation corpus
+
+Each query is a noisy excerpt of one article; recall@k is the fraction of queries
+whose source article is returned in the top-k results. The hybrid column fuses
+dense and BM25 rankings with reciprocal-rank fusion, and the citation rows use
+exact references such as "Art. 12 da Resolução 18.832".
+"""
+
+import random
+import statistics
+import time
+
+from sample_agent.agents.tce_swarm.rag.index.bm25 import BM25Index
+from sample_agent.agents.tce_swarm.rag.index.hybrid import reciprocal_rank_fusion
+from sample_agent.agents.tce_swarm.rag.index.vector_store import LocalVectorStore
+from sample_agent.agents.tce_swarm.rag.models.chunks import ChunkMetadata, ChunkResult
+from sample_agent.benchmarks.corpus import DOCUMENTS, generate_articles, make_query
+
+
+def _build_store(n_articles: int) -> tuple[LocalVectorStore, BM25Index, list[tuple[str, str]], float]:
+    articles = generate_articles(n_articles)
+    chunks = [
+        ChunkResult(
+            chunk_id=chunk_id,
+            content=text,
+            metadata=ChunkMetadata(
+                document_id=chunk_id.split("-")[0], page_number=None, section=None,
+                chunk_index=i, timestamp=None,
+            ),
+        )
+        for i, (chunk_id, text) in enumerate(articles)
+    ]
+    store = LocalVectorStore()
+    sparse = BM25Index()
+    start = time.perf_counter()
+    # Duas coleções para exercitar o filtro por collection_names
+    half = len(chunks) // 2
+    for collection, part in (("global", chunks[:half]), ("user_specific", chunks[half:])):
+        store.upsert(collection, part)
+        sparse.add(collection, part)
+    return store, sparse, articles, time.perf_counter() - start
+
+
+def _citation_query(chunk_id: str) -> str:
+    doc_number, article = chunk_id.split("-art")
+    doc_type = next(doc_type for doc_type, number in DOCUMENTS if number == doc_number)
+    return f"O que diz o Art. {article} da {doc_type} {doc_number}?"
+
+
+def _measure(search, queries: list[tuple[str, str]], k: int) -> tuple[list[float], float]:
+    latencies, hits = [], 0
+    for chunk_id, query in queries:
+        start = time.perf_counter()
+        results = search(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += chunk_id in results[:k]
+    latencies.sort()
+    return latencies, hits / len(queries)
+
+
+def run(n_articles: int, n_queries: int = 200, k: int = 5) -> None:
+    store, sparse, articles, build_time = _build_store(n_articles)
+    collections = ["global", "user_specific"]
+    rng = random.Random(7)
+    sampled = [rng.choice(articles) for _ in range(n_queries)]
+    query_sets = {
+        "excerpt": [(chunk_id, make_query(text, rng)) for chunk_id, text in sampled],
+        "citation": [(chunk_id, _citation_query(chunk_id)) for chunk_id, _ in sampled],
+    }
+
+    def dense(query: str) -> list[str]:
+        return [chunk.chunk_id for chunk, _ in store.search(query, collections, k=20)]
+
+    def hybrid(query: str) -> list[str]:
+        sparse_ids = [chunk_id for chunk_id, _ in sparse.search(query, collections, k=20)]
+        return [chunk_id for chunk_id, _ in reciprocal_rank_fusion([dense(query), sparse_ids])]
+
+    print(f"n={n_articles:>6}  build={build_time:6.2f}s")
+    for name, queries in query_sets.items():
+        for label, search in (("dense", dense), ("hybrid", hybrid)):
+            latencies, recall = _measure(search, queries, k)
+            print(
+                f"    {name:<9}{label:<7} p50={statistics.median(latencies):6.2f}ms  "
+                f"p95={latencies[int(0.95 * n_queries) - 1]:6.2f}ms  recall@{k}={recall:.2%}"
+            )
+
+
+def main() -> None:
+    for n_articles in (1_000, 10_000, 50_000):
+        run(n_articles)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Synthetic Legislation Corpus
+Deterministic generator of TCE-PA-like legal text for benchmarks
+"""
+
+from typing import Iterator, List, Tuple
+import random
+
+SUBJECTS = [
+    "prestação de contas", "licitação", "contrato administrativo", "convênio",
+    "tomada de contas especial", "fiscalização", "auditoria", "empenho",
+    "ordenador de despesa", "gestor municipal", "câmara municipal", "fundo municipal",
+    "regime de adiantamento", "diárias", "obras públicas", "pessoal e encargos",
+    "transparência", "controle interno", "multa", "recurso de reconsideração",
+]
+ACTIONS = [
+    "deverá encaminhar", "fica obrigado a apresentar", "poderá requerer",
+    "será responsabilizado por", "deverá manter arquivados", "submeterá ao Tribunal",
+    "publicará no portal da transparência", "observará os limites de",
+]
+OBJECTS = [
+    "os balancetes mensais", "o relatório de gestão fiscal", "os documentos comprobatórios",
+    "o parecer do controle interno", "as notas de empenho", "os extratos bancários",
+    "o inventário patrimonial", "a declaração de bens", "o plano de aplicação",
+]
+DEADLINES = [
+    "no prazo de 30 (trinta) dias", "até o último dia útil do mês subsequente",
+    "no prazo de 60 (sessenta) dias", "até 31 de março do exercício seguinte",
+    "no prazo de 15 (quinze) dias da notificação", "anualmente",
+]
+MUNICIPALITIES = [
+    "Belém", "Ananindeua", "Santarém", "Marabá", "Parauapebas", "Castanhal", "Abaetetuba",
+    "Cametá", "Bragança", "Altamira", "Tucuruí", "Barcarena", "Itaituba", "Paragominas",
+    "Redenção", "Tailândia", "Breves", "Capanema", "Moju", "Oriximiná", "Óbidos", "Soure",
+    "Vigia", "Salinópolis", "Tomé-Açu", "Xinguara", "Conceição do Araguaia", "Monte Alegre",
+]
+DOCUMENTS = [
+    ("Resolução", "18.832"), ("Resolução", "19.001"), ("Instrução Normativa", "22"),
+    ("Lei Complementar", "81"), ("Ato", "63"), ("Regimento Interno", "2010"),
+]
+
+
+def _sentence(rng: random.Random) -> str:
+    return (
+        f"O responsável pela {rng.choice(SUBJECTS)} no município de {rng.choice(MUNICIPALITIES)} "
+        f"{rng.choice(ACTIONS)} {rng.choice(OBJECTS)} {rng.choice(DEADLINES)}, "
+        f"exercício {rng.randint(2010, 2025)}, valor de R$ {rng.randint(1000, 999999):,}".replace(",", ".")
+    )
+
+
+def generate_articles(n_articles: int, seed: int = 42) -> List[Tuple[str, str]]:
+    """Lista de (chunk_id, texto) - um artigo com parágrafos por entrada"""
+    rng = random.Random(seed)
+    articles = []
+    for i in range(n_articles):
+        doc_type, doc_number = DOCUMENTS[i % len(DOCUMENTS)]
+        article = i // len(DOCUMENTS) + 1
+        paragraphs = [f"§ {p}º {_sentence(rng)}." for p in range(1, rng.randint(2, 4))]
+        text = (
+            f"{doc_type} nº {doc_number} - Art. {article}. {_sentence(rng)}, "
+            f"sob pena de {rng.choice(['multa', 'glosa', 'rejeição das contas'])}.\n"
+            + "\n".join(paragraphs)
+        )
+        articles.append((f"{doc_number}-art{article}", text))
+    return articles
+
+
+def generate_document(n_articles: int, seed: int = 42) -> str:
+    """Documento consolidado em markdown (seções, artigos e parágrafos)"""
+    parts = []
+    for i, (_chunk_id, text) in enumerate(generate_articles(n_articles, seed)):
+        if i % 25 == 0:
+            parts.append(f"\n## CAPÍTULO {i // 25 + 1}\n")
+        parts.append(text + "\n")
+    return "\n".join(parts)
+
+
+def iter_document(n_articles: int, piece_size: int = 64 * 1024, seed: int = 42) -> Iterator[str]:
+    """Documento consolidado entregue em pedaços, como um stream de arquivo"""
+    document = generate_document(n_articles, seed)
+    for start in range(0, len(document), piece_size):
+        yield document[start : start + piece_size]
+
+
+def make_query(text: str, rng: random.Random, n_words: int = 20) -> str:
+    """Consulta ruidosa derivada de um trecho: subconjunto de palavras + ruído"""
+    words = text.split()
+    start = rng.randint(0, max(0, len(words) - n_words))
+    picked = words[start : start + n_words]
+    noise = rng.sample(["qual", "prazo", "como", "quando", "regra", "norma"], 2)
+    return " ".join(noise + picked)
@@ -0,0 +1,438 @@
+"""
+Pruned SQLite Checkpointer
+Durable async checkpointer (WAL) with per-thread retention, idle-thread TTL and background vacuum
+
+The saver owns a background event loop: every database call runs there, so the
+same instance serves `graph.invoke` and `graph.ainvoke` and can be created at
+import time (no running loop needed). Each checkpoint write prunes the thread
+down to its last CHECKPOINT_KEEP_LAST checkpoints; a periodic maintenance task
+deletes threads idle for longer than CHECKPOINT_THREAD_TTL_HOURS, truncates the
+WAL and returns free pages to the filesystem.
+
+Message lists (CHECKPOINT_DELTA_CHANNELS, "messages" by default) are stored as
+append-only deltas against the parent checkpoint: the kept prefix length plus
+the new messages. A full copy (keyframe) is written every
+CHECKPOINT_KEYFRAME_INTERVAL deltas and whenever the parent is not the last
+checkpoint written (forks, restarts), so reads rebuild a list from at most that
+many deltas, lazily, only when the checkpoint is loaded.
+"""
+
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Sequence
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+
+import aiosqlite
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+)
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_PATH = os.environ.get("CHECKPOINT_DB_PATH", "checkpoints.db")
+# Checkpoints mantidos por thread/namespace (mínimo 2: o último e seu pai)
+DEFAULT_KEEP_LAST = int(os.environ.get("CHECKPOINT_KEEP_LAST", "20"))
+# Threads sem checkpoint novo há mais que isso são removidas
+DEFAULT_THREAD_TTL = float(os.environ.get("CHECKPOINT_THREAD_TTL_HOURS", "72")) * 3600
+# Intervalo da manutenção em segundo plano (TTL, WAL e vacuum)
+DEFAULT_MAINTENANCE_INTERVAL = float(os.environ.get("CHECKPOINT_MAINTENANCE_SECONDS", "300"))
+# Canais de lista gravados como delta do checkpoint pai (vazio desliga)
+DEFAULT_DELTA_CHANNELS = tuple(
+    channel for channel in os.environ.get("CHECKPOINT_DELTA_CHANNELS", "messages").split(",") if channel
+)
+# Deltas encadeados até a próxima cópia completa (limitado a keep_last - 1)
+DEFAULT_KEYFRAME_INTERVAL = int(os.environ.get("CHECKPOINT_KEYFRAME_INTERVAL", "10"))
+
+# Marcador do valor de canal gravado como delta
+_DELTA_KEY = "__message_delta__"
+# Última lista gravada por (thread, namespace, canal), base dos próximos deltas
+_MAX_CACHED_THREADS = 1024
+
+
+def _is_delta(value: Any) -> bool:
+    return isinstance(value, dict) and _DELTA_KEY in value
+
+
+def _common_prefix(previous: List[Any], current: List[Any]) -> int:
+    size = 0
+    for old, new in zip(previous, current):
+        if old is not new and old != new:
+            break
+        size += 1
+    return size
+
+
+class PrunedSqliteSaver(AsyncSqliteSaver):
+    """
+    AsyncSqliteSaver com retenção: últimos `keep_last` checkpoints por thread,
+    TTL para threads ociosas e vacuum incremental em segundo plano.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CHECKPOINT_PATH,
+        *,
+        keep_last: int = DEFAULT_KEEP_LAST,
+        thread_ttl: Optional[float] = DEFAULT_THREAD_TTL,
+        maintenance_interval: Optional[float] = DEFAULT_MAINTENANCE_INTERVAL,
+        delta_channels: Sequence[str] = DEFAULT_DELTA_CHANNELS,
+        keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+        serde=None,
+    ):
+        self.path = path
+        self.keep_last = max(2, keep_last)
+        self.thread_ttl = thread_ttl
+        self.maintenance_interval = maintenance_interval
+        self.delta_channels = tuple(delta_channels)
+        self.keyframe_interval = max(1, min(keyframe_interval, self.keep_last - 1))
+        self._maintenance: Optional[asyncio.Task] = None
+        # (thread, ns, canal) -> (checkpoint_id, lista completa, profundidade do delta)
+        self._last_lists: "OrderedDict[Tuple[str, str, str], Tuple[str, List[Any], int]]" = OrderedDict()
+
+        loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=loop.run_forever, name="checkpointer", daemon=True)
+        self._loop_thread.start()
+        # AsyncSqliteSaver prende conexão, lock e loop ao loop em que é criado
+        asyncio.run_coroutine_threadsafe(self._init_on_loop(serde), loop).result()
+
+    async def _init_on_loop(self, serde) -> None:
+        super().__init__(await aiosqlite.connect(self.path), serde=serde)
+
+    # ===== DESPACHO PARA O LOOP PRÓPRIO =====
+
+    async def _on_loop(self, coro):
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await self._on_loop(self._get_tuple(config))
+
+    async def alist(self, config: Optional[RunnableConfig], **kwargs) -> AsyncIterator[CheckpointTuple]:
+        items = super().alist(config, **kwargs)
+        while True:
+            try:
+                yield await self._on_loop(self._next_rebuilt(items))
+            except StopAsyncIteration:
+                break
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await self._on_loop(self._put_and_prune(config, checkpoint, metadata, new_versions))
+
+    async def aput_writes(
+        self, config: RunnableConfig, writes: Sequence[tuple[str, Any]], task_id: str, task_path: str = ""
+    ) -> None:
+        return await self._on_loop(super().aput_writes(config, writes, task_id, task_path))
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return await self._on_loop(self._delete_thread(thread_id))
+
+    # ===== RETENÇÃO =====
+
+    async def setup(self) -> None:
+        # Conexão já aberta em _init_on_loop; mesmo esquema do AsyncSqliteSaver
+        # mais thread_activity (auto_vacuum só vale se definido antes das tabelas)
+        async with self.lock:
+            if self.is_setup:
+                return
+            await self.conn.executescript(
+                """
+                PRAGMA auto_vacuum=INCREMENTAL;
+                PRAGMA journal_mode=WAL;
+                PRAGMA synchronous=NORMAL;
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    thread_id TEXT NOT NULL,
+                    checkpoint_ns TEXT NOT NULL DEFAULT '',
+                    checkpoint_id TEXT NOT NULL,
+                    parent_checkpoint_id TEXT,
+                    type TEXT,
+                    checkpoint BLOB,
+                    metadata BLOB,
+                    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+                );
+                CREATE TABLE IF NOT EXISTS writes (
+                    thread_id TEXT NOT NULL,
+                    checkpoint_ns TEXT NOT NULL DEFAULT '',
+                    checkpoint_id TEXT NOT NULL,
+                    task_id TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    channel TEXT NOT NULL,
+                    type TEXT,
+                    value BLOB,
+                    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+                );
+                CREATE TABLE IF NOT EXISTS thread_activity (
+                    thread_id TEXT PRIMARY KEY,
+                    updated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS keyframes (
+                    thread_id TEXT NOT NULL,
+                    checkpoint_ns TEXT NOT NULL DEFAULT '',
+                    checkpoint_id TEXT NOT NULL,
+                    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+                );
+                """
+            )
+            await self.conn.commit()
+            self.is_setup = True
+        if self.maintenance_interval and self._maintenance is None:
+            self._maintenance = asyncio.ensure_future(self._maintenance_loop())
+
+    async def _put_and_prune(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        stored, keyframe = self._encode_deltas(config, checkpoint)
+        saved = await AsyncSqliteSaver.aput(self, config, stored, metadata, new_versions)
+        thread_id = str(saved["configurable"]["thread_id"])
+        checkpoint_ns = saved["configurable"]["checkpoint_ns"]
+        scope = (thread_id, checkpoint_ns)
+        async with self.lock, self.conn.cursor() as cur:
+            if keyframe:
+                await cur.execute(
+                    "INSERT OR IGNORE INTO keyframes (thread_id, checkpoint_ns, checkpoint_id) VALUES (?, ?, ?)",
+                    (*scope, checkpoint["id"]),
+                )
+            # Mais antigo dos últimos keep_last, recuado até o keyframe de que depende
+            await cur.execute(
+                """
+                SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?
+                ORDER BY checkpoint_id DESC LIMIT 1 OFFSET ?
+                """,
+                (*scope, self.keep_last - 1),
+            )
+            oldest = await cur.fetchone()
+            if oldest is not None:
+                await cur.execute(
+                    """
+                    SELECT COALESCE(MAX(checkpoint_id), ?) FROM keyframes
+                    WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id <= ?
+                    """,
+                    (oldest[0], *scope, oldest[0]),
+                )
+                (cutoff,) = await cur.fetchone()
+                for table in ("checkpoints", "writes", "keyframes"):
+                    await cur.execute(
+                        f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+                        (*scope, cutoff),
+                    )
+            await cur.execute(
+                "INSERT OR REPLACE INTO thread_activity (thread_id, updated_at) VALUES (?, ?)",
+                (thread_id, time.time()),
+            )
+            await self.conn.commit()
+        return saved
+
+    async def _delete_thread(self, thread_id: str) -> None:
+        await AsyncSqliteSaver.adelete_thread(self, thread_id)
+        async with self.lock:
+            for table in ("thread_activity", "keyframes"):
+                await self.conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (str(thread_id),))
+            await self.conn.commit()
+        for key in [key for key in self._last_lists if key[0] == str(thread_id)]:
+            del self._last_lists[key]
+
+    # ===== DELTAS DE LISTAS DE MENSAGENS =====
+
+    def _remember(self, key: Tuple[str, str, str], checkpoint_id: str, values: List[Any], depth: int) -> None:
+        # Cópia rasa: o canal pode reaproveitar a lista entre passos
+        self._last_lists[key] = (checkpoint_id, list(values), depth)
+        self._last_lists.move_to_end(key)
+        while len(self._last_lists) > _MAX_CACHED_THREADS:
+            self._last_lists.popitem(last=False)
+
+    def _encode_deltas(self, config: RunnableConfig, checkpoint: Checkpoint) -> Tuple[Checkpoint, bool]:
+        """Checkpoint a gravar (listas como delta do pai quando possível) e se é keyframe"""
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        parent_id = config["configurable"].get("checkpoint_id")
+        channel_values = dict(checkpoint["channel_values"])
+        keyframe = True
+
+        for channel in self.delta_channels:
+            values = channel_values.get(channel)
+            if not isinstance(values, list):
+                continue
+            key = (thread_id, checkpoint_ns, channel)
+            last = self._last_lists.get(key)
+            depth = 0
+            # Delta só contra o último checkpoint gravado desta thread (sem forks)
+            if last is not None and parent_id is not None and last[0] == parent_id and last[2] < self.keyframe_interval:
+                keep = _common_prefix(last[1], values)
+                depth = last[2] + 1
+                channel_values[channel] = {
+                    _DELTA_KEY: {"base": parent_id, "keep": keep, "depth": depth},
+                    "append": values[keep:],
+                }
+                keyframe = False
+            self._remember(key, checkpoint["id"], values, depth)
+
+        if keyframe:
+            return checkpoint, True
+        return {**checkpoint, "channel_values": channel_values}, False
+
+    async def _load_list(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str, channel: str) -> List[Any]:
+        # Sem self.lock: pode rodar dentro do alist do AsyncSqliteSaver, que o mantém
+        deltas = []
+        while True:
+            async with self.conn.execute(
+                "SELECT type, checkpoint FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (thread_id, checkpoint_ns, checkpoint_id),
+            ) as cur:
+                row = await cur.fetchone()
+            if row is None:
+                raise LookupError(f"Delta base {checkpoint_id} of thread {thread_id} was pruned")
+            value = self.serde.loads_typed(row)["channel_values"].get(channel)
+            if not _is_delta(value):
+                values = list(value or [])
+                break
+            deltas.append(value)
+            checkpoint_id = value[_DELTA_KEY]["base"]
+
+        for delta in reversed(deltas):
+            values = values[: delta[_DELTA_KEY]["keep"]] + list(delta["append"])
+        return values
+
+    async def _rebuild(self, item: Optional[CheckpointTuple]) -> Optional[CheckpointTuple]:
+        """Reconstrói as listas gravadas como delta (lazy: só no checkpoint lido)"""
+        if item is None:
+            return None
+        channel_values = item.checkpoint["channel_values"]
+        thread_id = str(item.config["configurable"]["thread_id"])
+        checkpoint_ns = item.config["configurable"].get("checkpoint_ns", "")
+        for channel in self.delta_channels:
+            value = channel_values.get(channel)
+            if not _is_delta(value):
+                continue
+            delta = value[_DELTA_KEY]
+            base = await self._load_list(thread_id, checkpoint_ns, delta["base"], channel)
+            channel_values[channel] = base[: delta["keep"]] + list(value["append"])
+        return item
+
+    async def _get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        item = await self._rebuild(await AsyncSqliteSaver.aget_tuple(self, config))
+        if item is not None and not get_checkpoint_id(config):
+            # Último checkpoint da thread: base dos próximos deltas (ex.: após reinício)
+            thread_id = str(item.config["configurable"]["thread_id"])
+            checkpoint_ns = item.config["configurable"].get("checkpoint_ns", "")
+            for channel in self.delta_channels:
+                values = item.checkpoint["channel_values"].get(channel)
+                key = (thread_id, checkpoint_ns, channel)
+                if isinstance(values, list) and key not in self._last_lists:
+                    # Profundidade desconhecida: o próximo delta já fecha a cadeia em keyframe
+                    self._remember(key, item.checkpoint["id"], values, self.keyframe_interval - 1)
+        return item
+
+    async def _next_rebuilt(self, items: AsyncIterator[CheckpointTuple]) -> CheckpointTuple:
+        return await self._rebuild(await anext(items))
+
+    async def aexpire_idle_threads(self) -> int:
+        """Remove as threads sem checkpoint novo dentro do TTL; retorna quantas"""
+        if not self.thread_ttl:
+            return 0
+
+        async def expire() -> int:
+            await self.setup()
+            cutoff = time.time() - self.thread_ttl
+            async with self.conn.execute(
+                "SELECT thread_id FROM thread_activity WHERE updated_at < ?", (cutoff,)
+            ) as cur:
+                idle = [row[0] for row in await cur.fetchall()]
+            for thread_id in idle:
+                await self._delete_thread(thread_id)
+            return len(idle)
+
+        return await self._on_loop(expire())
+
+    async def avacuum(self) -> None:
+        """Trunca o WAL e devolve páginas livres ao sistema de arquivos"""
+
+        async def vacuum() -> None:
+            await self.setup()
+            async with self.lock:
+                # executescript roda o pragma até o fim (execute libera uma página por passo)
+                await self.conn.executescript("PRAGMA incremental_vacuum;")
+                await self.conn.commit()
+                await self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        await self._on_loop(vacuum())
+
+    async def _maintenance_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.maintenance_interval)
+            try:
+                expired = await self.aexpire_idle_threads()
+                await self.avacuum()
+                if expired:
+                    logger.info(f"Checkpointer expired {expired} idle threads")
+            except Exception as e:
+                logger.error(f"Checkpointer maintenance failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Threads, checkpoints e tamanho do arquivo (bytes, incluindo o WAL)"""
+
+        async def count() -> Dict[str, int]:
+            await self.setup()
+            async with self.conn.execute(
+                "SELECT COUNT(DISTINCT thread_id), COUNT(*) FROM checkpoints"
+            ) as cur:
+                threads, checkpoints = await cur.fetchone()
+            return {"threads": threads, "checkpoints": checkpoints}
+
+        stats = asyncio.run_coroutine_threadsafe(count(), self.loop).result()
+        stats["bytes"] = sum(
+            os.path.getsize(self.path + suffix) for suffix in ("", "-wal") if os.path.exists(self.path + suffix)
+        )
+        return stats
+
+    def close(self) -> None:
+        """Encerra manutenção, conexão e o loop próprio"""
+        if not self.loop.is_running():
+            return
+
+        async def shutdown() -> None:
+            if self._maintenance is not None:
+                self._maintenance.cancel()
+            await self.conn.close()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._loop_thread.join()
+
+
+_CHECKPOINTER: Optional[PrunedSqliteSaver] = None
+_CHECKPOINTER_LOCK = threading.Lock()
+
+
+def get_checkpointer() -> PrunedSqliteSaver:
+    """Checkpointer process-wide em DEFAULT_CHECKPOINT_PATH, fechado na saída do processo"""
+    global _CHECKPOINTER
+    with _CHECKPOINTER_LOCK:
+        if _CHECKPOINTER is None:
+            _CHECKPOINTER = PrunedSqliteSaver()
+            atexit.register(_CHECKPOINTER.close)
+    return _CHECKPOINTER
@@ -1,7 +1,9 @@
+from collections import OrderedDict
 from langchain_core.tools import tool
+from langgraph.config import get_config
 from langgraph.types import Command
 from langchain_core.messages import ToolMessage, HumanMessage
-from typing import Annotated
+from typing import Annotated, Any, get_type_hints
 from langgraph_swarm.handoff import (
     _normalize_agent_name,
     METADATA_KEY_HANDOFF_DESTINATION,
@@ -10,6 +12,110 @@ from langgraph.prebuilt import InjectedState
 from langchain_core.tools import InjectedToolCallId
 from langgraph.graph import StateGraph
 import os
+import threading
+
+# Canais de controle do swarm/agente, nunca propagados como estado
+_CONTROL_KEYS = frozenset({"messages", "active_agent", "remaining_steps", "is_last_step", "llm_input_messages"})
+
+# Nome do agente -> state_schema, registrado na construção do agente
+_AGENT_SCHEMAS: dict[str, type] = {}
+
+# Estado de entrada por invocação de agente (thread, namespace): base das atualizações mínimas.
+# Guarda só referências aos valores que o grafo pai já mantém
+_ENTRY_STATES: "OrderedDict[tuple, dict]" = OrderedDict()
+_MAX_ENTRY_STATES = 256
+_ENTRY_LOCK = threading.Lock()
+
+
+def register_agent_schema(agent_name: str, state_schema: type) -> None:
+    """Registra o state_schema do agente como destino de handoffs"""
+    _AGENT_SCHEMAS[agent_name] = state_schema
+
+
+def schema_keys(state_schema: type) -> frozenset[str]:
+    """Chaves de estado que o schema lê (pydantic ou TypedDict, com herança), sem os canais de controle"""
+    fields = getattr(state_schema, "model_fields", None)
+    keys = fields.keys() if fields is not None else get_type_hints(state_schema).keys()
+    return frozenset(keys) - _CONTROL_KEYS
+
+
+def _invocation_key() -> tuple | None:
+    try:
+        configurable = get_config().get("configurable", {})
+    except RuntimeError:
+        return None
+    checkpoint_ns = configurable.get("checkpoint_ns", "")
+    # Nós de um agente rodando como subgrafo: "<agente>:<task_id>|<nó>:<task_id>"
+    if "|" not in checkpoint_ns:
+        return None
+    return configurable.get("thread_id"), checkpoint_ns.rsplit("|", 1)[0]
+
+
+def remember_entry_state(state: Any) -> None:
+    """
+    Registra o estado com que o agente entrou na invocação atual; chamado pelo
+    pre_model_hook, só a primeira chamada da invocação vale
+    """
+    key = _invocation_key()
+    if key is None:
+        return
+    with _ENTRY_LOCK:
+        if key in _ENTRY_STATES:
+            return
+        entry = dict(state)
+        entry["messages"] = list(entry.get("messages", []))
+        _ENTRY_STATES[key] = entry
+        while len(_ENTRY_STATES) > _MAX_ENTRY_STATES:
+            _ENTRY_STATES.popitem(last=False)
+
+
+def _entry_state() -> dict | None:
+    key = _invocation_key()
+    if key is None:
+        return None
+    with _ENTRY_LOCK:
+        return _ENTRY_STATES.get(key)
+
+
+def _messages_since_entry(messages: list, entry: dict | None) -> list:
+    """Mensagens criadas pelo agente nesta invocação; lista completa se não há entrada registrada"""
+    before = entry.get("messages") if entry else None
+    if before is None or len(messages) < len(before):
+        return list(messages)
+    if before and getattr(messages[len(before) - 1], "id", None) != getattr(before[-1], "id", None):
+        return list(messages)
+    return messages[len(before):]
+
+
+def _propagated_state(
+    state: Any,
+    agent_name: str,
+    entry: dict | None,
+    propagate_keys: list[str] | None,
+    state_schema: type | None,
+) -> dict:
+    """
+    Chaves que o agente de destino lê (propagate_keys, seu state_schema ou o
+    registrado para ele), só as alteradas desde a entrada do agente atual
+    """
+    state = dict(state)
+    if propagate_keys:
+        keys = [key for key in propagate_keys if key in state]
+    elif state_schema is not None or agent_name in _AGENT_SCHEMAS:
+        destination_keys = schema_keys(state_schema or _AGENT_SCHEMAS[agent_name])
+        keys = [key for key in state if key in destination_keys]
+    else:
+        # Destino desconhecido: todo o estado, como antes
+        keys = [key for key in state if key not in _CONTROL_KEYS]
+
+    update = {}
+    for key in keys:
+        value = state[key]
+        # Inalterada desde a entrada: o grafo pai já tem esse valor
+        if entry is not None and key in entry and (entry[key] is value or entry[key] == value):
+            continue
+        update[key] = value
+    return update
 
 
 def create_handoff_tool_with_state_propagation(
@@ -18,17 +124,25 @@ def create_handoff_tool_with_state_propagation(
     name: str | None = None,
     description: str | None = None,
     propagate_keys: list[str] | None = None,  # opcional: definir campos específicos
+    state_schema: type | None = None,
 ) -> tool:
     """
     Custom version of LangGraph's handoff tool that propagates the current agent's state
     along with messages and active_agent.
 
+    Only the keys the destination agent reads are propagated, and only those changed
+    since the current agent was entered; messages carry only the ones added by the
+    current agent (the parent graph's add_messages appends them).
+
     Args:
         agent_name: Destination agent node name.
         name: Tool name.
         description: Tool description.
         propagate_keys: Optional list of state keys to propagate in the update.
-                        If None, the entire state is forwarded.
+                        If None, the destination's state_schema keys are used.
+        state_schema: Destination state schema. If None, the schema registered for
+                      agent_name (see register_agent_schema) is used; if none is
+                      registered, the entire state is forwarded.
     """
 
     if name is None:
@@ -48,21 +162,12 @@ def create_handoff_tool_with_state_propagation(
             tool_call_id=tool_call_id,
         )
 
+        entry = _entry_state()
         update = {
-            "messages": state["messages"] + [tool_message],
+            "messages": _messages_since_entry(state["messages"], entry) + [tool_message],
             "active_agent": agent_name,
         }
-
-        if propagate_keys:
-            update.update({key: state[key] for key in propagate_keys if key in state})
-        else:
-            update.update(
-                {
-                    k: v
-                    for k, v in state.items()
-                    if k not in ["messages", "active_agent"]
-                }
-            )
+        update.update(_propagated_state(state, agent_name, entry, propagate_keys, state_schema))
 
         return Command(
             goto=agent_name,
@@ -82,10 +187,13 @@ def create_handoff_tool_with_task(
     agent_name: str,
     description: str | None = None,
     propagate_keys: list[str] | None = None,
+    state_schema: type | None = None,
 ):
     """
     Custom handoff tool that transfers control to another agent with a task message
-    and optional partial state propagation.
+    and partial state propagation: the keys the destination agent reads
+    (propagate_keys, state_schema or the schema registered for agent_name),
+    only those changed since the current agent was entered.
     """
 
     if name is None:
@@ -105,17 +213,7 @@ def create_handoff_tool_with_task(
             "messages": [HumanMessage(content=task_message)],
             "active_agent": agent_name,
         }
-
-        if propagate_keys:
-            update.update({key: state[key] for key in propagate_keys if key in state})
-        else:
-            update.update(
-                {
-                    k: v
-                    for k, v in state.items()
-                    if k not in ["messages", "active_agent"]
-                }
-            )
+        update.update(_propagated_state(state, agent_name, _entry_state(), propagate_keys, state_schema))
 
         return Command(
             goto=agent_name,
@@ -129,7 +227,7 @@ def create_handoff_tool_with_task(
 
 
 def compile_workflow(workflow: StateGraph, checkpointer=None):
-    """Compila o workflow com MemoryCheckpointer para inspeção de estado"""
+    """Compila o workflow com o checkpointer informado (MemorySaver se nenhum) para inspeção de estado"""
     is_langgraph_api = (
         os.environ.get("LANGGRAPH_API", "false").lower() == "true"
         or os.environ.get("LANGGRAPH_API_DIR") is not None
@@ -138,11 +236,9 @@ def compile_workflow(workflow: StateGraph, checkpointer=None):
     if is_langgraph_api:
         return workflow.compile()
     else:
-        memory = None
         if checkpointer is None:
             from langgraph.checkpoint.memory import MemorySaver
 
-            memory = MemorySaver()
-            checkpointer = memory
+            checkpointer = MemorySaver()
 
-        return workflow.compile(checkpointer=memory)
+        return workflow.compile(checkpointer=checkpointer)
@@ -0,0 +1,111 @@
+import sqlite3
+from typing import Annotated, TypedDict
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+
+from sample_agent.checkpointer import PrunedSqliteSaver
+
+KEYFRAME_INTERVAL = 3
+KEEP_LAST = 50
+
+
+class ChatState(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def _graph(saver: PrunedSqliteSaver):
+    def respond(state: ChatState) -> dict:
+        return {"messages": [AIMessage(content=f"Resposta {len(state['messages'])}")]}
+
+    builder = StateGraph(ChatState)
+    builder.add_node("respond", respond)
+    builder.add_edge(START, "respond")
+    builder.add_edge("respond", END)
+    return builder.compile(checkpointer=saver)
+
+
+def _saver(path: str) -> PrunedSqliteSaver:
+    return PrunedSqliteSaver(
+        path,
+        keep_last=KEEP_LAST,
+        thread_ttl=None,
+        maintenance_interval=None,
+        delta_channels=("messages",),
+        keyframe_interval=KEYFRAME_INTERVAL,
+    )
+
+
+def _contents(state) -> list:
+    return [message.content for message in state.values["messages"]]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "checkpoints.db")
+
+
+def _converse(graph, config, turns: int) -> list:
+    expected = []
+    for turn in range(turns):
+        graph.invoke({"messages": [HumanMessage(content=f"Pergunta {turn}")]}, config)
+        expected += [f"Pergunta {turn}", f"Resposta {2 * turn + 1}"]
+    return expected
+
+
+def test_messages_round_trip_through_deltas_and_keyframes(db_path):
+    saver = _saver(db_path)
+    graph = _graph(saver)
+    config = {"configurable": {"thread_id": "conversa"}}
+    try:
+        expected = _converse(graph, config, turns=8)
+
+        assert _contents(graph.get_state(config)) == expected
+        # Cada checkpoint do histórico é reconstruído a partir do keyframe de que depende
+        history = [_contents(state) for state in graph.get_state_history(config)]
+        for newer, older in zip(history, history[1:]):
+            assert newer[: len(older)] == older
+    finally:
+        saver.close()
+
+    with sqlite3.connect(db_path) as db:
+        checkpoints = db.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+        keyframes = db.execute("SELECT COUNT(*) FROM keyframes").fetchone()[0]
+    assert 1 < keyframes < checkpoints
+    assert keyframes >= checkpoints // (KEYFRAME_INTERVAL + 1)
+
+
+def test_reopened_saver_rebuilds_from_disk_and_continues(db_path):
+    config = {"configurable": {"thread_id": "conversa"}}
+    saver = _saver(db_path)
+    expected = _converse(_graph(saver), config, turns=5)
+    saver.close()
+
+    reopened = _saver(db_path)
+    graph = _graph(reopened)
+    try:
+        assert _contents(graph.get_state(config)) == expected
+        graph.invoke({"messages": [HumanMessage(content="Pergunta final")]}, config)
+        assert _contents(graph.get_state(config)) == expected + ["Pergunta final", f"Resposta {len(expected) + 1}"]
+    finally:
+        reopened.close()
+
+
+def test_fork_from_older_checkpoint_keeps_both_branches(db_path):
+    saver = _saver(db_path)
+    graph = _graph(saver)
+    config = {"configurable": {"thread_id": "conversa"}}
+    try:
+        _converse(graph, config, turns=4)
+        older = next(state for state in graph.get_state_history(config) if len(state.values.get("messages", [])) == 4)
+        forked = graph.invoke({"messages": [HumanMessage(content="Outra pergunta")]}, older.config)
+
+        assert [message.content for message in forked["messages"]] == _contents(older) + [
+            "Outra pergunta",
+            "Resposta 5",
+        ]
+        assert _contents(graph.get_state(older.config)) == _contents(older)
+    finally:
+        saver.close()
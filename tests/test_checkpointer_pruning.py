@@ -0,0 +1,125 @@
+import asyncio
+import sqlite3
+import types
+from typing import Annotated, TypedDict
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+
+from sample_agent import checkpointer
+from sample_agent.checkpointer import PrunedSqliteSaver
+
+KEEP_LAST = 4
+
+
+class ChatState(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def _graph(saver: PrunedSqliteSaver):
+    def respond(state: ChatState) -> dict:
+        return {"messages": [AIMessage(content=f"Resposta {len(state['messages'])}")]}
+
+    builder = StateGraph(ChatState)
+    builder.add_node("respond", respond)
+    builder.add_edge(START, "respond")
+    builder.add_edge("respond", END)
+    return builder.compile(checkpointer=saver)
+
+
+def _config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def _converse(graph, thread_id: str, turns: int) -> None:
+    for turn in range(turns):
+        graph.invoke({"messages": [HumanMessage(content=f"Pergunta {turn}")]}, _config(thread_id))
+
+
+def _counts(db_path: str) -> dict:
+    with sqlite3.connect(db_path) as db:
+        return dict(db.execute("SELECT thread_id, COUNT(*) FROM checkpoints GROUP BY thread_id").fetchall())
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "checkpoints.db")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Relógio controlado pelo teste no lugar de time.time()"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(checkpointer, "time", types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def test_each_thread_keeps_only_its_last_checkpoints(db_path):
+    saver = PrunedSqliteSaver(db_path, keep_last=KEEP_LAST, thread_ttl=None, maintenance_interval=None, delta_channels=())
+    graph = _graph(saver)
+    try:
+        _converse(graph, "longa", turns=10)
+        _converse(graph, "curta", turns=1)
+
+        messages = graph.get_state(_config("longa")).values["messages"]
+        assert [message.content for message in messages[-2:]] == ["Pergunta 9", "Resposta 19"]
+        assert len(list(graph.get_state_history(_config("longa")))) == KEEP_LAST
+    finally:
+        saver.close()
+
+    counts = _counts(db_path)
+    assert counts["longa"] == KEEP_LAST
+    assert counts["curta"] < KEEP_LAST
+
+
+def test_pruning_keeps_the_keyframe_retained_deltas_depend_on(db_path):
+    saver = PrunedSqliteSaver(
+        db_path, keep_last=KEEP_LAST, thread_ttl=None, maintenance_interval=None,
+        delta_channels=("messages",), keyframe_interval=KEEP_LAST - 1,
+    )
+    graph = _graph(saver)
+    try:
+        _converse(graph, "conversa", turns=10)
+
+        history = [state.values.get("messages", []) for state in graph.get_state_history(_config("conversa"))]
+        assert len(history[0]) == 20
+        assert all(len(newer) >= len(older) for newer, older in zip(history, history[1:]))
+    finally:
+        saver.close()
+
+    assert KEEP_LAST <= _counts(db_path)["conversa"] < 2 * KEEP_LAST
+
+
+def test_idle_threads_expire_after_ttl(db_path, clock):
+    saver = PrunedSqliteSaver(db_path, keep_last=KEEP_LAST, thread_ttl=3600, maintenance_interval=None)
+    graph = _graph(saver)
+    try:
+        _converse(graph, "antiga", turns=1)
+        clock[0] += 3000
+        _converse(graph, "recente", turns=1)
+        clock[0] += 1000
+
+        assert asyncio.run(saver.aexpire_idle_threads()) == 1
+        assert graph.get_state(_config("antiga")).values == {}
+        assert graph.get_state(_config("recente")).values["messages"]
+        asyncio.run(saver.avacuum())
+        assert saver.stats()["threads"] == 1
+    finally:
+        saver.close()
+
+    with sqlite3.connect(db_path) as db:
+        assert db.execute("SELECT thread_id FROM thread_activity").fetchall() == [("recente",)]
+        assert db.execute("SELECT COUNT(*) FROM writes WHERE thread_id = 'antiga'").fetchone()[0] == 0
+
+
+def test_ttl_disabled_never_expires(db_path, clock):
+    saver = PrunedSqliteSaver(db_path, thread_ttl=None, maintenance_interval=None)
+    try:
+        _converse(_graph(saver), "conversa", turns=1)
+        clock[0] += 10 * 365 * 24 * 3600
+
+        assert asyncio.run(saver.aexpire_idle_threads()) == 0
+    finally:
+        saver.close()
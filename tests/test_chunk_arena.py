@@ -0,0 +1,81 @@
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, StateGraph
+
+from sample_agent.agents.tce_swarm.rag.chunk_arena import load_graded, reset_chunk_arena, store_chunks
+from sample_agent.agents.tce_swarm.rag.graph import _changed_fields
+from sample_agent.agents.tce_swarm.rag.models.chunks import ChunkMetadata, ChunkResult, GradedChunk
+from sample_agent.agents.tce_swarm.rag.models.state import RESET_CHUNK_STORE, RAGState, merge_chunk_store
+
+
+def _chunk(chunk_id: str) -> ChunkResult:
+    metadata = ChunkMetadata(document_id="doc", page_number=None, section=None, chunk_index=0, timestamp=None)
+    return ChunkResult(content=f"conteúdo {chunk_id}", metadata=metadata, chunk_id=chunk_id)
+
+
+def test_merge_chunk_store_adds_new_chunks():
+    a, b = _chunk("a"), _chunk("b")
+
+    assert merge_chunk_store({"a": a}, {"b": b}) == {"a": a, "b": b}
+    assert merge_chunk_store(None, {"a": a}) == {"a": a}
+    assert merge_chunk_store({"a": a}, None) == {"a": a}
+
+
+def test_merge_chunk_store_reset_replaces_previous_run():
+    a, b = _chunk("a"), _chunk("b")
+
+    assert merge_chunk_store({"a": a}, {RESET_CHUNK_STORE: None}) == {}
+    assert merge_chunk_store({"a": a}, {RESET_CHUNK_STORE: None, "b": b}) == {"b": b}
+
+
+def test_store_chunks_returns_only_chunks_not_in_store():
+    a, b = _chunk("a"), _chunk("b")
+    state = RAGState(chunk_store={"a": a}, retrieved_chunks=["a"])
+
+    graded = [
+        GradedChunk(chunk=a, relevance_score=0.9, confidence=0.8),
+        GradedChunk(chunk=b, relevance_score=0.4, confidence=0.5),
+    ]
+    update = store_chunks(state, graded=graded)
+
+    assert update["chunk_store"] == {"b": b}
+    assert [grade.chunk_id for grade in update["graded_chunks"]] == ["a", "b"]
+    assert "chunk_store" not in store_chunks(state, retrieved=[a])
+
+
+def test_store_and_load_round_trip():
+    a = _chunk("a")
+    update = store_chunks(RAGState(), graded=[GradedChunk(chunk=a, relevance_score=0.9, confidence=0.8)])
+    state = RAGState(**update)
+
+    assert load_graded(state) == [GradedChunk(chunk=a, relevance_score=0.9, confidence=0.8)]
+
+
+def test_changed_fields_keeps_only_rewritten_fields():
+    state = RAGState(original_query="q", chunk_store={"a": _chunk("a")}, retrieved_chunks=["a"])
+
+    assert _changed_fields(state, state.copy(processed_query="q2")) == {"processed_query": "q2"}
+    assert _changed_fields(state, {"needs_rewrite": True}) == {"needs_rewrite": True}
+
+
+def test_chunk_store_is_scoped_to_each_run():
+    def entry(state: RAGState) -> dict:
+        return reset_chunk_arena()
+
+    def retrieve(state: RAGState) -> dict:
+        return store_chunks(state, retrieved=[_chunk(f"{state.original_query}-{i}") for i in range(3)])
+
+    builder = StateGraph(RAGState)
+    builder.add_node("entry", entry)
+    builder.add_node("retrieve", retrieve)
+    builder.add_edge(START, "entry")
+    builder.add_edge("entry", "retrieve")
+    builder.add_edge("retrieve", END)
+    graph = builder.compile(checkpointer=MemorySaver())
+    config = {"configurable": {"thread_id": "conversa"}}
+
+    first = graph.invoke({"original_query": "q1"}, config)
+    second = graph.invoke({"original_query": "q2"}, config)
+
+    assert sorted(first["chunk_store"]) == ["q1-0", "q1-1", "q1-2"]
+    assert sorted(second["chunk_store"]) == ["q2-0", "q2-1", "q2-2"]
+    assert second["retrieved_chunks"] == ["q2-0", "q2-1", "q2-2"]
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from sample_agent.agents.tce_swarm.rag.context_packer import PackedContext
+from sample_agent.agents.tce_swarm.rag.models.chunks import (
+    ChunkMetadata,
+    ChunkResult,
+    Citation,
+    EnrichedChunk,
+    RankingFactors,
+    RerankedChunk,
+)
+from sample_agent.agents.tce_swarm.rag.models.state import RAGState
+from sample_agent.agents.tce_swarm.rag.nodes import response_generation
+from sample_agent.agents.tce_swarm.rag.nodes.response_generation import CitationStream
+
+
+def _citation(number: int) -> Citation:
+    return Citation(
+        source=f"Documento {number}",
+        document_type="resolucao",
+        document_number=f"DOC-{number:03d}",
+        page_number=None,
+        article_number=None,
+        excerpt=f"trecho {number}",
+        confidence=0.9,
+    )
+
+
+CITATIONS = [_citation(number) for number in (1, 2, 3)]
+
+
+def _numbers(resolved):
+    return [citation.document_number for citation in resolved]
+
+
+def test_marker_split_across_pieces_resolves_when_complete():
+    stream = CitationStream(CITATIONS)
+
+    assert stream.feed("O prazo é de três dias [") == []
+    assert stream.feed("2") == []
+    assert stream.feed("].") == [(2, CITATIONS[1])]
+
+
+def test_citations_are_emitted_once_in_first_mention_order():
+    stream = CitationStream(CITATIONS)
+    new = []
+    for piece in ["Segundo [3], ", "o prazo [1, 3] ", "é anual [3]", " e [9] não existe."]:
+        new.extend(index for index, _ in stream.feed(piece))
+
+    assert new == [3, 1]
+    assert _numbers(stream.resolved) == ["DOC-003", "DOC-001"]
+    assert stream.text == "Segundo [3], o prazo [1, 3] é anual [3] e [9] não existe."
+
+
+def test_long_stream_only_rescans_the_tail():
+    stream = CitationStream(CITATIONS)
+    stream.feed("[1] " + "texto " * 1000)
+
+    assert stream.feed("fim [2]") == [(2, CITATIONS[1])]
+    assert stream.feed(" [1] [2]") == []
+
+
+def _reranked(chunk_id: str, content: str) -> RerankedChunk:
+    factors = RankingFactors(
+        semantic_similarity=None, keyword_match=None, document_authority=None, recency=None, context_relevance=None
+    )
+    metadata = ChunkMetadata(document_id=chunk_id, page_number=None, section=None, chunk_index=0, timestamp=None)
+    enriched = EnrichedChunk(
+        chunk=ChunkResult(content=content, metadata=metadata, chunk_id=chunk_id),
+        relevance_score=0.9,
+        enriched_context="",
+        cross_references=[],
+        ranking_factors=factors,
+    )
+    return RerankedChunk(chunk=enriched, final_score=0.9, ranking_factors=factors)
+
+
+PIECES = ["O prazo é de três dias úteis [", "2]. Cabe recurso [1", ", 2]."]
+
+
+@pytest.fixture
+def streamed(monkeypatch):
+    """Geração em streaming com LLM e contexto falsos; retorna os eventos emitidos"""
+    chunks = [_reranked("art-71", "Art. 71. Cabe recurso."), _reranked("art-72", "Art. 72. Prazo de três dias.")]
+    packed = PackedContext(chunks=chunks, context="[1] Art. 71. Cabe recurso.\n\n[2] Art. 72. Prazo de três dias.", tokens=20)
+    events = []
+
+    async def apieces(instruction, **kwargs):
+        for piece in PIECES:
+            yield piece
+
+    monkeypatch.setattr(response_generation, "pack_context", lambda *args, **kwargs: packed)
+    monkeypatch.setattr(response_generation, "load_reranked", lambda state: chunks)
+    monkeypatch.setattr(response_generation, "get_stream_writer", lambda: events.append)
+    monkeypatch.setattr(response_generation, "llm_stream", lambda instruction, **kwargs: iter(PIECES))
+    monkeypatch.setattr(response_generation, "allm_stream", apieces)
+    return events
+
+
+def _state() -> RAGState:
+    query = "Qual o prazo de recurso?"
+    return RAGState(original_query=query, messages=[HumanMessage(query)], query_type="resolucao", stream_generation=True)
+
+
+@pytest.mark.parametrize("run", ["sync", "async"])
+def test_streamed_generation_emits_citations_as_markers_arrive(streamed, run):
+    if run == "sync":
+        result = response_generation.response_generation_node(_state())
+    else:
+        result = asyncio.run(response_generation.aresponse_generation_node(_state()))
+
+    kinds = [(event["event"], event.get("index")) for event in streamed]
+    assert kinds == [("token", None), ("token", None), ("citation", 2), ("token", None), ("citation", 1)]
+    assert result.generated_response == "".join(PIECES)
+    assert [citation.excerpt for citation in result.citations] == ["Art. 72. Prazo de três dias.", "Art. 71. Cabe recurso."]
+    assert result.context_tokens == 20
+    assert result.quality_score is None
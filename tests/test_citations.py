@@ -0,0 +1,90 @@
+from sample_agent.agents.tce_swarm.rag.chunk_arena import load_reranked
+from sample_agent.agents.tce_swarm.rag.index.citations import (
+    CitationIndex,
+    ProvisionRef,
+    document_type_of,
+    parse_citations,
+)
+from sample_agent.agents.tce_swarm.rag.index.vector_store import LocalVectorStore
+from sample_agent.agents.tce_swarm.rag.models.chunks import ChunkMetadata, ChunkResult
+from sample_agent.agents.tce_swarm.rag.models.state import RAGState
+from sample_agent.agents.tce_swarm.rag.nodes import citation_lookup
+
+
+def _chunk(chunk_id: str, content: str, document_id: str = "res-18832", index: int = 0) -> ChunkResult:
+    metadata = ChunkMetadata(document_id=document_id, page_number=None, section=None, chunk_index=index, timestamp=None)
+    return ChunkResult(content=content, metadata=metadata, chunk_id=chunk_id)
+
+
+RESOLUTION = [
+    _chunk("c0", "# RESOLUÇÃO Nº 18.832, DE 15 DE MARÇO DE 2016\nDispõe sobre prestação de contas.", index=0),
+    _chunk("c1", "Art. 71. O prazo de envio é anual.\n§ 1º O envio é eletrônico.", index=1),
+    # Continuação do § 1º sem cabeçalho próprio
+    _chunk("c2", "incluindo os anexos previstos na Lei nº 4.320.", index=2),
+    _chunk("c3", "§ 2º O atraso gera multa.\nArt. 72. Revogam-se as disposições em contrário.", index=3),
+]
+
+
+def test_parse_citations_extracts_document_article_and_paragraph():
+    assert parse_citations("Art. 71, § 2º da Resolução 18.832") == [ProvisionRef("18832", "71", "2", "resolucao")]
+    assert parse_citations("artigos 71 e art. 72 da Lei Complementar nº 81/2017") == [
+        ProvisionRef("812017", "71", None, "legislation"),
+        ProvisionRef("812017", "72", None, "legislation"),
+    ]
+    assert parse_citations("Parágrafo único do artigo 5 do Acórdão 1.234") == [
+        ProvisionRef("1234", "5", "unico", "acordao"),
+    ]
+    # Sem documento ou sem artigo não há dispositivo
+    assert parse_citations("o que diz a Resolução 18.832?") == []
+    assert parse_citations("prazo do art. 71") == []
+
+
+def test_document_type_prefers_longest_name():
+    assert document_type_of("Lei Complementar nº 81") == "lei complementar"
+    assert document_type_of("sem referência") is None
+
+
+def test_lookup_follows_headings_across_chunks():
+    index = CitationIndex()
+    index.add("global", list(reversed(RESOLUTION)))
+
+    assert index.lookup([ProvisionRef("18832", "71")]) == ["c1", "c2", "c3"]
+    assert index.lookup([ProvisionRef("18832", "71", "1")]) == ["c1", "c2"]
+    assert index.lookup([ProvisionRef("18832", "71", "2")]) == ["c3"]
+    assert index.lookup([ProvisionRef("18832", "72")]) == ["c3"]
+    # Menção no corpo não define documento
+    assert index.lookup([ProvisionRef("4320", "71")]) == []
+    assert index.document_type("18832") == "resolucao"
+
+
+def test_lookup_respects_collections_and_deletions():
+    index = CitationIndex()
+    index.add("user_42", RESOLUTION)
+
+    refs = [ProvisionRef("18832", "71", "2"), ProvisionRef("18832", "72")]
+    assert index.lookup(refs) == ["c3"]
+    assert index.lookup(refs, collections=["global"]) == []
+
+    index.delete(["c3"])
+    assert index.lookup(refs) == []
+
+
+def test_citation_lookup_node_short_circuits_named_provision(monkeypatch):
+    index = CitationIndex()
+    index.add("global", RESOLUTION)
+    store = LocalVectorStore()
+    store.upsert("global", RESOLUTION)
+    monkeypatch.setattr(citation_lookup, "get_citation_index", lambda backend: index)
+    monkeypatch.setattr(citation_lookup, "get_vector_store", lambda backend: store)
+
+    hit = citation_lookup.citation_lookup_node(RAGState(original_query="Art. 71, § 2º da Resolução 18.832"))
+    miss = citation_lookup.citation_lookup_node(RAGState(original_query="Art. 99 da Resolução 18.832"))
+    remote = citation_lookup.citation_lookup_node(
+        RAGState(original_query="Art. 71 da Resolução 18.832", vector_db_type="azure_ai_search")
+    )
+
+    assert hit["citation_match"] is True
+    assert hit["query_type"] == "resolucao"
+    assert [chunk.chunk.chunk.chunk_id for chunk in load_reranked(RAGState(**hit))] == ["c3"]
+    assert miss == {"citation_match": False}
+    assert remote == {"citation_match": False}
@@ -0,0 +1,73 @@
+from sample_agent.agents.tce_swarm.rag import collections
+from sample_agent.agents.tce_swarm.rag.collections import DEFAULT_COLLECTIONS_CONFIG, CollectionResolver
+from sample_agent.agents.tce_swarm.rag.models.state import RAGState
+from sample_agent.agents.tce_swarm.rag.nodes import vector_db_setup
+
+
+def _resolver() -> CollectionResolver:
+    return CollectionResolver.from_yaml(DEFAULT_COLLECTIONS_CONFIG)
+
+
+def test_scopes_expand_templates_from_state_values():
+    resolver = _resolver()
+
+    assert resolver.resolve("lancedb", "global") == ["global"]
+    assert resolver.resolve("lancedb", None) == ["global"]
+    assert resolver.resolve("lancedb", "user_specific", user_id="42") == ["user-42", "global"]
+    assert resolver.resolve("lancedb", "session_specific", user_id="42", session_id="abc") == [
+        "session-abc", "user-42", "global",
+    ]
+
+
+def test_templates_with_missing_values_are_skipped():
+    resolver = _resolver()
+
+    assert resolver.resolve("lancedb", "session_specific", user_id="42") == ["user-42", "global"]
+    assert resolver.resolve("lancedb", "user_specific") == ["global"]
+
+
+def test_placeholder_values_are_slugged():
+    assert _resolver().resolve("lancedb", "user_specific", user_id="João Silva/TCE") == ["user-joao-silva-tce", "global"]
+
+
+def test_target_databases_are_appended_without_duplicates():
+    resolver = _resolver()
+
+    assert resolver.resolve("lancedb", "global", ["acordaos", "desconhecida", "acordaos"]) == ["global", "acordaos"]
+
+
+def test_unknown_scope_uses_default_or_llm_fallback():
+    rules = {"scopes": {"global": ["global"]}, "default_scope": "global"}
+
+    assert CollectionResolver(rules).resolve("lancedb", "departamento") == ["global"]
+    assert CollectionResolver({**rules, "llm_fallback": True}).resolve("lancedb", "departamento") is None
+
+
+def test_missing_config_falls_back_to_global(tmp_path):
+    resolver = CollectionResolver.from_yaml(str(tmp_path / "inexistente.yaml"))
+
+    assert resolver.resolve("lancedb", "user_specific", user_id="42") == ["global"]
+
+
+def test_results_are_memoized_and_returned_as_copies():
+    resolver = _resolver()
+    first = resolver.resolve("lancedb", "user_specific", user_id="42")
+    first.append("mutado")
+
+    assert resolver.resolve("lancedb", "user_specific", user_id="42") == ["user-42", "global"]
+    assert len(resolver._memo) == 1
+
+
+def test_setup_node_uses_rules_without_llm(monkeypatch):
+    monkeypatch.setattr(collections, "_RESOLVER", _resolver())
+
+    def no_llm(*args, **kwargs):
+        raise AssertionError("collection names must not need an LLM call")
+
+    monkeypatch.setattr(vector_db_setup, "llm", no_llm)
+
+    update = vector_db_setup.vector_db_setup_node(
+        RAGState(vector_db_type="lancedb", document_scope="user_specific", user_id="42", target_databases=["legislacao"])
+    )
+
+    assert update["collection_names"] == ["user-42", "global", "legislacao"]
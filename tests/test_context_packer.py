@@ -0,0 +1,134 @@
+import logging
+
+import pytest
+
+from sample_agent.agents.tce_swarm.rag import context_packer
+from sample_agent.agents.tce_swarm.rag.models.chunks import (
+    ChunkMetadata,
+    ChunkResult,
+    EnrichedChunk,
+    RankingFactors,
+    RerankedChunk,
+)
+from sample_agent.agents.tce_swarm.rag.processors.text_chunker import CHARS_PER_TOKEN
+
+
+class _OfflineTiktoken:
+    """tiktoken falso: falha como um download do BPE sem rede e conta as chamadas"""
+
+    calls = 0
+
+    @classmethod
+    def encoding_for_model(cls, name):
+        cls.calls += 1
+        raise ConnectionError("openaipublic.blob.core.windows.net unreachable")
+
+
+@pytest.fixture(autouse=True)
+def _fresh_counters():
+    context_packer.token_counter.cache_clear()
+    yield
+    context_packer.token_counter.cache_clear()
+
+
+def test_encoding_is_resolved_once_and_fallback_is_logged(monkeypatch, caplog):
+    _OfflineTiktoken.calls = 0
+    monkeypatch.setattr(context_packer, "tiktoken", _OfflineTiktoken)
+
+    with caplog.at_level(logging.INFO, logger=context_packer.__name__):
+        counts = [context_packer.count_tokens("x" * 40, "openai:gpt-4o-mini") for _ in range(50)]
+
+    assert counts == [40 // CHARS_PER_TOKEN + 1] * 50
+    assert _OfflineTiktoken.calls == 1
+    assert [record.levelno for record in caplog.records] == [logging.WARNING]
+    assert "ConnectionError" in caplog.text and "estimating" in caplog.text
+
+
+def test_missing_tiktoken_falls_back_to_estimate(monkeypatch, caplog):
+    monkeypatch.setattr(context_packer, "tiktoken", None)
+
+    with caplog.at_level(logging.INFO, logger=context_packer.__name__):
+        assert context_packer.count_tokens("abcdefgh", "groq:llama-3.1-8b-instant") == 8 // CHARS_PER_TOKEN + 1
+
+    assert "tiktoken not installed" in caplog.text
+
+
+def _reranked(chunk_id: str, content: str, score: float) -> RerankedChunk:
+    factors = RankingFactors(
+        semantic_similarity=None, keyword_match=None, document_authority=None, recency=None, context_relevance=None
+    )
+    metadata = ChunkMetadata(document_id=chunk_id, page_number=None, section=None, chunk_index=0, timestamp=None)
+    enriched = EnrichedChunk(
+        chunk=ChunkResult(content=content, metadata=metadata, chunk_id=chunk_id),
+        relevance_score=score,
+        enriched_context="",
+        cross_references=[],
+        ranking_factors=factors,
+    )
+    return RerankedChunk(chunk=enriched, final_score=score, ranking_factors=factors)
+
+
+ARTICLE = "Art. 71. O prazo para interposição de recurso em licitação é de três dias úteis."
+CANDIDATES = [
+    _reranked("original", ARTICLE, 0.9),
+    _reranked("consolidado", ARTICLE, 0.85),
+    _reranked("aposentadoria", "O registro de aposentadoria de servidor exige parecer do tribunal.", 0.8),
+]
+
+
+@pytest.fixture
+def estimated_tokens(monkeypatch):
+    monkeypatch.setattr(context_packer, "tiktoken", None)
+
+
+def _ids(packed):
+    return [chunk.chunk.chunk.chunk_id for chunk in packed.chunks]
+
+
+def test_near_duplicates_are_collapsed(estimated_tokens):
+    packed = context_packer.pack_context(CANDIDATES, "openai:gpt-4o-mini", token_budget=1000, vector_db_type="azure_ai_search")
+
+    assert _ids(packed) == ["original", "aposentadoria"]
+    assert packed.collapsed == 1
+    assert packed.context.startswith("[1] Art. 71.")
+
+
+def test_mmr_prefers_diverse_chunk_over_redundant_one(estimated_tokens):
+    candidates = [
+        _reranked("original", ARTICLE, 0.9),
+        _reranked("variante", ARTICLE.replace("três", "cinco"), 0.88),
+        _reranked("aposentadoria", "O registro de aposentadoria de servidor exige parecer do tribunal.", 0.8),
+    ]
+
+    relevance_only = context_packer.pack_context(
+        candidates, "openai:gpt-4o-mini", token_budget=1000, vector_db_type="azure_ai_search",
+        mmr_lambda=1.0, duplicate_similarity=1.01,
+    )
+    diverse = context_packer.pack_context(
+        candidates, "openai:gpt-4o-mini", token_budget=1000, vector_db_type="azure_ai_search",
+        mmr_lambda=0.5, duplicate_similarity=1.01,
+    )
+
+    assert _ids(relevance_only) == ["original", "variante", "aposentadoria"]
+    assert _ids(diverse) == ["original", "aposentadoria", "variante"]
+
+
+def test_token_budget_is_never_exceeded(estimated_tokens):
+    budget = context_packer.count_tokens(f"[1] {ARTICLE}", "openai:gpt-4o-mini") + 2
+
+    packed = context_packer.pack_context(CANDIDATES, "openai:gpt-4o-mini", token_budget=budget, vector_db_type="azure_ai_search")
+
+    assert _ids(packed) == ["original"]
+    assert packed.tokens <= budget
+    assert packed.over_budget == 1
+    assert context_packer.pack_context([], "openai:gpt-4o-mini").chunks == []
+
+
+def test_packed_context_numbering_round_trips(estimated_tokens):
+    packed = context_packer.pack_context(CANDIDATES, "openai:gpt-4o-mini", token_budget=1000, vector_db_type="azure_ai_search")
+
+    entries = context_packer.context_entries(packed.context)
+
+    assert entries == {1: ARTICLE, 2: CANDIDATES[2].chunk.chunk.content}
+    marker = context_packer.CITATION_MARKER_RE.search("Prazo de três dias [1, 2].")
+    assert context_packer.marker_indices(marker) == [1, 2]
@@ -0,0 +1,52 @@
+import dataclasses
+import time
+
+from sample_agent.agents.tce_swarm.rag import profiles
+from sample_agent.agents.tce_swarm.rag.graph import (
+    BUDGET_FALLBACKS,
+    _budgeted,
+    _changed_fields,
+    quality_check_decision,
+)
+from sample_agent.agents.tce_swarm.rag.models.state import RAGState
+from sample_agent.agents.tce_swarm.rag.nodes import semantic_cache
+
+
+def _slow_validation(state: RAGState) -> RAGState:
+    time.sleep(0.3)
+    return state.copy(quality_score=0.9, needs_rewrite=False)
+
+
+def test_validation_over_budget_clears_stale_quality_score(monkeypatch):
+    fast = dataclasses.replace(profiles.PROFILES["fast"], budgets={"quality_validation": 0.05})
+    monkeypatch.setitem(profiles.PROFILES, "fast", fast)
+    run = _budgeted("quality_validation", _slow_validation, BUDGET_FALLBACKS["quality_validation"])
+    # Score da rodada anterior (reprovada) ainda no estado
+    state = RAGState(execution_profile="fast", generated_response="Resposta [1].", quality_score=0.2, retry_count=0)
+
+    update = run(state)
+
+    assert update["quality_score"] is None
+    assert update["needs_rewrite"] is False
+    validated = state.copy(**update)
+    assert quality_check_decision(validated) == "prepare"
+
+    def fail():
+        raise AssertionError("unvalidated answer must not reach the semantic cache")
+
+    monkeypatch.setattr(semantic_cache, "get_semantic_cache", fail)
+    semantic_cache.remember_answer(validated)
+
+
+def test_changed_fields_can_clear_a_field():
+    state = RAGState(quality_score=0.8, citation_match=True, original_query="q")
+
+    update = _changed_fields(state, state.copy(quality_score=None, citation_match=None))
+
+    assert update == {"quality_score": None, "citation_match": None}
+
+
+def test_changed_fields_skips_equal_values():
+    state = RAGState(original_query="q", file_paths=["a.pdf"])
+
+    assert _changed_fields(state, state.copy(file_paths=["a.pdf"], original_query="q")) == {}
@@ -0,0 +1,85 @@
+from typing import Optional, TypedDict
+
+from pydantic import BaseModel
+
+from sample_agent.utils import _messages_since_entry, _propagated_state, register_agent_schema, schema_keys
+
+
+class DestinationState(BaseModel):
+    messages: list = []
+    original_query: Optional[str] = None
+    collection_names: Optional[list] = None
+
+
+class ChatState(TypedDict):
+    messages: list
+    active_agent: str
+    summary: str
+
+
+class _Message:
+    def __init__(self, message_id: str):
+        self.id = message_id
+
+
+STATE = {
+    "messages": [],
+    "active_agent": "origem",
+    "original_query": "Qual o prazo?",
+    "collection_names": ["global"],
+    "generated_response": "Noventa dias [1].",
+}
+
+
+def test_schema_keys_drop_control_channels():
+    assert schema_keys(DestinationState) == {"original_query", "collection_names"}
+    assert schema_keys(ChatState) == {"summary"}
+
+
+def test_only_keys_changed_since_entry_are_propagated():
+    entry = {**STATE, "original_query": "Pergunta anterior"}
+
+    update = _propagated_state(STATE, "destino", entry, None, DestinationState)
+
+    assert update == {"original_query": "Qual o prazo?"}
+
+
+def test_without_entry_every_destination_key_is_propagated():
+    update = _propagated_state(STATE, "destino", None, None, DestinationState)
+
+    assert update == {"original_query": "Qual o prazo?", "collection_names": ["global"]}
+
+
+def test_registered_schema_is_used_for_known_destination():
+    register_agent_schema("destino_registrado", DestinationState)
+
+    update = _propagated_state(STATE, "destino_registrado", None, None, None)
+
+    assert set(update) == {"original_query", "collection_names"}
+
+
+def test_propagate_keys_take_precedence():
+    update = _propagated_state(STATE, "destino", None, ["generated_response", "ausente"], DestinationState)
+
+    assert update == {"generated_response": "Noventa dias [1]."}
+
+
+def test_unknown_destination_gets_all_non_control_keys():
+    update = _propagated_state(STATE, "destino_desconhecido", None, None, None)
+
+    assert update == {
+        "original_query": "Qual o prazo?",
+        "collection_names": ["global"],
+        "generated_response": "Noventa dias [1].",
+    }
+
+
+def test_messages_since_entry():
+    before = [_Message("1"), _Message("2")]
+    after = before + [_Message("3")]
+
+    assert _messages_since_entry(after, {"messages": before}) == after[2:]
+    assert _messages_since_entry(after, None) == after
+    # Histórico reescrito (ex.: resumo): envia a lista completa
+    rewritten = [_Message("resumo"), _Message("3"), _Message("4")]
+    assert _messages_since_entry(rewritten, {"messages": before}) == rewritten
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from sample_agent.agents.tce_swarm.rag.index import hybrid
+from sample_agent.agents.tce_swarm.rag.index.bm25 import BM25Index
+from sample_agent.agents.tce_swarm.rag.index.citations import CitationIndex
+from sample_agent.agents.tce_swarm.rag.index.text import tokenize
+from sample_agent.agents.tce_swarm.rag.index.vector_store import LocalVectorStore
+from sample_agent.agents.tce_swarm.rag.models.chunks import ChunkMetadata, ChunkResult
+
+
+def _chunk(chunk_id: str, content: str) -> ChunkResult:
+    metadata = ChunkMetadata(document_id=chunk_id, page_number=None, section=None, chunk_index=0, timestamp=None)
+    return ChunkResult(content=content, metadata=metadata, chunk_id=chunk_id)
+
+
+CHUNKS = [
+    _chunk("res-18832", "Resolução nº 18.832 dispõe sobre o prazo de prestação de contas"),
+    _chunk("res-19000", "Resolução nº 19.000 altera o regimento interno do tribunal"),
+    _chunk("aposentadoria", "Registro de aposentadoria de servidor municipal"),
+]
+
+
+def test_tokenize_normalizes_accents_and_compound_numbers():
+    # "nº" normaliza para a stopword "no"
+    assert tokenize("Resolução nº 18.832 de 2016", drop_stopwords=True) == ["resolucao", "18", "832", "2016", "18832"]
+
+
+def test_bm25_ranks_exact_term_match_first():
+    index = BM25Index()
+    index.add("global", CHUNKS)
+
+    hits = index.search("resolucao 18832", k=2)
+
+    assert [chunk_id for chunk_id, _ in hits] == ["res-18832", "res-19000"]
+    assert hits[0][1] > hits[1][1] > 0
+    assert index.search("termo inexistente") == []
+
+
+def test_bm25_restricts_collections_and_reindexes_by_chunk_id():
+    index = BM25Index()
+    index.add("global", CHUNKS[:2])
+    index.add("user_42", CHUNKS[2:])
+
+    assert [chunk_id for chunk_id, _ in index.search("resolucao", collections=["user_42"])] == []
+    assert [chunk_id for chunk_id, _ in index.search("aposentadoria", collections=["user_42"])] == ["aposentadoria"]
+
+    index.add("global", [_chunk("res-18832", "Texto revisado sobre licitações")])
+    assert len(index) == 3
+    assert [chunk_id for chunk_id, _ in index.search("18832")] == []
+    assert index.score_chunks("licitacoes", ["res-18832", "desconhecido"])[1] == 0
+
+    index.delete(["res-18832"])
+    assert len(index) == 2
+    assert index.search("licitacoes") == []
+
+
+def test_reciprocal_rank_fusion_sums_reciprocal_ranks():
+    fused = dict(hybrid.reciprocal_rank_fusion([["a", "b"], ["b", "c"]], k=60))
+
+    assert fused["b"] == pytest.approx(1 / 62 + 1 / 61)
+    assert fused["a"] == pytest.approx(1 / 61)
+    assert list(fused) == ["b", "a", "c"]
+    weighted = hybrid.reciprocal_rank_fusion([["a"], ["c"]], k=60, weights=[1.0, 2.0])
+    assert [item for item, _ in weighted] == ["c", "a"]
+
+
+@pytest.fixture
+def local_indexes(monkeypatch):
+    store = LocalVectorStore()
+    monkeypatch.setattr(hybrid, "get_vector_store", lambda vector_db_type=None: store)
+    monkeypatch.setitem(hybrid._SPARSE_INDEXES, "lancedb", BM25Index())
+    monkeypatch.setitem(hybrid._CITATION_INDEXES, "lancedb", CitationIndex())
+    hybrid.index_chunks("lancedb", "global", CHUNKS)
+    return store
+
+
+def test_hybrid_search_fuses_dense_and_sparse_rankings(local_indexes):
+    hits = hybrid.hybrid_search("resolução 18.832", "lancedb", k=2)
+    async_hits = asyncio.run(hybrid.ahybrid_search("resolução 18.832", "lancedb", k=2))
+
+    assert hits[0][0].chunk_id == "res-18832"
+    assert [chunk.chunk_id for chunk, _ in hits] == [chunk.chunk_id for chunk, _ in async_hits]
+    # Presente nos dois rankings: soma das duas contribuições do RRF
+    assert hits[0][1] == pytest.approx(2 / (hybrid.RRF_K + 1))
+
+
+def test_deleted_chunks_leave_every_index(local_indexes):
+    hybrid.delete_chunks("lancedb", ["res-18832"])
+
+    assert "res-18832" not in [chunk.chunk_id for chunk, _ in hybrid.hybrid_search("18832", "lancedb")]
+    assert local_indexes.get("res-18832") is None
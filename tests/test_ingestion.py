@@ -0,0 +1,29 @@
+from sample_agent.agents.tce_swarm.rag.ingestion import IngestionEngine, IngestionJob
+from sample_agent.agents.tce_swarm.rag.models.state import RAGState
+from sample_agent.agents.tce_swarm.rag.nodes.document_ingestion import document_ingestion_node
+
+
+def test_remote_backend_skips_local_ingestion():
+    jobs = [IngestionJob("relatorio-1", "/dados/relatorio.pdf", "relatorio")]
+
+    results = IngestionEngine().ingest(jobs, vector_db_type="azure_ai_search")
+
+    assert results["relatorio-1"].status == "skipped"
+    assert results["relatorio-1"].chunks_created == 0
+    assert "azure_ai_search" in results["relatorio-1"].error_message
+
+
+def test_ingestion_node_reports_remote_skip_in_status():
+    state = RAGState(
+        vector_db_type="azure_ai_search",
+        ingestion_required=True,
+        documents_to_ingest=[{"id": "relatorio-1", "file_path": "/dados/relatorio.pdf", "document_type": "relatorio"}],
+        ingestion_status={},
+        user_documents=[],
+    )
+
+    result = document_ingestion_node(state)
+
+    assert result.ingestion_status == {"relatorio-1": "skipped"}
+    assert result.user_documents == ["relatorio-1"]
+    assert result.ingestion_required is False
@@ -0,0 +1,108 @@
+import json
+import os
+import threading
+
+from sample_agent.agents.tce_swarm.rag.index.manifest import (
+    IngestionManifest,
+    ManifestEntry,
+    chunking_fingerprint,
+    ingestion_collection,
+)
+
+CONFIG = {"chunk_size": 512, "chunk_overlap": 64}
+
+
+def _record(manifest, digest, source, collection="global", chunker="recursive", chunk_ids=None):
+    fingerprint = chunking_fingerprint(digest, chunker, CONFIG, collection)
+    entry = ManifestEntry(
+        document_id=f"{source}-{digest[:6]}",
+        content_hash=digest,
+        source=source,
+        collection=collection,
+        chunker=chunker,
+        chunk_config=CONFIG,
+        chunk_ids=chunk_ids or [f"{collection}/{digest}-{i}" for i in range(2)],
+    )
+    return fingerprint, manifest.record(fingerprint, entry)
+
+
+def test_same_content_is_recorded_once_per_collection():
+    manifest = IngestionManifest()
+    fingerprint, stale = _record(manifest, "aaa", "relatorio.pdf")
+    again, stale_again = _record(manifest, "aaa", "relatorio.pdf")
+
+    assert fingerprint == again
+    assert stale == [] and stale_again == []
+    assert len(manifest) == 1
+    assert manifest.has_content("aaa")
+    assert manifest.has_content("aaa", "global")
+
+
+def test_other_collection_keeps_its_own_entry():
+    manifest = IngestionManifest()
+    _record(manifest, "aaa", "relatorio.pdf", collection="global")
+    _, stale = _record(manifest, "aaa", "relatorio.pdf", collection="user_42")
+
+    assert stale == []
+    assert len(manifest) == 2
+    assert manifest.has_content("aaa", "user_42")
+    assert not manifest.has_content("aaa", "user_7")
+    assert [entry.collection for entry in manifest.entries_for_content("aaa", "global")] == ["global"]
+
+
+def test_edited_file_replaces_previous_version_in_its_collection():
+    manifest = IngestionManifest()
+    _record(manifest, "v1", "relatorio.pdf", collection="global")
+    _record(manifest, "v1", "relatorio.pdf", collection="user_42")
+    _, stale = _record(manifest, "v2", "relatorio.pdf", collection="global")
+
+    assert stale == ["global/v1-0", "global/v1-1"]
+    assert not manifest.has_content("v1", "global")
+    assert manifest.has_content("v1", "user_42")
+    assert manifest.has_content("v2", "global")
+
+
+def test_renamed_file_with_same_content_replaces_old_entry():
+    manifest = IngestionManifest()
+    _record(manifest, "aaa", "antigo.pdf", chunk_ids=["c0", "c1"])
+    _, stale = _record(manifest, "aaa", "novo.pdf", chunk_ids=["c0", "c1"])
+
+    # Mesmos chunk IDs continuam válidos: nada a remover dos índices
+    assert stale == []
+    assert [entry.source for entry in manifest.entries_for_content("aaa")] == ["novo.pdf"]
+
+
+def test_persisted_manifest_round_trip(tmp_path):
+    path = str(tmp_path / "lancedb.manifest.json")
+    manifest = IngestionManifest(path)
+    fingerprint, _ = _record(manifest, "aaa", "relatorio.pdf", collection="user_42")
+    manifest.persist()
+
+    loaded = IngestionManifest(path)
+    assert loaded.version == manifest.version
+    assert loaded.get(fingerprint) == manifest.get(fingerprint)
+    assert loaded.has_content("aaa", "user_42")
+
+
+def test_ingestion_collection_defaults_to_global():
+    assert ingestion_collection(None) == "global"
+    assert ingestion_collection([]) == "global"
+    assert ingestion_collection(["user_42", "global"]) == "user_42"
+
+
+def test_concurrent_persists_never_leave_a_partial_file(tmp_path):
+    path = str(tmp_path / "lancedb.manifest.json")
+    manifests = [IngestionManifest(path) for _ in range(4)]
+    for i, manifest in enumerate(manifests):
+        for n in range(50):
+            _record(manifest, f"{i}-{n}", f"doc-{i}-{n}.pdf")
+
+    threads = [threading.Thread(target=manifest.persist) for manifest in manifests for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with open(path, encoding="utf-8") as f:
+        assert len(json.load(f)["entries"]) == 50
+    assert os.listdir(tmp_path) == ["lancedb.manifest.json"]
@@ -0,0 +1,61 @@
+import asyncio
+from typing import Any, List, Optional
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from sample_agent.agents.tce_swarm.rag import utils
+
+
+class ConcurrencyTrackingChat(BaseChatModel):
+    """Chat falso: ecoa a instrução e registra o pico de chamadas simultâneas"""
+
+    active: int = 0
+    peak: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-concurrency"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, **kwargs: Any) -> ChatResult:
+        raise NotImplementedError
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, **kwargs: Any) -> ChatResult:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.02)
+        self.active -= 1
+        instruction = next(line.strip() for line in messages[-1].content.splitlines() if line.startswith("pedido"))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=f"resposta {instruction}"))])
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    model = ConcurrencyTrackingChat()
+    monkeypatch.setattr(utils, "get_chat_model", lambda *args, **kwargs: model)
+    return model
+
+
+def test_llm_batch_keeps_order_and_bounds_concurrency(fake_model):
+    instructions = [f"pedido {i}" for i in range(10)]
+
+    responses = asyncio.run(utils.llm_batch(instructions, max_concurrency=3))
+
+    assert responses == [f"resposta pedido {i}" for i in range(10)]
+    assert fake_model.peak == 3
+
+
+def test_llm_batch_defaults_to_configured_concurrency(fake_model, monkeypatch):
+    monkeypatch.setattr(utils, "LLM_BATCH_MAX_CONCURRENCY", 2)
+
+    asyncio.run(utils.llm_batch([f"pedido {i}" for i in range(6)]))
+
+    assert fake_model.peak == 2
+
+
+def test_llm_batch_validates_contexts(fake_model):
+    assert asyncio.run(utils.llm_batch([])) == []
+    with pytest.raises(ValueError):
+        asyncio.run(utils.llm_batch(["pedido 1", "pedido 2"], contexts=[{}]))
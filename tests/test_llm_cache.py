@@ -0,0 +1,103 @@
+import types
+
+import pytest
+from langchain_core.outputs import Generation
+
+from sample_agent.agents.tce_swarm.rag import cache
+from sample_agent.agents.tce_swarm.rag.cache import TieredLLMCache
+
+LLM = "openai:gpt-4o-mini"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Relógio controlado pelo teste no lugar de time.time()"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache, "time", types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def _cache(tmp_path, **kwargs) -> TieredLLMCache:
+    return TieredLLMCache(str(tmp_path / "llm_cache.db"), eviction_interval=0, **kwargs)
+
+
+def _texts(value):
+    return [generation.text for generation in value] if value is not None else None
+
+
+def test_memory_then_disk_hit_across_instances(tmp_path):
+    first = _cache(tmp_path)
+    first.update("prompt", LLM, [Generation(text="resposta")])
+
+    assert _texts(first.lookup("prompt", LLM)) == ["resposta"]
+    assert first.lookup("prompt", "outro-modelo") is None
+
+    second = _cache(tmp_path)
+    assert _texts(second.lookup("prompt", LLM)) == ["resposta"]
+    assert _texts(second.lookup("prompt", LLM)) == ["resposta"]
+    assert {key: second.stats()[key] for key in ("disk_hits", "memory_hits", "misses")} == {
+        "disk_hits": 1, "memory_hits": 1, "misses": 0,
+    }
+
+
+def test_expired_entries_miss_in_both_tiers(tmp_path, clock):
+    llm_cache = _cache(tmp_path, ttl=60)
+    llm_cache.update("prompt", LLM, [Generation(text="resposta")])
+    llm_cache.put("permanente", LLM, [Generation(text="fixa")], ttl=None)
+
+    clock[0] += 61
+
+    assert llm_cache.lookup("prompt", LLM) is None
+    assert _cache(tmp_path).lookup("prompt", LLM) is None
+    assert _texts(llm_cache.lookup("permanente", LLM)) == ["fixa"]
+    assert llm_cache.evict() == 1
+
+
+def test_ttl_policy_per_entry(tmp_path, clock):
+    llm_cache = _cache(tmp_path, ttl=lambda prompt, llm_string: None if prompt.startswith("estavel") else 10)
+    llm_cache.update("estavel", LLM, [Generation(text="a")])
+    llm_cache.update("volatil", LLM, [Generation(text="b")])
+
+    clock[0] += 11
+
+    assert _texts(llm_cache.lookup("estavel", LLM)) == ["a"]
+    assert llm_cache.lookup("volatil", LLM) is None
+
+
+def test_memory_tier_is_lru_bounded(tmp_path):
+    llm_cache = _cache(tmp_path, memory_entries=2)
+    for prompt in ("a", "b"):
+        llm_cache.update(prompt, LLM, [Generation(text=prompt)])
+    llm_cache.lookup("a", LLM)
+    llm_cache.update("c", LLM, [Generation(text="c")])
+
+    assert llm_cache.stats()["memory_entries"] == 2
+    # "b" saiu da memória mas continua no SQLite
+    assert _texts(llm_cache.lookup("b", LLM)) == ["b"]
+    assert llm_cache.stats()["disk_hits"] == 1
+
+
+def test_evict_trims_least_recently_used_rows(tmp_path, clock):
+    llm_cache = _cache(tmp_path, max_db_entries=2)
+    for prompt in ("a", "b", "c"):
+        clock[0] += 1
+        llm_cache.update(prompt, LLM, [Generation(text=prompt)])
+    clock[0] += 1
+    # Leitura recente de "a" é gravada em lote na evicção
+    llm_cache.lookup("a", LLM)
+
+    assert llm_cache.evict() == 1
+
+    fresh = _cache(tmp_path)
+    assert _texts(fresh.lookup("a", LLM)) == ["a"]
+    assert fresh.lookup("b", LLM) is None
+    assert _texts(fresh.lookup("c", LLM)) == ["c"]
+
+
+def test_returned_generations_are_copies(tmp_path):
+    llm_cache = _cache(tmp_path)
+    llm_cache.update("prompt", LLM, [Generation(text="resposta")])
+
+    llm_cache.lookup("prompt", LLM)[0].generation_info = {"anotado": True}
+
+    assert llm_cache.lookup("prompt", LLM)[0].generation_info is None
@@ -0,0 +1,81 @@
+from sample_agent.agents.tce_swarm.rag.models.state import RAGState
+from sample_agent.agents.tce_swarm.rag.nodes.quality_validation import (
+    LOCAL_VALIDATION_ACCEPT,
+    LOCAL_VALIDATION_REJECT,
+    _sentences,
+    local_validation,
+    local_verdict,
+)
+
+CONTEXT = (
+    "[1] O prazo para a prestação de contas anual dos municípios é de noventa dias "
+    "após o encerramento do exercício financeiro.\n\n"
+    "[2] O gestor que atrasar a remessa dos balancetes mensais fica sujeito a multa "
+    "aplicada pelo tribunal de contas."
+)
+
+
+def _state(answer: str, context: str = CONTEXT) -> RAGState:
+    return RAGState(original_query="Qual o prazo?", generated_response=answer, final_context=context)
+
+
+def test_grounded_answer_is_accepted_locally():
+    answer = (
+        "A prestação de contas anual dos municípios vence noventa dias após o encerramento do exercício [1]. "
+        "O atraso na remessa dos balancetes mensais sujeita o gestor a multa do tribunal de contas [2]."
+    )
+    local = local_validation(_state(answer))
+
+    assert local.markers == 2
+    assert local.coverage == 1.0
+    assert local.marker_validity == 1.0
+    assert local.score >= LOCAL_VALIDATION_ACCEPT
+    verdict = local_verdict(local)
+    assert verdict is not None and not verdict.needs_rewrite
+
+
+def test_markers_outside_the_context_are_invalid():
+    answer = (
+        "A prestação de contas anual dos municípios vence noventa dias após o encerramento do exercício [7]. "
+        "O atraso na remessa dos balancetes mensais sujeita o gestor a multa do tribunal de contas [9]."
+    )
+    local = local_validation(_state(answer))
+
+    assert local.invalid_markers == [7, 9]
+    assert local.marker_validity == 0.0
+    assert local.score <= LOCAL_VALIDATION_REJECT
+    assert local_verdict(local).needs_rewrite
+
+
+def test_uncited_claims_are_reported():
+    answer = (
+        "A prestação de contas anual dos municípios vence noventa dias após o encerramento do exercício [1]. "
+        "O atraso na remessa dos balancetes mensais sujeita o gestor a multa do tribunal de contas."
+    )
+    local = local_validation(_state(answer))
+
+    assert local.coverage == 0.5
+    assert local.uncited_claims == [
+        "O atraso na remessa dos balancetes mensais sujeita o gestor a multa do tribunal de contas."
+    ]
+
+
+def test_answer_without_markers_is_left_to_the_llm():
+    local = local_validation(_state("Segundo o regimento [fonte], o prazo é de noventa dias após o exercício."))
+
+    assert local.markers == 0
+    assert local_verdict(local) is None
+
+
+def test_without_numbered_context_there_is_nothing_to_check():
+    assert local_validation(_state("O prazo é de noventa dias [1].", context="")) is None
+    assert local_verdict(None) is None
+
+
+def test_legal_abbreviations_do_not_split_sentences():
+    text = "Conforme o Art. 5º, Inc. II, da Lei n. 8.666 e o § 1º. do regimento [1]. Outra frase [2]."
+
+    assert _sentences(text) == [
+        "Conforme o Art. 5º, Inc. II, da Lei n. 8.666 e o § 1º. do regimento [1].",
+        "Outra frase [2].",
+    ]
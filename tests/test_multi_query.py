@@ -0,0 +1,107 @@
+import dataclasses
+import types
+
+import pytest
+
+from sample_agent.agents.tce_swarm.rag import graph, profiles
+from sample_agent.agents.tce_swarm.rag.chunk_arena import load_retrieved
+from sample_agent.agents.tce_swarm.rag.index import hybrid
+from sample_agent.agents.tce_swarm.rag.index.bm25 import BM25Index
+from sample_agent.agents.tce_swarm.rag.index.citations import CitationIndex
+from sample_agent.agents.tce_swarm.rag.index.vector_store import LocalVectorStore
+from sample_agent.agents.tce_swarm.rag.models.chunks import ChunkMetadata, ChunkResult
+from sample_agent.agents.tce_swarm.rag.models.responses import QueryRewriteResult
+from sample_agent.agents.tce_swarm.rag.models.state import RAGState
+from sample_agent.agents.tce_swarm.rag.nodes import document_retrieval
+
+
+def _chunk(chunk_id: str, content: str) -> ChunkResult:
+    metadata = ChunkMetadata(document_id=chunk_id, page_number=None, section=None, chunk_index=0, timestamp=None)
+    return ChunkResult(content=content, metadata=metadata, chunk_id=chunk_id)
+
+
+CHUNKS = [
+    _chunk("prazo", "Prazo de recurso em licitação é de três dias úteis"),
+    _chunk("impugnacao", "Impugnação ao edital deve ser apresentada até três dias antes da abertura"),
+    _chunk("aposentadoria", "Registro de aposentadoria de servidor municipal"),
+]
+
+
+@pytest.fixture
+def multi_query(monkeypatch):
+    """Perfil thorough com 2 variantes e índices locais em memória"""
+    thorough = dataclasses.replace(profiles.PROFILES["thorough"], query_variants=2)
+    monkeypatch.setitem(profiles.PROFILES, "thorough", thorough)
+
+    store = LocalVectorStore()
+    monkeypatch.setattr(hybrid, "get_vector_store", lambda vector_db_type=None: store)
+    monkeypatch.setitem(hybrid._SPARSE_INDEXES, "lancedb", BM25Index())
+    monkeypatch.setitem(hybrid._CITATION_INDEXES, "lancedb", CitationIndex())
+    hybrid.index_chunks("lancedb", "global", CHUNKS)
+    monkeypatch.setattr(document_retrieval, "get_manifest", lambda backend: types.SimpleNamespace(version=1))
+
+
+def _state(**kwargs) -> RAGState:
+    defaults = dict(
+        original_query="recurso em licitação",
+        execution_profile="thorough",
+        vector_db_type="lancedb",
+        collection_names=["global"],
+    )
+    return RAGState(**{**defaults, **kwargs})
+
+
+def test_variants_are_capped_by_profile_and_deduplicated(multi_query):
+    state = _state(processed_query="prazo de recurso", query_variants=[" prazo de recurso ", "impugnação", "extra"])
+
+    assert document_retrieval._retrieval_queries(state) == ["prazo de recurso", "impugnação"]
+
+
+def test_multi_query_is_off_by_default():
+    state = RAGState(original_query="recurso", execution_profile="thorough", query_variants=["impugnação"])
+
+    assert profiles.DEFAULT_QUERY_VARIANTS == 0
+    assert document_retrieval._retrieval_queries(state) == ["recurso"]
+
+
+def test_variant_results_are_fused_without_duplicates(multi_query):
+    state = _state(processed_query="prazo de recurso em licitação", query_variants=["impugnação ao edital"])
+
+    update = document_retrieval.document_retrieval_node(state)
+    retrieved = [chunk.chunk_id for chunk in load_retrieved(state.copy(**update))]
+
+    assert {"prazo", "impugnacao"} <= set(retrieved)
+    assert len(retrieved) == len(set(retrieved))
+    # Busca densa + BM25 por query
+    assert update["vector_db_queries"] == 4
+
+
+def test_reusable_speculation_replaces_the_main_search(multi_query):
+    state = _state(
+        processed_query="recurso em licitação",
+        query_variants=["impugnação ao edital"],
+        speculative_chunks=["aposentadoria"],
+        speculative_query="recurso em licitação",
+        speculative_corpus_version=1,
+    )
+
+    args = document_retrieval._search_args(state)
+
+    assert args["queries"] == ["impugnação ao edital"]
+    assert args["rankings"] == [["aposentadoria"]]
+    assert document_retrieval._search_args(state.copy(speculative_corpus_version=0))["rankings"] == []
+
+
+def test_variants_replace_the_rewrite_loop(multi_query):
+    assert graph.needs_rewrite_decision(_state(needs_rewrite=True, query_complexity="complex")) == "continue"
+    assert graph.needs_rewrite_decision(_state(needs_rewrite=True, execution_profile="balanced")) == "rewrite"
+
+
+def test_rewrite_keeps_at_most_the_profile_variants(multi_query):
+    rewrite = QueryRewriteResult(processed_query="prazo recursal", query_variants=["a", "b", "c"])
+
+    rewritten = graph._apply_query_rewrite(_state(retry_count=0), rewrite)
+
+    assert rewritten.processed_query == "prazo recursal"
+    assert rewritten.query_variants == ["a", "b"]
+    assert rewritten.retry_count == 1
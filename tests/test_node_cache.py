@@ -0,0 +1,19 @@
+from sample_agent.agents.tce_swarm.rag.graph import CACHE_POLICIES, build_rag_agent
+from sample_agent.agents.tce_swarm.rag.models.state import RAGState
+from sample_agent.agents.tce_swarm.rag.nodes import chunk_strategy_cache_key, vector_db_setup_cache_key
+
+
+def test_only_deterministic_nodes_are_cached():
+    assert set(CACHE_POLICIES) == {"vector_db_setup", "chunk_strategy_selection"}
+
+    nodes = build_rag_agent().builder.nodes
+    assert nodes["query_analysis"].cache_policy is None
+    assert nodes["vector_db_setup"].cache_policy is CACHE_POLICIES["vector_db_setup"]
+
+
+def test_cache_keys_follow_the_fields_each_node_reads():
+    base = RAGState(vector_db_type="lancedb", document_scope="global", query_type="legislation")
+
+    assert vector_db_setup_cache_key(base) == vector_db_setup_cache_key(base.copy(original_query="outra"))
+    assert vector_db_setup_cache_key(base) != vector_db_setup_cache_key(base.copy(user_id="u1"))
+    assert chunk_strategy_cache_key(base) != chunk_strategy_cache_key(base.copy(query_type="acordao"))
@@ -0,0 +1,57 @@
+import numpy as np
+
+from sample_agent.agents.tce_swarm.rag.index.citations import issue_date
+from sample_agent.agents.tce_swarm.rag.models.chunks import ChunkMetadata, ChunkResult, EnrichedChunk, RankingFactors
+from sample_agent.agents.tce_swarm.rag.processors.chonkie_processor import TCE_ChonkieProcessor
+from sample_agent.agents.tce_swarm.rag.reranker import FACTORS, LocalReranker
+
+
+def _candidate(chunk_id: str, content: str, issued=None) -> EnrichedChunk:
+    metadata = ChunkMetadata(document_id=chunk_id, page_number=None, section=None, chunk_index=0, timestamp=issued)
+    return EnrichedChunk(
+        chunk=ChunkResult(content=content, metadata=metadata, chunk_id=chunk_id),
+        relevance_score=0.8,
+        enriched_context="",
+        cross_references=[],
+        ranking_factors=RankingFactors(**{name: None for name in FACTORS}),
+    )
+
+
+def test_issue_date_from_document_header():
+    assert issue_date("# RESOLUÇÃO Nº 18.832, DE 15 DE MARÇO DE 2016\n\nDispõe sobre...") == "2016-03-15"
+    assert issue_date("ACÓRDÃO Nº 1.234 - Sessão de 1º de abril de 2020") == "2020-04-01"
+    assert issue_date("Portaria 12 publicada em 07/11/2019") == "2019-11-07"
+    assert issue_date("Texto sem data") is None
+    # Datas fora do cabeçalho são de atos citados no corpo
+    assert issue_date("Dispõe sobre prazos." + " texto" * 400 + " Lei de 3 de maio de 1990") is None
+
+
+def test_chunks_carry_issue_date_not_ingestion_time():
+    chunks = list(TCE_ChonkieProcessor().iter_chunks("Art. 1º Texto do artigo.", "recursive", issued="2016-03-15"))
+    undated = list(TCE_ChonkieProcessor().iter_chunks("Art. 1º Texto do artigo.", "recursive"))
+
+    assert {chunk.metadata.timestamp for chunk in chunks} == {"2016-03-15"}
+    assert {chunk.metadata.timestamp for chunk in undated} == {None}
+
+
+def test_recency_follows_issue_date():
+    reranker = LocalReranker({"recency_half_life_days": 365, "neutral_recency": 0.5})
+    candidates = [
+        _candidate("antigo", "texto", "2000-01-01"),
+        _candidate("recente", "texto", "2024-01-01"),
+        _candidate("sem-data", "texto"),
+    ]
+
+    recency = reranker._recency(candidates)
+
+    assert recency[0] < recency[1]
+    assert recency[2] == 0.5
+
+
+def test_remote_backend_drops_keyword_weight():
+    reranker = LocalReranker()
+    weights = reranker.weights_for("azure_ai_search")
+
+    assert weights[FACTORS.index("keyword_match")] == 0.0
+    assert np.isclose(weights.sum(), 1.0)
+    assert np.isclose(reranker.weights_for("lancedb").sum(), 1.0)
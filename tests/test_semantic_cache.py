@@ -0,0 +1,113 @@
+import types
+
+import pytest
+
+from sample_agent.agents.tce_swarm.rag import cache
+from sample_agent.agents.tce_swarm.rag.cache import SemanticAnswerCache
+from sample_agent.agents.tce_swarm.rag.index.embeddings import HashingEmbedder
+from sample_agent.agents.tce_swarm.rag.models.chunks import Citation
+from sample_agent.agents.tce_swarm.rag.models.state import RAGState
+from sample_agent.agents.tce_swarm.rag.nodes import semantic_cache
+
+QUERY = "Qual o prazo de recurso em licitação?"
+PARAPHRASE = "qual o prazo de recurso em licitacao"
+CITATION = Citation(
+    source="lei-14133.pdf",
+    document_type="legislation",
+    document_number="14133",
+    page_number=None,
+    article_number="165",
+    excerpt="prazo de 3 (três) dias úteis",
+    confidence=0.9,
+)
+ANSWER = {"generated_response": "Três dias úteis [1].", "citations": [CITATION], "quality_score": 0.9}
+
+
+def _answers(**kwargs) -> SemanticAnswerCache:
+    return SemanticAnswerCache(HashingEmbedder(), threshold=0.85, **kwargs)
+
+
+def test_near_duplicate_hits_only_in_same_scope():
+    answers = _answers()
+    answers.store(("lancedb", "global"), QUERY, 1, ANSWER)
+
+    hit = answers.lookup(("lancedb", "global"), PARAPHRASE, 1)
+
+    assert hit["generated_response"] == ANSWER["generated_response"]
+    assert hit["cached_query"] == QUERY
+    assert answers.lookup(("lancedb", "user_specific", "u1"), PARAPHRASE, 1) is None
+    assert answers.lookup(("lancedb", "global"), "Como registrar aposentadoria de servidor?", 1) is None
+
+
+def test_new_corpus_version_discards_the_scope():
+    answers = _answers()
+    answers.store("global", QUERY, 1, ANSWER)
+
+    assert answers.lookup("global", QUERY, 2) is None
+    assert answers.lookup("global", QUERY, 1) is None
+    assert answers.stats()["invalidations"] == 2
+
+
+def test_expired_and_evicted_answers_miss(monkeypatch):
+    now = [1_000.0]
+    monkeypatch.setattr(cache, "time", types.SimpleNamespace(time=lambda: now[0]))
+    answers = _answers(ttl=60, max_entries=1)
+    answers.store("global", QUERY, 1, ANSWER)
+    now[0] += 61
+    assert answers.lookup("global", QUERY, 1) is None
+
+    answers.store("global", "Como registrar aposentadoria de servidor?", 1, ANSWER)
+    assert answers.lookup("global", QUERY, 1) is None
+    assert answers.lookup("global", "Como registrar aposentadoria de servidor?", 1) is not None
+
+
+def test_unavailable_embedder_disables_the_cache():
+    class Failing:
+        def embed_query(self, query):
+            raise ConnectionError("embeddings offline")
+
+    for embedder in (None, Failing()):
+        answers = SemanticAnswerCache(embedder)
+        answers.store("global", QUERY, 1, ANSWER)
+        assert answers.lookup("global", QUERY, 1) is None
+
+
+@pytest.fixture
+def node_cache(monkeypatch):
+    answers = _answers()
+    monkeypatch.setattr(semantic_cache, "get_semantic_cache", lambda: answers)
+    monkeypatch.setattr(semantic_cache, "corpus_version", lambda state: 1)
+    return answers
+
+
+def _state(query=QUERY, **kwargs) -> RAGState:
+    return RAGState(original_query=query, vector_db_type="lancedb", **kwargs)
+
+
+def test_user_scoped_answers_never_leak_between_users(node_cache):
+    semantic_cache.remember_answer(_state(document_scope="user_specific", user_id="u1", **ANSWER))
+
+    same_user = semantic_cache.semantic_cache_node(_state(PARAPHRASE, document_scope="user_specific", user_id="u1"))
+    other_user = semantic_cache.semantic_cache_node(_state(PARAPHRASE, document_scope="user_specific", user_id="u2"))
+    global_scope = semantic_cache.semantic_cache_node(_state(PARAPHRASE, user_id="u1"))
+
+    assert same_user.semantic_cache_hit is True
+    assert same_user.generated_response == ANSWER["generated_response"]
+    assert same_user.citations == [CITATION]
+    assert other_user.semantic_cache_hit is False
+    assert global_scope.semantic_cache_hit is False
+
+
+def test_global_answers_are_shared_but_keyed_by_collections(node_cache):
+    semantic_cache.remember_answer(_state(user_id="u1", collection_names=["global"], **ANSWER))
+
+    assert semantic_cache.semantic_cache_node(_state(PARAPHRASE, user_id="u2", collection_names=["global"])).semantic_cache_hit
+    assert not semantic_cache.semantic_cache_node(_state(PARAPHRASE, collection_names=["user_42"])).semantic_cache_hit
+
+
+def test_only_validated_generated_answers_are_remembered(node_cache):
+    semantic_cache.remember_answer(_state(**{**ANSWER, "quality_score": 0.5}))
+    semantic_cache.remember_answer(_state(citation_match=True, **ANSWER))
+    semantic_cache.remember_answer(_state(semantic_cache_hit=True, **ANSWER))
+
+    assert node_cache.stats()["writes"] == 0
@@ -0,0 +1,75 @@
+from sample_agent.agents.tce_swarm.rag.processors.text_chunker import (
+    CHARS_PER_TOKEN,
+    StreamingChunker,
+    iter_blocks,
+    iter_file,
+)
+
+SEPARATORS = ["\n## ", "\nArt. ", "\n§ ", "\n", ". "]
+
+CAPITULO_I = "\n".join(
+    f"Art. {i}º O servidor deve prestar contas anualmente ao tribunal competente na forma do regimento. "
+    "Cabe recurso no prazo legal de quinze dias."
+    for i in range(1, 5)
+)
+CAPITULO_II = "\n".join(
+    f"Art. {i}º Texto do capítulo dois sobre licitações e contratos administrativos do município."
+    for i in range(5, 9)
+)
+TEXT = f"# RESOLUÇÃO Nº 1\n\n## Capítulo I\n{CAPITULO_I}\n## Capítulo II\n{CAPITULO_II}"
+
+
+def _split(text, chunk_size=32, chunk_overlap=8, separators=SEPARATORS):
+    return list(StreamingChunker(chunk_size, chunk_overlap, separators).split(text))
+
+
+def test_chunks_respect_size_and_cover_every_article():
+    chunks = _split(TEXT)
+
+    assert all(len(content) <= 32 * CHARS_PER_TOKEN for content, _ in chunks)
+    for i in range(1, 9):
+        assert any(f"Art. {i}º" in content for content, _ in chunks)
+
+
+def test_articles_and_headings_open_chunks_without_overlap():
+    contents = [content for content, _ in _split(TEXT)]
+
+    opened = [content[:7] for content in contents if content.startswith("Art. ")]
+    assert opened == ["Art. 2º", "Art. 3º", "Art. 4º", "Art. 6º", "Art. 7º", "Art. 8º"]
+    heading = next(i for i, content in enumerate(contents) if content.startswith("## Capítulo II"))
+    # Chunk anterior ao marcador termina no fim do artigo, sem carregar o título seguinte
+    assert contents[heading - 1].endswith("quinze dias.")
+    assert "Capítulo II" not in contents[heading - 1]
+
+
+def test_overlap_starts_at_a_separator_boundary():
+    contents = [content for content, _ in _split(TEXT)]
+
+    continuation = contents[1]
+    assert continuation.startswith("na forma do regimento. ")
+    assert contents[0].endswith("na forma do regimento.")
+
+
+def test_overlap_without_separators_falls_on_word_boundaries():
+    chunks = _split("palavra " * 100, separators=[". "])
+
+    assert len(chunks) > 1
+    assert all(content.startswith("palavra") and content.endswith("palavra") for content, _ in chunks)
+
+
+def test_sections_follow_markdown_headings():
+    sections = [section for _, section in _split(TEXT)]
+
+    assert sections[0] == "RESOLUÇÃO Nº 1"
+    assert set(sections[1:]) == {"Capítulo I", "Capítulo II"}
+    assert sections[-1] == "Capítulo II"
+
+
+def test_output_does_not_depend_on_stream_blocks(tmp_path):
+    path = tmp_path / "resolucao.md"
+    path.write_text(TEXT, encoding="utf-8")
+
+    expected = _split(TEXT)
+
+    assert _split(iter_blocks(TEXT, block_chars=7)) == expected
+    assert _split(iter_file(str(path), block_chars=50)) == expected
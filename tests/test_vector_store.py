@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+import pytest
+
+from sample_agent.agents.tce_swarm.rag.index.vector_store import LocalVectorStore, get_vector_store
+from sample_agent.agents.tce_swarm.rag.models.chunks import ChunkMetadata, ChunkResult
+
+
+def _chunk(chunk_id: str, content: str) -> ChunkResult:
+    metadata = ChunkMetadata(document_id=chunk_id.split("-")[0], page_number=None, section=None, chunk_index=0, timestamp=None)
+    return ChunkResult(content=content, metadata=metadata, chunk_id=chunk_id)
+
+
+CHUNKS = [
+    _chunk("licitacao-0", "Prazo de recurso em licitação é de cinco dias úteis"),
+    _chunk("pessoal-0", "Aposentadoria de servidor público exige registro no tribunal"),
+    _chunk("contas-0", "Prestação de contas anual do município deve ser enviada até março"),
+]
+
+
+def test_search_ranks_most_similar_chunk_first():
+    store = LocalVectorStore()
+    store.upsert("global", CHUNKS)
+
+    hits = store.search("prazo de recurso em licitação", k=2)
+
+    assert [chunk.chunk_id for chunk, _ in hits][0] == "licitacao-0"
+    assert len(hits) == 2
+    assert hits[0][1] >= hits[1][1]
+
+
+def test_search_is_restricted_to_requested_collections():
+    store = LocalVectorStore()
+    store.upsert("global", CHUNKS[:1])
+    store.upsert("user_42", CHUNKS[1:])
+
+    hits = store.search("prazo de recurso em licitação", collections=["user_42"], k=5)
+
+    assert {chunk.chunk_id for chunk, _ in hits} == {"pessoal-0", "contas-0"}
+    assert store.search("licitação", collections=["inexistente"]) == []
+
+
+def test_upsert_replaces_by_chunk_id_and_moves_between_collections():
+    store = LocalVectorStore()
+    store.upsert("global", CHUNKS)
+    store.upsert("user_42", [_chunk("licitacao-0", "Texto revisado")])
+
+    assert store.count("global") == 2
+    assert store.count("user_42") == 1
+    assert store.get("licitacao-0").content == "Texto revisado"
+
+    assert store.delete(["licitacao-0", "nao-existe"]) == 1
+    assert store.get("licitacao-0") is None
+    assert store.count() == 2
+
+
+def test_persisted_collections_round_trip(tmp_path):
+    store = LocalVectorStore(persist_dir=str(tmp_path))
+    store.upsert("global", CHUNKS)
+    store.persist()
+
+    loaded = LocalVectorStore(persist_dir=str(tmp_path))
+
+    assert loaded.count("global") == 3
+    assert [c.chunk_id for c in loaded.chunks("global")] == [c.chunk_id for c in CHUNKS]
+    assert np.allclose(loaded.embeddings_for(CHUNKS), store.embeddings_for(CHUNKS))
+    # Nenhum temporário sobra no diretório
+    assert sorted(os.listdir(tmp_path)) == ["global.json", "global.npy"]
+
+
+def test_mismatched_vectors_and_payload_are_skipped_on_load(tmp_path):
+    store = LocalVectorStore(persist_dir=str(tmp_path))
+    store.upsert("global", CHUNKS)
+    store.persist()
+    np.save(tmp_path / "global.npy", np.zeros((1, store.embeddings_for(CHUNKS).shape[1]), dtype=np.float32))
+
+    assert LocalVectorStore(persist_dir=str(tmp_path)).count() == 0
+
+
+def test_remote_backend_is_rejected():
+    with pytest.raises(ValueError):
+        get_vector_store("azure_ai_search")